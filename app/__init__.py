@@ -10,8 +10,9 @@ def create_app():
     app.config.from_object(Config)
     db.init_app(app)
 
-    from app.routes import upload, jobs
+    from app.routes import upload, jobs, metrics
     app.register_blueprint(upload.bp)
     app.register_blueprint(jobs.bp)
+    app.register_blueprint(metrics.bp)
 
     return app
@@ -8,5 +8,122 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    REDIS_URL = os.getenv("REDIS_URL")
     CELERY_BROKER_URL = os.getenv("REDIS_URL")
     CELERY_RESULT_BACKEND = os.getenv("REDIS_URL")
+
+    # Files larger than this are analyzed as chunks fanned out over the worker pool
+    CHUNKED_ANALYSIS_THRESHOLD_BYTES = int(os.getenv("CHUNKED_ANALYSIS_THRESHOLD_BYTES", 256 * 1024))
+    ANALYSIS_CHUNK_BYTES = int(os.getenv("ANALYSIS_CHUNK_BYTES", 64 * 1024))
+
+    # Models each worker process loads at startup when no WORKER_POOL is set;
+    # the rest load on first use
+    PRELOAD_MODELS = [m for m in os.getenv("PRELOAD_MODELS", "nltk,ner,sentiment").split(",") if m]
+
+    # Word feature (syllables, Dale-Chall) cache per worker process and its
+    # optional memory-mapped warm-start table, see app.services.word_features
+    WORD_FEATURE_CACHE_SIZE = int(os.getenv("WORD_FEATURE_CACHE_SIZE", 200_000))
+    WORD_FEATURE_TABLE = os.getenv("WORD_FEATURE_TABLE") or None
+
+    # Sentence-level sentiment: sentences scored per batch and the number of
+    # points of the sentiment arc across the document
+    SENTIMENT_BATCH_SENTENCES = int(os.getenv("SENTIMENT_BATCH_SENTENCES", 256))
+    SENTIMENT_ARC_POINTS = int(os.getenv("SENTIMENT_ARC_POINTS", 100))
+
+    # Readability curve: indices over windows of at least
+    # READABILITY_CURVE_WINDOW_SENTENCES sentences, widened until the document
+    # has at most READABILITY_CURVE_POINTS of them
+    READABILITY_CURVE_WINDOW_SENTENCES = int(os.getenv("READABILITY_CURVE_WINDOW_SENTENCES", 20))
+    READABILITY_CURVE_POINTS = int(os.getenv("READABILITY_CURVE_POINTS", 100))
+
+    # Keyword scoring: tfidf ranks candidate phrases of up to
+    # KEYWORD_MAX_PHRASE_WORDS words by how rare their words are across every
+    # document analyzed so far (document frequencies kept in Redis); rake is
+    # plain RAKE degree-to-frequency scoring. Documents already counted are
+    # remembered in a Bloom filter of KEYWORD_SEEN_FILTER_BITS bits (8 MiB by
+    # default, about one false positive in 10 million at a million documents)
+    KEYWORD_SCORING = os.getenv("KEYWORD_SCORING", "tfidf")
+    KEYWORD_MAX_PHRASE_WORDS = int(os.getenv("KEYWORD_MAX_PHRASE_WORDS", 3))
+    KEYWORD_SEEN_FILTER_BITS = int(os.getenv("KEYWORD_SEEN_FILTER_BITS", 2 ** 26))
+
+    # Corpus similarity index (app.services.corpus_index) of every analyzed
+    # document, off unless CORPUS_INDEX_DIR is set to an absolute directory
+    # shared by the web and worker processes. Vector width, MinHash signature length and
+    # LSH bands only apply when the index is created. Documents whose
+    # estimated shingle Jaccard similarity reaches the threshold are reported
+    # as near-duplicates
+    CORPUS_INDEX_DIR = os.getenv("CORPUS_INDEX_DIR") or None
+    CORPUS_INDEX_DIM = int(os.getenv("CORPUS_INDEX_DIM", 256))
+    CORPUS_INDEX_PERMUTATIONS = int(os.getenv("CORPUS_INDEX_PERMUTATIONS", 64))
+    CORPUS_INDEX_BANDS = int(os.getenv("CORPUS_INDEX_BANDS", 16))
+    CORPUS_DUPLICATE_THRESHOLD = float(os.getenv("CORPUS_DUPLICATE_THRESHOLD", 0.8))
+
+    # Segmented analysis (app.services.segmentation): chapter headings closer
+    # together than SEGMENT_MIN_CHARS do not start a segment, and books without
+    # chapters, or uploads asking for windows, are cut every SEGMENT_WINDOW_CHARS
+    SEGMENT_MIN_CHARS = int(os.getenv("SEGMENT_MIN_CHARS", 2_000))
+    SEGMENT_WINDOW_CHARS = int(os.getenv("SEGMENT_WINDOW_CHARS", 20_000))
+
+    # Summarization model backend: torch, torch-int8 (dynamic quantization) or
+    # onnx (ONNX Runtime export in SUMMARIZER_ONNX_DIR, see app.download_models).
+    # Inference threads per process; 0 splits the cores over a worker pool's
+    # processes, or leaves the library default outside a pool
+    SUMMARIZER_BACKEND = os.getenv("SUMMARIZER_BACKEND", "torch")
+    SUMMARIZER_ONNX_DIR = os.getenv("SUMMARIZER_ONNX_DIR", "models/bart-large-cnn-onnx")
+    SUMMARIZER_INTRA_OP_THREADS = int(os.getenv("SUMMARIZER_INTRA_OP_THREADS", 0))
+    SUMMARIZER_INTER_OP_THREADS = int(os.getenv("SUMMARIZER_INTER_OP_THREADS", 0))
+
+    # Shared model server (app.services.model_server) holding one NER and one
+    # summarization model per box; unset, every worker process loads its own.
+    # A Unix socket path or host:port. The server and its clients refuse to
+    # start without a shared MODEL_SERVER_AUTHKEY
+    MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS") or None
+    MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY") or None
+    # Requests arriving within this window are merged into one model batch
+    MODEL_SERVER_BATCH_WINDOW_MS = float(os.getenv("MODEL_SERVER_BATCH_WINDOW_MS", 10))
+    MODEL_SERVER_TIMEOUT_SECONDS = float(os.getenv("MODEL_SERVER_TIMEOUT_SECONDS", 600))
+
+    # Fault tolerance. Tasks are acknowledged when they finish, so the task of
+    # a killed worker is redelivered (by Redis once the visibility timeout,
+    # which must exceed the longest task, has passed). Transient failures
+    # (Redis, database connection, model server) are retried with exponential
+    # backoff, and a document whose task was started TASK_MAX_ATTEMPTS times
+    # is failed instead of being redelivered forever
+    TASK_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv("TASK_VISIBILITY_TIMEOUT_SECONDS", 3 * 3600))
+    TASK_MAX_RETRIES = int(os.getenv("TASK_MAX_RETRIES", 3))
+    TASK_RETRY_BACKOFF_SECONDS = int(os.getenv("TASK_RETRY_BACKOFF_SECONDS", 10))
+    TASK_RETRY_BACKOFF_MAX_SECONDS = int(os.getenv("TASK_RETRY_BACKOFF_MAX_SECONDS", 600))
+    TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 5))
+    # Chunk and segment states kept in Redis so a rerun resumes from them
+    CHECKPOINT_TTL_SECONDS = int(os.getenv("CHECKPOINT_TTL_SECONDS", 24 * 3600))
+    # Reaper (run by celery beat): PENDING or PARTIAL documents without any
+    # result stored for this long are requeued, and resume from their checkpoints
+    STUCK_DOCUMENT_SECONDS = int(os.getenv("STUCK_DOCUMENT_SECONDS", 3600))
+    REAPER_INTERVAL_SECONDS = int(os.getenv("REAPER_INTERVAL_SECONDS", 300))
+    REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", 100))
+
+    # Uploads are streamed to disk and rejected once they pass this size
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 50 * 1024 * 1024))
+    MAX_CONTENT_LENGTH = MAX_UPLOAD_BYTES
+
+    # Batched analysis: documents per Celery task and model batch settings
+    BATCH_TASK_SIZE = int(os.getenv("BATCH_TASK_SIZE", 64))
+    NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", 32))
+    NER_N_PROCESS = int(os.getenv("NER_N_PROCESS", 1))
+    # Longer texts are split into chunks of this many characters for nlp.pipe
+    NER_CHUNK_CHARS = int(os.getenv("NER_CHUNK_CHARS", 100_000))
+    SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", 8))
+
+    # Worker pool this process belongs to (see app.workers.pools); unset means all queues
+    WORKER_POOL = os.getenv("WORKER_POOL") or None
+    # Documents up to this size are analyzed on the priority queue
+    SMALL_DOCUMENT_BYTES = int(os.getenv("SMALL_DOCUMENT_BYTES", 32 * 1024))
+
+    # Publish per-analyzer measurements to Redis for /metrics
+    ANALYZER_METRICS = os.getenv("ANALYZER_METRICS", "1") != "0"
+    # Port of the worker-side Prometheus exporter; 0 disables it
+    WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", 0))
+
+    # Job status kept in Redis for long-poll and SSE clients
+    JOB_STATE_TTL_SECONDS = int(os.getenv("JOB_STATE_TTL_SECONDS", 24 * 3600))
+    LONG_POLL_MAX_SECONDS = float(os.getenv("LONG_POLL_MAX_SECONDS", 60))
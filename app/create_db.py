@@ -1,5 +1,7 @@
 from app import create_app, db
 
+# Creates the tables of a new database. An existing database is upgraded
+# with python -m app.migrate_db instead; create_all never alters a table.
 app = create_app()
 with app.app_context():
     db.create_all()
@@ -0,0 +1,18 @@
+from spacy.cli import download
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+from app.core.config import Config
+from app.utils.nltk_data import download_nltk_data
+from app.services.named_entity_recognition import SPACY_MODEL
+from app.services.auto_summarization import SUMMARIZATION_MODEL, export_onnx
+
+# Fetch every model and data file the workers need. Run this at image build
+# time; workers never download anything themselves.
+download_nltk_data()
+
+download(SPACY_MODEL)
+
+AutoTokenizer.from_pretrained(SUMMARIZATION_MODEL)
+AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZATION_MODEL)
+if Config.SUMMARIZER_BACKEND == 'onnx':
+    export_onnx(Config.SUMMARIZER_ONNX_DIR)
@@ -0,0 +1,102 @@
+"""Upgrade the database of an existing deployment to the current schema.
+
+app.create_db (db.create_all()) only creates missing tables; it never
+alters the documents table a deployment already has. Run this once after
+upgrading, before starting the web and worker processes:
+
+    python -m app.migrate_db
+
+It adds the documents columns and indexes introduced since (content_hash,
+requested_analyses, segmentation, created_at), creates the analysis_results
+and analysis_cache tables, and moves the analyzer results of documents
+stored before analysis_results existed out of documents.result into
+analysis_results rows. Running it again changes nothing.
+"""
+from sqlalchemy import exists, inspect, text
+
+from app import create_app, db
+from app.models.db import Document, AnalysisResult
+from app.services.analysis_plan import ANALYZERS
+from app.services.result_store import save_results
+
+# Keys of a former documents.result that become analysis_results rows; the
+# rest (document-level errors, single-service outputs) stays in the column
+_RESULT_KEYS = frozenset(ANALYZERS) | {'text_preview', 'analysis_metrics'}
+_BATCH_SIZE = 500
+
+
+def add_missing_columns() -> list:
+    """Add the documents columns the table does not have yet.
+
+    Returns:
+        list: Names of the added columns
+    """
+    table = Document.__table__
+    dialect = db.engine.dialect
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+    added = []
+    with db.engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect)}'))
+            if column.server_default is not None:
+                # Existing rows get the default now; SQLite cannot add a column with a non-constant default
+                conn.execute(table.update().where(column.is_(None)).values({column.name: column.server_default.arg}))
+                if dialect.name == 'postgresql':
+                    default = column.server_default.arg.compile(dialect=dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN {column.name} SET DEFAULT {default}'))
+            if not column.nullable and dialect.name == 'postgresql':
+                conn.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN {column.name} SET NOT NULL'))
+            added.append(column.name)
+    return added
+
+
+def backfill_results() -> int:
+    """Move analyzer results out of documents.result into analysis_results rows.
+
+    Only documents without any analysis_results row are touched, so results
+    stored by the current code are never overwritten.
+
+    Returns:
+        int: Number of documents whose results were moved
+    """
+    has_rows = exists().where(AnalysisResult.document_id == Document.id)
+    ids = [doc_id for doc_id, in db.session.query(Document.id).filter(~has_rows)]
+    moved = 0
+    for i in range(0, len(ids), _BATCH_SIZE):
+        docs = Document.query.options(db.undefer(Document.result)).filter(
+            Document.id.in_(ids[i:i + _BATCH_SIZE])
+        ).all()
+        for doc in docs:
+            if not isinstance(doc.result, dict):
+                continue
+            results = {key: value for key, value in doc.result.items() if key in _RESULT_KEYS}
+            if not results:
+                continue
+            save_results(doc.id, results)
+            # 'analysis_timestamp' was a placeholder; load_results reports the rows' update time
+            rest = {key: value for key, value in doc.result.items()
+                    if key not in _RESULT_KEYS and key != 'analysis_timestamp'}
+            doc.result = rest or None
+            moved += 1
+        db.session.commit()
+    return moved
+
+
+def migrate():
+    """Bring the database of the current app context up to the current schema."""
+    added = add_missing_columns()
+    if added:
+        print(f"Added documents columns: {', '.join(added)}")
+    # New tables (analysis_results, analysis_cache) and the indexes of the new columns
+    db.create_all()
+    for index in Document.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    moved = backfill_results()
+    print(f"Moved the results of {moved} documents into analysis_results")
+
+
+if __name__ == '__main__':
+    with create_app().app_context():
+        migrate()
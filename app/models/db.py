@@ -1,10 +1,44 @@
 from app import db
+from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import JSON
 
 class Document(db.Model):
     __tablename__ = 'documents'
+    __table_args__ = (
+        # Status lookups by age, e.g. finding stuck PENDING documents
+        db.Index('ix_documents_status_created_at', 'status', 'created_at'),
+    )
     id = db.Column(db.String, primary_key=True)
     filename = db.Column(db.String, nullable=False)
     path = db.Column(db.String, nullable=False)
     status = db.Column(db.String, nullable=False)
+    content_hash = db.Column(db.String(64), index=True)
+    requested_analyses = db.Column(JSON)
+    # {'mode': 'chapters' | 'windows', 'window_chars': n} for segmented analysis, else NULL
+    segmentation = db.Column(JSON)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    # Document-level errors only; analyzer output lives in analysis_results.
+    # Deferred so status reads never load it.
+    result = db.deferred(db.Column(JSON))
+    analysis_results = db.relationship('AnalysisResult', cascade='save-update, merge', passive_deletes=True)
+
+
+class AnalysisResult(db.Model):
+    """One analyzer's output, or a stage's measurements, for a document."""
+    __tablename__ = 'analysis_results'
+    document_id = db.Column(db.String, db.ForeignKey('documents.id', ondelete='CASCADE'), primary_key=True)
+    analyzer = db.Column(db.String, primary_key=True)
+    # SQL NULL for stages that only recorded measurements
+    result = db.Column(JSON(none_as_null=True))
+    failed = db.Column(db.Boolean, nullable=False, default=False)
+    metrics = db.Column(JSON(none_as_null=True))
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class AnalysisCache(db.Model):
+    """Analyzer output keyed by the SHA-256 of the uploaded content."""
+    __tablename__ = 'analysis_cache'
+    content_hash = db.Column(db.String(64), primary_key=True)
+    analyzer = db.Column(db.String, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
     result = db.Column(JSON)
@@ -1,16 +1,125 @@
-from flask import Blueprint, jsonify
+import json
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from app import db
+from app.core.config import Config
 from app.models.db import Document
+from app.services.job_events import get_status, wait_for_change, iter_events
+from app.services.result_store import load_results
 
 bp = Blueprint('jobs', __name__, url_prefix='/jobs')
 
 @bp.route('/<job_id>', methods=['GET'])
 def job_status(job_id):
-    doc = Document.query.get(job_id)
+    """
+    Status and results; ?fields=readability_analysis,sentiment_analysis loads
+    only those results, ?fields=segmentation,segments the per-chapter ones
+    """
+    fields = [f for f in request.args.get('fields', '').split(',') if f] or None
+    doc = db.session.get(Document, job_id)
     if not doc:
         return jsonify({'error': 'Job not found'}), 404
 
+    # Document-level errors, and every result of documents stored before analysis_results existed
+    result = {key: value for key, value in (doc.result or {}).items()
+              if not fields or key in fields or key == 'error'}
+    result.update(load_results(job_id, fields))
     return jsonify({
         'status': doc.status,
-        'result': doc.result
+        'result': result or None
     })
 
+@bp.route('/<job_id>/similar', methods=['GET'])
+def similar_documents(job_id):
+    """Most similar stored documents (?k=10) and near-duplicates (?threshold=0.8) from the corpus index"""
+    from app.services.corpus_index import get_index
+    if not Config.CORPUS_INDEX_DIR:
+        return jsonify({'error': 'Corpus index is disabled'}), 404
+    if db.session.get(Document, job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    k = max(1, min(request.args.get('k', 10, type=int), 100))
+    threshold = request.args.get('threshold', Config.CORPUS_DUPLICATE_THRESHOLD, type=float)
+
+    index = get_index()
+    similar = index.similar(job_id, k)
+    if similar is None:
+        return jsonify({'error': 'Document is not in the corpus index yet'}), 404
+    duplicates = index.near_duplicates(job_id, threshold)
+
+    ids = {doc_id for doc_id, _ in similar + duplicates}
+    filenames = dict(db.session.query(Document.id, Document.filename).filter(Document.id.in_(ids))) if ids else {}
+    return jsonify({
+        'id': job_id,
+        'similar': [{'id': doc_id, 'filename': filenames.get(doc_id), 'score': round(score, 4)}
+                    for doc_id, score in similar],
+        'near_duplicates': [{'id': doc_id, 'filename': filenames.get(doc_id), 'jaccard': round(jaccard, 4)}
+                            for doc_id, jaccard in duplicates],
+    })
+
+@bp.route('/corpus/stats', methods=['GET'])
+def corpus_index_stats():
+    from app.services.corpus_index import get_index
+    return jsonify(get_index().stats() if Config.CORPUS_INDEX_DIR else {'documents': 0})
+
+@bp.route('/cache/stats', methods=['GET'])
+def result_cache_stats():
+    from app.services.result_cache import cache_stats
+    return jsonify(cache_stats())
+
+
+def _current_status(job_id):
+    """Job state from Redis, falling back to the status column (never the result) in the DB"""
+    state = get_status(job_id)
+    if state is not None:
+        return state
+    row = db.session.query(Document.status).filter_by(id=job_id).first()
+    # Give the connection back right away; waiting clients must not hold one
+    db.session.close()
+    if row is None:
+        return None
+    return {'id': job_id, 'status': row.status, 'version': 0, 'analyzers': []}
+
+
+@bp.route('/<job_id>/status', methods=['GET'])
+def job_status_only(job_id):
+    """Status and finished analyzers without loading the result"""
+    state = _current_status(job_id)
+    if state is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(state)
+
+
+@bp.route('/<job_id>/wait', methods=['GET'])
+def job_wait(job_id):
+    """
+    Long poll: returns as soon as the job's version passes ?since=N (or it
+    is finished), otherwise the unchanged state after ?timeout seconds
+    """
+    since = request.args.get('since', 0, type=int)
+    timeout = min(request.args.get('timeout', 30, type=float), Config.LONG_POLL_MAX_SECONDS)
+    state = wait_for_change(job_id, since, timeout, lambda: _current_status(job_id))
+    if state is not None:
+        return jsonify(dict(state, changed=True))
+    state = _current_status(job_id)
+    if state is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(dict(state, changed=False))
+
+
+@bp.route('/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events with every status change and new analyzer results until the job finishes"""
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', 0, type=int)
+    if _current_status(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def stream():
+        for event in iter_events(job_id, since, lambda: _current_status(job_id)):
+            if event is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield f"id: {event['version']}\nevent: status\ndata: {json.dumps(event)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
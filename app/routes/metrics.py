@@ -0,0 +1,9 @@
+from flask import Blueprint, Response
+from app.services.metrics import render_prometheus
+
+bp = Blueprint('metrics', __name__)
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint with per-analyzer timing, memory and throughput"""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -1,10 +1,18 @@
 import os
 import uuid
+import zipfile
 from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
 from app import db
-from app.models.db import Document
+from app.models.db import Document, AnalysisResult
 from app.utils.file_check import allowed_file
+from app.core.config import Config
+from app.utils.upload_stream import save_and_hash, UploadTooLarge
+from app.services.result_cache import get_cached_results, is_complete, record_lookup
+from app.services.analysis_plan import parse_analyses
+from app.services.segmentation import MODES as SEGMENT_MODES
+from app.services.job_events import publish_status
+from app.workers.pools import analysis_queue
 
 
 bp = Blueprint('upload', __name__, url_prefix='/upload')
@@ -12,6 +20,68 @@ bp = Blueprint('upload', __name__, url_prefix='/upload')
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+
+def _parse_segmentation(form):
+    """Segmented analysis options of an upload: segment=chapters|windows and optional window_chars.
+
+    Raises:
+        ValueError: If the options are invalid
+    """
+    mode = form.get('segment')
+    if not mode:
+        return None
+    if mode not in SEGMENT_MODES:
+        raise ValueError(f"Unknown segment mode: {mode}, expected one of {', '.join(SEGMENT_MODES)}")
+    segmentation = {'mode': mode}
+    window_chars = form.get('window_chars')
+    if window_chars:
+        if not window_chars.isdigit() or int(window_chars) < 1000:
+            raise ValueError('window_chars must be a number of at least 1000')
+        segmentation['window_chars'] = int(window_chars)
+    return segmentation
+
+
+def _save_document(filename, stream, max_bytes, analyzers, segmentation=None):
+    """Save one upload to disk and build its (uncommitted) Document.
+
+    If the requested analyses of the same content were done before, the
+    document is completed from the result cache right away, unless it asks
+    for segmented analysis, which is never cached.
+    """
+    file_id = str(uuid.uuid4())
+    safe_filename = secure_filename(filename)
+    file_path = os.path.join(UPLOAD_FOLDER, file_id + "_" + safe_filename)
+    content_hash = save_and_hash(stream, file_path, max_bytes=max_bytes)
+
+    print(f"File saved to {file_path} (sha256 {content_hash})")
+
+    doc = Document()
+    doc.id = file_id
+    doc.filename = filename
+    doc.path = file_path
+    doc.status = 'PENDING'
+    doc.content_hash = content_hash
+    doc.requested_analyses = analyzers
+    doc.segmentation = segmentation
+
+    cached = get_cached_results(content_hash)
+    record_lookup(is_complete(cached, analyzers))
+    if is_complete(cached, analyzers) and not segmentation:
+        # Same content was analyzed before: no need to queue anything
+        doc.status = 'COMPLETED'
+        doc.analysis_results = [
+            AnalysisResult(analyzer=name, result=cached[name]) for name in analyzers + ['text_preview']
+        ]
+
+    print(f"Document created with ID: {doc.id}")
+    return doc
+
+
+def _cached_results(doc):
+    """Results a new document was completed with from the cache; read before the commit expires them"""
+    return {row.analyzer: row.result for row in doc.analysis_results}
+
+
 @bp.route('/', methods=['POST'])
 def upload_file():
     print("*** UPLOAD ROUTE HANDLER CALLED ***", flush=True)
@@ -24,33 +94,38 @@ def upload_file():
     if not uploaded_file or not isinstance(filename, str) or not filename:
         return 'No selected file', 400
 
-    file_id = str(uuid.uuid4())
-
     print(f"Processing file: {filename}")
     print(f"File allowed: {allowed_file(filename if filename is not None else '')}")
 
-    if filename and allowed_file(filename if filename is not None else ''):
-        safe_filename = secure_filename(filename)
-        file_path = os.path.join(UPLOAD_FOLDER, file_id + "_" + safe_filename)
-        uploaded_file.save(file_path)
-
-        print(f"File saved to {file_path}")
+    # Optional subset of analyses, e.g. analyses=readability,sentiment, and
+    # per-chapter results with segment=chapters (or segment=windows)
+    try:
+        analyzers = parse_analyses(request.form.getlist('analyses'))
+        segmentation = _parse_segmentation(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        doc = Document()
-        doc.id = file_id
-        doc.filename = filename
-        doc.path = file_path
-        doc.status = 'PENDING'
-
-        print(f"Document created with ID: {doc.id}")
+    if filename and allowed_file(filename if filename is not None else ''):
+        try:
+            doc = _save_document(filename, uploaded_file, Config.MAX_UPLOAD_BYTES, analyzers, segmentation)
+        except UploadTooLarge as e:
+            print(f"File rejected: {str(e)}")
+            return jsonify({'error': str(e)}), 413
 
         try:
+            cached = _cached_results(doc)
             db.session.add(doc)
             db.session.commit()
             print(f"Database commit successful for ID: {doc.id}")
-            from app.workers.celery_workers import text_analysis_service
-            text_analysis_service.delay(doc.id)
-            print(f"Text analysis task queued for document ID: {doc.id}")
+            publish_status(doc.id, doc.status, cached)
+            if doc.status == 'PENDING':
+                from app.workers.celery_workers import text_analysis_service
+                # Small documents skip the queue behind long ones
+                queue = analysis_queue(os.path.getsize(doc.path))
+                text_analysis_service.apply_async((doc.id,), queue=queue)
+                print(f"Text analysis task queued on {queue} for document ID: {doc.id}")
+            else:
+                print(f"Cached analysis reused for document ID: {doc.id}")
         except Exception as e:
             print(f"Database error: {str(e)}")
             db.session.rollback()
@@ -60,8 +135,86 @@ def upload_file():
         return jsonify({
             'id': doc.id,
             'filename': doc.filename,
-            'path': doc.path
+            'path': doc.path,
+            'status': doc.status,
+            'analyses': doc.requested_analyses,
+            'segmentation': doc.segmentation
         })
     else:
         print(f"File rejected: {filename}")
         return 'Invalid file type', 400
+
+
+def _iter_uploads():
+    """Yield (filename, stream) for every file of a batch request, including zip archive members."""
+    for uploaded_file in request.files.getlist('files'):
+        if uploaded_file and uploaded_file.filename:
+            yield uploaded_file.filename, uploaded_file
+
+    archive = request.files.get('archive')
+    if archive and archive.filename:
+        with zipfile.ZipFile(archive.stream) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                with zf.open(info) as member:
+                    yield os.path.basename(info.filename), member
+
+
+@bp.route('/batch', methods=['POST'])
+def upload_batch():
+    """Upload many files (or one zip archive) and analyze them in batched worker tasks."""
+    if 'files' not in request.files and 'archive' not in request.files:
+        return 'No files', 400
+
+    try:
+        analyzers = parse_analyses(request.form.getlist('analyses'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    docs = []
+    rejected = []
+    # The size limit applies to the whole batch after decompression
+    remaining_bytes = Config.MAX_UPLOAD_BYTES
+    try:
+        for filename, stream in _iter_uploads():
+            if not allowed_file(filename):
+                rejected.append({'filename': filename, 'error': 'Invalid file type'})
+                continue
+            doc = _save_document(filename, stream, remaining_bytes, analyzers)
+            remaining_bytes -= os.path.getsize(doc.path)
+            docs.append(doc)
+    except (UploadTooLarge, zipfile.BadZipFile) as e:
+        print(f"Batch rejected: {str(e)}")
+        for doc in docs:
+            os.remove(doc.path)
+        if isinstance(e, zipfile.BadZipFile):
+            return jsonify({'error': 'Invalid archive'}), 400
+        return jsonify({'error': str(e)}), 413
+
+    if not docs:
+        return jsonify({'documents': [], 'rejected': rejected}), 400
+
+    try:
+        cached = {doc.id: _cached_results(doc) for doc in docs}
+        db.session.add_all(docs)
+        db.session.commit()
+        print(f"Database commit successful for {len(docs)} documents")
+        for doc in docs:
+            publish_status(doc.id, doc.status, cached[doc.id])
+    except Exception as e:
+        print(f"Database error: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Database error'}), 500
+
+    pending = [doc.id for doc in docs if doc.status == 'PENDING']
+    if pending:
+        from app.workers.celery_workers import batch_analysis_service
+        for i in range(0, len(pending), Config.BATCH_TASK_SIZE):
+            batch_analysis_service.delay(pending[i:i + Config.BATCH_TASK_SIZE])
+        print(f"Batch analysis queued for {len(pending)} documents")
+
+    return jsonify({
+        'documents': [{'id': doc.id, 'filename': doc.filename, 'status': doc.status} for doc in docs],
+        'rejected': rejected
+    })
@@ -0,0 +1,99 @@
+"""Decide which analyzers (and shared prerequisites) a document needs.
+
+This module only holds metadata so the web process can validate requests
+without importing any NLP models; the worker maps analyzer names to the
+functions that run them.
+"""
+
+# Shared stages an analyzer depends on, in execution order
+STAGES = ('extract_text', 'tokenize')
+
+# name -> prerequisites and cost class. Heavy analyzers load large models
+# and run as separate tasks so cheap results are stored first.
+ANALYZERS = {
+    'readability_analysis': {'requires': ('extract_text', 'tokenize'), 'heavy': False},
+    'sentence_complexity': {'requires': ('extract_text', 'tokenize'), 'heavy': False},
+    'lexical_diversity': {'requires': ('extract_text', 'tokenize'), 'heavy': False},
+    'keyword_extraction': {'requires': ('extract_text',), 'heavy': False},
+    'sentiment_analysis': {'requires': ('extract_text',), 'heavy': False},
+    'named_entity_recognition': {'requires': ('extract_text',), 'heavy': True},
+    'auto_summarization': {'requires': ('extract_text',), 'heavy': True},
+}
+
+# Short names accepted by the API
+ALIASES = {
+    'readability': 'readability_analysis',
+    'complexity': 'sentence_complexity',
+    'lexical': 'lexical_diversity',
+    'keywords': 'keyword_extraction',
+    'sentiment': 'sentiment_analysis',
+    'ner': 'named_entity_recognition',
+    'summary': 'auto_summarization',
+}
+
+
+def parse_analyses(values) -> list:
+    """Normalize requested analyses from the API into analyzer names.
+
+    Args:
+        values (list): Names or aliases; items may be comma separated. Empty means all.
+
+    Returns:
+        list: Analyzer names in registry order
+
+    Raises:
+        ValueError: If an unknown analysis is requested
+    """
+    names = set()
+    for value in values or []:
+        for name in value.split(','):
+            name = name.strip()
+            if not name:
+                continue
+            name = ALIASES.get(name, name)
+            if name not in ANALYZERS:
+                raise ValueError(f'Unknown analysis: {name}')
+            names.add(name)
+    if not names:
+        return list(ANALYZERS)
+    return [name for name in ANALYZERS if name in names]
+
+
+def build_plan(analyses=None) -> dict:
+    """Build an execution plan for the requested analyzers.
+
+    Args:
+        analyses (list, optional): Analyzer names or aliases. Defaults to all.
+
+    Returns:
+        dict: 'analyzers' (all requested), 'stages' (shared prerequisites to
+            run), 'light' (run in the main task) and 'heavy' (queued separately)
+    """
+    analyzers = parse_analyses(analyses)
+    required = {stage for name in analyzers for stage in ANALYZERS[name]['requires']}
+    return {
+        'analyzers': analyzers,
+        'stages': [stage for stage in STAGES if stage in required],
+        'light': [name for name in analyzers if not ANALYZERS[name]['heavy']],
+        'heavy': [name for name in analyzers if ANALYZERS[name]['heavy']],
+    }
+
+
+def document_status(finished: dict, analyzers: list) -> str:
+    """Overall status of a document from its per-analyzer results.
+
+    Args:
+        finished (dict): Analyzer name -> whether its result is an error
+        analyzers (list): Requested analyzer names
+
+    Returns:
+        str: PARTIAL while some requested analyzer is still running, then
+            FAILED if any of them failed and COMPLETED otherwise. Failures
+            are only final once every result is in, since clients stop
+            listening on a final status
+    """
+    if not all(name in finished for name in analyzers):
+        return 'PARTIAL'
+    if any(finished[name] for name in analyzers):
+        return 'FAILED'
+    return 'COMPLETED'
@@ -1,29 +1,238 @@
-from transformers import pipeline, Pipeline
+import os
 from functools import lru_cache
 
+from transformers import pipeline, Pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+
+from app.core.config import Config
+
+SUMMARIZATION_MODEL = 'facebook/bart-large-cnn'
+
+# bart-large-cnn accepts 1024 positions including special tokens
+_MODEL_MAX_TOKENS = 1024
+_SENTENCE_END = ('.', '!', '?', '\n')
+
+
+def _thread_counts() -> tuple:
+    """Intra- and inter-op threads for inference; 0 leaves the library default.
+
+    Unless configured, a process of a worker pool gets an equal share of
+    the cores, so the pool's processes do not oversubscribe them.
+    """
+    intra = Config.SUMMARIZER_INTRA_OP_THREADS
+    if not intra and Config.WORKER_POOL:
+        from app.workers.pools import POOLS
+        intra = max((os.cpu_count() or 1) // max(POOLS[Config.WORKER_POOL]['concurrency'], 1), 1)
+    return intra, Config.SUMMARIZER_INTER_OP_THREADS
+
+
+def _configure_torch_threads():
+    import torch
+    intra, inter = _thread_counts()
+    if intra:
+        torch.set_num_threads(intra)
+    if inter:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError as e:
+            # Only possible before torch runs any parallel work in this process
+            print(f"Could not set inter-op threads: {str(e)}")
+
+
+def _load_torch():
+    """Full precision PyTorch model, the reference backend."""
+    _configure_torch_threads()
+    return AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZATION_MODEL, local_files_only=True, device_map='auto')
+
+
+def _load_torch_int8():
+    """PyTorch model with its Linear layers dynamically quantized to int8 for CPU inference."""
+    import torch
+    _configure_torch_threads()
+    model = AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZATION_MODEL, local_files_only=True)
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx():
+    """ONNX Runtime export written by app.download_models, with one session per process."""
+    try:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise ImportError("The onnx summarizer backend needs: pip install 'optimum[onnxruntime]'") from e
+    if not os.path.isdir(Config.SUMMARIZER_ONNX_DIR):
+        raise FileNotFoundError(f"No ONNX export in {Config.SUMMARIZER_ONNX_DIR}; run: python -m app.download_models")
+
+    intra, inter = _thread_counts()
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra:
+        options.intra_op_num_threads = intra
+    if inter:
+        options.inter_op_num_threads = inter
+    return ORTModelForSeq2SeqLM.from_pretrained(Config.SUMMARIZER_ONNX_DIR, local_files_only=True,
+                                                session_options=options, provider='CPUExecutionProvider')
+
+
+def export_onnx(path: str):
+    """Export the summarization model to ONNX for the onnx backend; run at build time."""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    ORTModelForSeq2SeqLM.from_pretrained(SUMMARIZATION_MODEL, export=True).save_pretrained(path)
+    AutoTokenizer.from_pretrained(SUMMARIZATION_MODEL).save_pretrained(path)
+
+
+# Config.SUMMARIZER_BACKEND -> model loader
+BACKENDS = {
+    'torch': _load_torch,
+    'torch-int8': _load_torch_int8,
+    'onnx': _load_onnx,
+}
+
 
 @lru_cache(maxsize=1)
 def _get_summarizer() -> Pipeline:
-    """Load and cache the summarization model."""
-    return pipeline('summarization', model='facebook/bart-large-cnn', tokenizer='facebook/bart-large-cnn', framework='pt', device_map='auto')
+    """Load and cache the summarization pipeline of Config.SUMMARIZER_BACKEND from local files only.
+
+    The weights (and the ONNX export) are fetched at build time by
+    app.download_models.
+    """
+    backend = Config.SUMMARIZER_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    tokenizer = AutoTokenizer.from_pretrained(SUMMARIZATION_MODEL, local_files_only=True)
+    model = BACKENDS[backend]()
+    return pipeline('summarization', model=model, tokenizer=tokenizer, framework='pt')
+
+
+def _split_windows(text: str, tokenizer, window_tokens: int) -> list:
+    """Split text into consecutive windows of at most window_tokens tokens.
+
+    Windows end on a sentence boundary when one exists in the last fifth of
+    the window, so the model rarely sees a sentence cut in half.
+    """
+    encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    offsets = encoding['offset_mapping']
+    windows = []
+    start = 0
+    while start < len(offsets):
+        end = min(start + window_tokens, len(offsets))
+        if end < len(offsets):
+            for idx in range(end - 1, start + window_tokens * 4 // 5, -1):
+                if text[offsets[idx][0]:offsets[idx][1]].rstrip().endswith(_SENTENCE_END):
+                    end = idx + 1
+                    break
+        window = text[offsets[start][0]:offsets[end - 1][1]].strip()
+        if window:
+            windows.append(window)
+        start = end
+    return windows
+
 
+def _select_evenly(items: list, limit: int) -> list:
+    """Pick at most limit items spread evenly across the list, keeping order."""
+    if len(items) <= limit:
+        return items
+    step = len(items) / limit
+    return [items[int(i * step)] for i in range(limit)]
 
-def generate_summary(text: str, max_length: int = 130, min_length: int = 30) -> dict:
+
+def generate_summary(text: str, max_length: int = 130, min_length: int = 30,
+                     window_tokens: int = _MODEL_MAX_TOKENS - 24, batch_size: int = 8,
+                     max_model_calls: int = 64) -> dict:
     """Generate an abstractive summary of the input text.
 
+    Text longer than the model's input limit is summarized hierarchically:
+    it is split into token-budgeted windows, the windows are summarized in
+    batches, and the concatenated summaries are summarized again until they
+    fit into a single window.
+
     Args:
         text (str): Text to summarize
         max_length (int, optional): Maximum length of summary. Defaults to 130.
         min_length (int, optional): Minimum length of summary. Defaults to 30.
+        window_tokens (int, optional): Token budget per window. Defaults to 1000.
+        batch_size (int, optional): Windows per batched forward pass. Defaults to 8.
+        max_model_calls (int, optional): Cap on the number of windows summarized
+            over all levels. Windows beyond the cap are sampled evenly. Defaults to 64.
 
     Returns:
-        dict: Dictionary containing the generated summary
+        dict: Dictionary containing the generated summary and window statistics
     """
     if not text or not isinstance(text, str):
-        return {'summary': ''}
+        return {'summary': '', 'windows_total': 0, 'windows_processed': 0, 'levels': 0}
+
+    summarizer = _get_summarizer()
+    windows = _split_windows(text, summarizer.tokenizer, window_tokens)
+    windows_total = len(windows)
+    if not windows:
+        return {'summary': '', 'windows_total': 0, 'windows_processed': 0, 'levels': 0}
+    windows_processed = 0
+    levels = 0
+    calls_left = max(max_model_calls, 1)
+
+    while True:
+        levels += 1
+        if len(windows) > 1:
+            if calls_left <= 1:
+                # Out of budget: one last call over the (truncated) concatenation
+                windows = [' '.join(windows)]
+            else:
+                # Keep some budget for the levels that summarize the summaries
+                windows = _select_evenly(windows, max(calls_left * 7 // 8, 1))
+        # transformers pipeline returns a list of dicts with 'summary_text'
+        outputs = summarizer(windows, max_length=max_length, min_length=min_length, do_sample=False,
+                             truncation=True, batch_size=batch_size)
+        summaries = [output['summary_text'] for output in outputs]
+        windows_processed += len(windows)
+        calls_left -= len(windows)
 
+        if len(summaries) == 1:
+            summary = summaries[0]
+            break
+        windows = _split_windows(' '.join(summaries), summarizer.tokenizer, window_tokens)
+
+    return {
+        'summary': summary,
+        'windows_total': windows_total,
+        'windows_processed': windows_processed,
+        'levels': levels
+    }
+
+
+def generate_summaries(texts: list, max_length: int = 130, min_length: int = 30, batch_size: int = 8,
+                       window_tokens: int = _MODEL_MAX_TOKENS - 24) -> list:
+    """Summarize many texts, batching every text that fits into a single window.
+
+    Short texts (blurbs, reviews, chapters) go through one batched pipeline
+    call; texts longer than a window fall back to generate_summary.
+
+    Args:
+        texts (list): Texts to summarize
+        max_length (int, optional): Maximum length of each summary. Defaults to 130.
+        min_length (int, optional): Minimum length of each summary. Defaults to 30.
+        batch_size (int, optional): Texts per batched forward pass. Defaults to 8.
+        window_tokens (int, optional): Token budget of a single window. Defaults to 1000.
+
+    Returns:
+        list: One result per text, in input order, shaped like generate_summary
+    """
+    results = [None] * len(texts)
     summarizer = _get_summarizer()
-    # transformers pipeline returns a list of dicts with 'summary_text'
-    summary = summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)[0]['summary_text']
 
-    return {'summary': summary} 
\ No newline at end of file
+    short = []
+    for i, text in enumerate(texts):
+        if not text or not isinstance(text, str) or not text.strip():
+            results[i] = {'summary': '', 'windows_total': 0, 'windows_processed': 0, 'levels': 0}
+        elif len(summarizer.tokenizer(text, add_special_tokens=False, verbose=False)['input_ids']) <= window_tokens:
+            short.append(i)
+        else:
+            results[i] = generate_summary(text, max_length=max_length, min_length=min_length,
+                                          window_tokens=window_tokens, batch_size=batch_size)
+
+    if short:
+        outputs = summarizer([texts[i] for i in short], max_length=max_length, min_length=min_length,
+                             do_sample=False, truncation=True, batch_size=batch_size)
+        for i, output in zip(short, outputs, strict=True):
+            results[i] = {'summary': output['summary_text'], 'windows_total': 1, 'windows_processed': 1, 'levels': 1}
+
+    return results
@@ -0,0 +1,148 @@
+"""Progress of long-running analysis that survives a killed or restarted worker.
+
+Analyzer results are checkpointed as their analysis_results rows (see
+result_store) as soon as each one finishes, and a rerun skips the ones
+already stored. This module keeps the rest in Redis:
+
+- partial states of chunks and segments, which are only merged into
+  results at the end, so a rerun does not recompute finished ones;
+- how many times a task was started for a document, so a document that
+  keeps killing its worker is failed instead of being redelivered forever;
+- which stuck documents the reaper requeued recently, so it does not queue
+  them again while they wait for a worker;
+- which heavy analyzer tasks are queued or running, so neither a rerun nor
+  the reaper dispatches a second summary or NER run of the same document.
+"""
+import json
+import hashlib
+
+import redis
+
+from app.core.config import Config
+from app.utils.redis_client import get_redis
+
+_PARTIAL_KEY = 'wordlens:checkpoint:{}'
+_ATTEMPTS_KEY = 'wordlens:attempts:{}:{}'
+_REQUEUED_KEY = 'wordlens:requeued:{}'
+_IN_FLIGHT_KEY = 'wordlens:in_flight:{}:{}'
+
+
+def partial_key(*parts) -> str:
+    """Checkpoint key of a partial state, e.g. partial_key('chunk', path, start, end, analyzers)."""
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+    return _PARTIAL_KEY.format(digest)
+
+
+def load_partial(key: str):
+    """Partial state saved under key, or None if there is none (or Redis is unavailable)."""
+    try:
+        value = get_redis().get(key)
+    except redis.RedisError as e:
+        print(f"Could not read checkpoint {key}: {str(e)}")
+        return None
+    return json.loads(value) if value is not None else None
+
+
+def save_partial(key: str, partial: dict):
+    """Keep a JSON serializable partial state for Config.CHECKPOINT_TTL_SECONDS."""
+    try:
+        get_redis().set(key, json.dumps(partial), ex=Config.CHECKPOINT_TTL_SECONDS)
+    except redis.RedisError as e:
+        print(f"Could not save checkpoint {key}: {str(e)}")
+
+
+def start_attempt(task: str, document_id: str) -> int:
+    """Count one start of a task for a document.
+
+    Args:
+        task (str): Task (and analyzers) being started
+        document_id (str): Document ID
+
+    Returns:
+        int: Starts since the last clear_attempts, this one included, or 0 if Redis is unavailable
+    """
+    key = _ATTEMPTS_KEY.format(task, document_id)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.incr(key)
+        pipe.expire(key, Config.CHECKPOINT_TTL_SECONDS)
+        return pipe.execute()[0]
+    except redis.RedisError as e:
+        print(f"Could not count attempt of {task} for {document_id}: {str(e)}")
+        return 0
+
+
+def clear_attempts(task: str, document_id: str):
+    """Forget the starts of a task that finished."""
+    try:
+        get_redis().delete(_ATTEMPTS_KEY.format(task, document_id))
+    except redis.RedisError as e:
+        print(f"Could not clear attempts of {task} for {document_id}: {str(e)}")
+
+
+def claim_requeue(document_id: str) -> bool:
+    """True if the document was not requeued by the reaper within the last Config.STUCK_DOCUMENT_SECONDS."""
+    try:
+        return bool(get_redis().set(_REQUEUED_KEY.format(document_id), 1, nx=True,
+                                     ex=Config.STUCK_DOCUMENT_SECONDS))
+    except redis.RedisError as e:
+        print(f"Could not claim requeue of {document_id}: {str(e)}")
+        return False
+
+
+def claim_in_flight(analyzer: str, document_id: str) -> bool:
+    """Mark an analyzer task of a document as queued.
+
+    The mark lasts Config.TASK_VISIBILITY_TIMEOUT_SECONDS, after which the
+    broker would have redelivered a task lost by its worker, and is renewed
+    when the task starts.
+
+    Args:
+        analyzer (str): Analyzer about to be dispatched
+        document_id (str): Document ID
+
+    Returns:
+        bool: False if the analyzer is already queued or running, so it must not be dispatched
+            again; True when Redis is unavailable
+    """
+    try:
+        return bool(get_redis().set(_IN_FLIGHT_KEY.format(analyzer, document_id), 1, nx=True,
+                                    ex=Config.TASK_VISIBILITY_TIMEOUT_SECONDS))
+    except redis.RedisError as e:
+        print(f"Could not mark {analyzer} of {document_id} in flight: {str(e)}")
+        return True
+
+
+def renew_in_flight(analyzers: list, document_id: str):
+    """Mark analyzer tasks of a document as running, from the start of the run."""
+    try:
+        pipe = get_redis().pipeline()
+        for analyzer in analyzers:
+            pipe.set(_IN_FLIGHT_KEY.format(analyzer, document_id), 1, ex=Config.TASK_VISIBILITY_TIMEOUT_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not mark {', '.join(analyzers)} of {document_id} in flight: {str(e)}")
+
+
+def clear_in_flight(analyzers: list, document_id: str):
+    """Forget the marks of analyzer tasks whose results are stored."""
+    try:
+        get_redis().delete(*(_IN_FLIGHT_KEY.format(analyzer, document_id) for analyzer in analyzers))
+    except redis.RedisError as e:
+        print(f"Could not clear {', '.join(analyzers)} of {document_id} in flight: {str(e)}")
+
+
+def in_flight(analyzers: list, document_id: str) -> set:
+    """The analyzers of a document whose tasks are queued or running (none if Redis is unavailable)."""
+    analyzers = list(analyzers)
+    if not analyzers:
+        return set()
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for analyzer in analyzers:
+            pipe.exists(_IN_FLIGHT_KEY.format(analyzer, document_id))
+        live = pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not read in-flight analyzers of {document_id}: {str(e)}")
+        return set()
+    return {analyzer for analyzer, exists in zip(analyzers, live, strict=True) if exists}
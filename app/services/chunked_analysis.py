@@ -0,0 +1,133 @@
+import os
+
+from app.services.text_pipeline import analyze_document
+from app.services.readability import readability_counts, merge_readability_counts, readability_from_counts
+from app.services.sentence_complexity import (
+    sentence_length_stats, merge_sentence_length_stats, sentence_complexity_from_stats
+)
+from app.services.lexical_diversity import LexicalStats
+from app.services.named_entity_recognition import merge_named_entities
+from app.services.model_server import named_entities
+from app.services.sentiment_analysis import sentiment_analyzer, SentimentStream
+
+# Preferred split points, best first. Falling back to later ones only
+# happens when a chunk has no paragraph break near its target size.
+_BOUNDARIES = (b'\n\n', b'\n', b'. ')
+
+
+def plan_chunks(path: str, chunk_bytes: int) -> list:
+    """Split a file into byte ranges of roughly chunk_bytes at paragraph or sentence boundaries.
+
+    Args:
+        path (str): Path of the UTF-8 text file
+        chunk_bytes (int): Target size of each chunk
+
+    Returns:
+        list: (start, end) byte offsets covering the whole file in order
+    """
+    size = os.path.getsize(path)
+    chunks = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                window = f.read(max(chunk_bytes // 4, 1))
+                for boundary in _BOUNDARIES:
+                    idx = window.find(boundary)
+                    if idx != -1:
+                        end += idx + len(boundary)
+                        break
+                else:
+                    # Never cut through a multi-byte UTF-8 sequence
+                    idx = 0
+                    while idx < len(window) and (window[idx] & 0xC0) == 0x80:
+                        idx += 1
+                    end += idx
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def read_chunk(path: str, start: int, end: int) -> str:
+    """Read and decode one byte range produced by plan_chunks."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start).decode('utf-8')
+
+
+def _lexical_state(words) -> dict:
+    stats = LexicalStats()
+    stats.add(words)
+    return stats.to_dict()
+
+
+def analyze_chunk(text: str, analyzers: list = None) -> dict:
+    """Run the additive analyzers over one chunk (map step).
+
+    Args:
+        text (str): Chunk text
+        analyzers (list, optional): Requested analyzer names; NER and sentiment
+            are skipped unless requested. Defaults to all.
+
+    Returns:
+        dict: JSON serializable partial results for merge_chunk_results
+    """
+    analyzed = analyze_document(text)
+    partial = {
+        'readability': readability_counts(analyzed),
+        'sentence_lengths': sentence_length_stats(analyzed),
+        'lexical': _lexical_state(analyzed.words),
+        'character_count': len(text),
+    }
+    if analyzers is None or 'named_entity_recognition' in analyzers:
+        partial['named_entities'] = named_entities([text])[0]
+    if analyzers is None or 'sentiment_analysis' in analyzers:
+        partial['sentiment'] = sentiment_analyzer.analyze_sentences(analyzed.sentences).to_dict()
+    return partial
+
+
+def merge_chunk_results(partials: list, analyzers: list = None) -> dict:
+    """Merge partial chunk results in document order (reduce step).
+
+    Counts, lexical statistics and entity sets are merged exactly (MTLD up
+    to one partial factor per chunk); the sentence length mean and variance
+    use a parallel-variance merge.
+    Sentence sentiment aggregates, sentiment arcs and readability curve
+    windows are appended in chunk order.
+
+    Args:
+        partials (list): Outputs of analyze_chunk, ordered as in the document
+        analyzers (list, optional): Analyzer names to return. Defaults to all available.
+
+    Returns:
+        dict: Readability, sentence complexity, lexical diversity, NER and sentiment results
+    """
+    readability = partials[0]['readability']
+    sentence_lengths = partials[0]['sentence_lengths']
+    lexical = LexicalStats.from_dict(partials[0]['lexical'])
+    for partial in partials[1:]:
+        readability = merge_readability_counts(readability, partial['readability'])
+        sentence_lengths = merge_sentence_length_stats(sentence_lengths, partial['sentence_lengths'])
+        lexical.merge(LexicalStats.from_dict(partial['lexical']))
+
+    results = {
+        'readability_analysis': readability_from_counts(readability),
+        'sentence_complexity': sentence_complexity_from_stats(sentence_lengths),
+        'lexical_diversity': lexical.result(),
+    }
+    if 'named_entities' in partials[0]:
+        entities = partials[0]['named_entities']
+        for partial in partials[1:]:
+            entities = merge_named_entities(entities, partial['named_entities'])
+        results['named_entity_recognition'] = entities
+    if 'sentiment' in partials[0]:
+        sentiment = SentimentStream.from_dict(partials[0]['sentiment'])
+        for partial in partials[1:]:
+            sentiment.merge(SentimentStream.from_dict(partial['sentiment']))
+        results['sentiment_analysis'] = sentiment_analyzer.summarize_stream(sentiment)
+
+    if analyzers is not None:
+        results = {name: result for name, result in results.items() if name in analyzers}
+    return results
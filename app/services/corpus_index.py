@@ -0,0 +1,383 @@
+"""Similarity index over every analyzed document, for related-document and near-duplicate queries.
+
+Each document is stored as one row of three memory-mapped NumPy matrices
+in Config.CORPUS_INDEX_DIR:
+
+    vectors.npy     float32, L2-normalized hashed TF-IDF of its non-stopwords and keywords
+    signatures.npy  uint32 MinHash signature of its word shingles
+    bands.npy       uint32 LSH band keys of the signature
+
+plus ids.npy with the document ids and meta.json with the row count. Rows
+are appended as documents finish analysis (add_document); writers in
+different worker processes on the box take a file lock, readers reopen the
+matrices whenever meta.json changes. A similarity query is one
+matrix-vector product over the vectors, a near-duplicate query one
+comparison of the band keys, so both stay in the milliseconds at 100k
+documents. Documents analyzed before the index existed are added with:
+
+    python -m app.services.corpus_index rebuild
+"""
+import os
+import re
+import sys
+import json
+import zlib
+import fcntl
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from app.core.config import Config
+from app.services.keyword_extraction import corpus_frequencies, stopword_set
+
+# Document ids are UUID strings
+_ID_DTYPE = np.dtype('S36')
+# Words per shingle of the MinHash signature
+_SHINGLE_WORDS = 5
+_INITIAL_CAPACITY = 1024
+_WORD = re.compile(r'[^\W\d_]+')
+# Odd multiplier combining word hashes into shingle and band keys
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def document_words(text: str) -> list:
+    """Lowercased words of text, for documents whose tokens were not kept by the pipeline."""
+    return _WORD.findall(text.lower())
+
+
+@lru_cache(maxsize=4)
+def _permutations(count: int):
+    """Multiply-shift hash parameters of the MinHash permutations, the same in every process."""
+    rng = np.random.default_rng(20240601)
+    a = rng.integers(1, 2 ** 63, size=count, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=count, dtype=np.uint64)
+    return a, b
+
+
+def _word_hashes(words: list):
+    """Intern words; returns (distinct words, token ids, stable 32-bit hash per distinct word)."""
+    vocab = {}
+    ids = np.fromiter((vocab.setdefault(word, len(vocab)) for word in words), dtype=np.int64, count=len(words))
+    distinct = list(vocab)
+    hashes = np.fromiter((zlib.crc32(word.encode('utf-8')) for word in distinct), dtype=np.uint64,
+                         count=len(distinct))
+    return distinct, ids, hashes
+
+
+def minhash_signature(token_hashes: np.ndarray, permutations: int) -> np.ndarray:
+    """MinHash signature of the word shingles of a document.
+
+    Args:
+        token_hashes (np.ndarray): Hash of every word, in text order
+        permutations (int): Signature length
+
+    Returns:
+        np.ndarray: uint32 signature
+    """
+    width = min(_SHINGLE_WORDS, len(token_hashes))
+    n = len(token_hashes) - width + 1
+    shingles = np.zeros(n, dtype=np.uint64)
+    for j in range(width):
+        shingles = shingles * _MIX + token_hashes[j:j + n]
+    shingles = np.unique(shingles)
+
+    a, b = _permutations(permutations)
+    signature = np.empty(permutations, dtype=np.uint32)
+    for i in range(permutations):
+        signature[i] = ((shingles * a[i] + b[i]) >> np.uint64(32)).min()
+    return signature
+
+
+def band_keys(signature: np.ndarray, bands: int) -> np.ndarray:
+    """One key per LSH band; documents sharing any key are near-duplicate candidates."""
+    keys = np.zeros(bands, dtype=np.uint64)
+    for column in signature.reshape(bands, -1).T.astype(np.uint64):
+        keys = keys * _MIX + column
+    # 32 bits halve the memory a query scans; colliding candidates are dropped by the signature check
+    return (keys ^ (keys >> np.uint64(32))).astype(np.uint32)
+
+
+def feature_vector(distinct: list, ids: np.ndarray, hashes: np.ndarray, keywords, dim: int) -> np.ndarray:
+    """L2-normalized hashed TF-IDF vector of a document's words, plus its keyword phrases.
+
+    Words are hashed into dim signed buckets. IDF comes from the document
+    frequencies kept for keyword extraction, as they are when the document
+    is added; those never count stopwords, so stopwords get no weight here
+    either (they still take part in the MinHash shingles). Keyword phrases
+    are extra features weighted like the document's most distinctive word.
+    """
+    stop = stopword_set()
+    counted = np.fromiter((word not in stop for word in distinct), dtype=bool, count=len(distinct))
+    n_docs, frequencies = corpus_frequencies([word for word in distinct if word not in stop])
+    df = np.fromiter((frequencies.get(word, 0) for word in distinct), dtype=np.float64, count=len(distinct))
+    weights = (1 + np.log(np.bincount(ids, minlength=len(distinct)))) * (np.log((1 + n_docs) / (1 + df)) + 1)
+    weights[~counted] = 0.0
+
+    buckets = hashes % np.uint64(dim)
+    # A second hash bit picks the sign, so colliding words cancel out on average
+    signs = np.where((hashes >> np.uint64(31)) & np.uint64(1), -1.0, 1.0)
+    vector = np.zeros(dim, dtype=np.float64)
+    np.add.at(vector, buckets.astype(np.int64), signs * weights)
+
+    top = weights.max() if weights.any() else 1.0
+    for phrase in keywords:
+        h = zlib.crc32(f'keyword:{phrase}'.encode('utf-8'))
+        vector[h % dim] += -top if (h >> 31) & 1 else top
+
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).astype(np.float32)
+
+
+class CorpusIndex:
+    """Memory-mapped document vectors and MinHash signatures in one directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta = None
+        self._meta_stamp = None
+        self._arrays = None
+        self._arrays_capacity = None
+        # Document id -> row for the first _rows_count rows; ids never move, so it only grows
+        self._rows = {}
+        self._rows_count = 0
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _lock(self):
+        """Exclusive lock serializing writers across processes."""
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file('.lock'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refresh(self, mode: str = 'r') -> bool:
+        """Reload meta.json and reopen the matrices if another process changed them; False if there is no index."""
+        try:
+            stat = os.stat(self._file('meta.json'))
+        except FileNotFoundError:
+            self.meta = None
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp != self._meta_stamp or mode == 'r+':
+            with open(self._file('meta.json')) as f:
+                self.meta = json.load(f)
+            self._meta_stamp = stamp
+        if self._arrays is None or self._arrays_capacity != self.meta['capacity'] or mode == 'r+':
+            self._arrays = {name: np.load(self._file(f'{name}.npy'), mmap_mode=mode)
+                            for name in ('ids', 'vectors', 'signatures', 'bands')}
+            self._arrays_capacity = self.meta['capacity']
+        return True
+
+    def _write_meta(self):
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._file('meta.json'))
+
+    def _shapes(self, capacity: int) -> dict:
+        meta = self.meta
+        return {
+            'ids': ((capacity,), _ID_DTYPE),
+            'vectors': ((capacity, meta['dim']), np.float32),
+            'signatures': ((capacity, meta['permutations']), np.uint32),
+            'bands': ((capacity, meta['bands']), np.uint32),
+        }
+
+    def _resize(self, capacity: int):
+        """Copy every matrix into files of the new capacity; open readers keep the old ones until they refresh."""
+        count = self.meta['count']
+        for name, (shape, dtype) in self._shapes(capacity).items():
+            tmp = self._file(f'{name}.npy.tmp')
+            array = open_memmap(tmp, mode='w+', dtype=dtype, shape=shape)
+            if count:
+                array[:count] = self._arrays[name][:count]
+            array.flush()
+            del array
+            os.replace(tmp, self._file(f'{name}.npy'))
+        self.meta['capacity'] = capacity
+        self._arrays = {name: np.load(self._file(f'{name}.npy'), mmap_mode='r+') for name in self._shapes(capacity)}
+        self._arrays_capacity = capacity
+
+    def _create(self):
+        self.meta = {
+            'count': 0,
+            'capacity': 0,
+            'dim': Config.CORPUS_INDEX_DIM,
+            'permutations': Config.CORPUS_INDEX_PERMUTATIONS,
+            'bands': Config.CORPUS_INDEX_BANDS,
+        }
+        if self.meta['permutations'] % self.meta['bands']:
+            raise ValueError('CORPUS_INDEX_PERMUTATIONS must be a multiple of CORPUS_INDEX_BANDS')
+        self._arrays = {name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in self._shapes(0).items()}
+        self._resize(_INITIAL_CAPACITY)
+
+    def _row(self, document_id: str):
+        """Row of a document, or None if it is not indexed."""
+        count = self.meta['count']
+        if self._rows_count < count:
+            ids = self._arrays['ids'][self._rows_count:count].tolist()
+            self._rows.update(zip(ids, range(self._rows_count, count), strict=True))
+            self._rows_count = count
+        return self._rows.get(document_id.encode('ascii'))
+
+    def add(self, document_id: str, words: list, keywords=()) -> bool:
+        """Add or replace a document.
+
+        Args:
+            document_id (str): Document id
+            words (list): Lowercased words of the document, in text order
+            keywords (iterable, optional): Keyword phrases of the document
+
+        Returns:
+            bool: False if the document has no words and was not indexed
+        """
+        if not words:
+            return False
+        with self._lock():
+            if not self._refresh('r+'):
+                self._create()
+            meta = self.meta
+            distinct, ids, hashes = _word_hashes(words)
+            vector = feature_vector(distinct, ids, hashes, keywords, meta['dim'])
+            signature = minhash_signature(hashes[ids], meta['permutations'])
+
+            row = self._row(document_id)
+            if row is None:
+                row = meta['count']
+                if row == meta['capacity']:
+                    self._resize(meta['capacity'] * 2)
+            arrays = self._arrays
+            arrays['ids'][row] = document_id.encode('ascii')
+            arrays['vectors'][row] = vector
+            arrays['signatures'][row] = signature
+            arrays['bands'][row] = band_keys(signature, meta['bands'])
+            for array in arrays.values():
+                array.flush()
+            # Readers only look at rows below count, so the row is complete before it is visible
+            meta['count'] = max(meta['count'], row + 1)
+            self._write_meta()
+        # Writable maps are reopened read-only by the next query
+        self._arrays = None
+        return True
+
+    def similar(self, document_id: str, k: int = 10):
+        """The k indexed documents whose vectors are closest to a document's.
+
+        Args:
+            document_id (str): Indexed document id
+            k (int, optional): Number of documents. Defaults to 10.
+
+        Returns:
+            list: (document id, cosine similarity) pairs, most similar first, or None if the document is not indexed
+        """
+        if not self._refresh():
+            return None
+        row = self._row(document_id)
+        if row is None:
+            return None
+        count = self.meta['count']
+        vectors = self._arrays['vectors'][:count]
+        scores = vectors @ vectors[row]
+        scores[row] = -np.inf
+        k = min(k, count - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(scores, count - k)[count - k:]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        ids = self._arrays['ids']
+        return [(ids[i].decode('ascii'), float(scores[i])) for i in top]
+
+    def near_duplicates(self, document_id: str, threshold: float = None):
+        """Indexed documents whose estimated word-shingle Jaccard similarity to a document reaches threshold.
+
+        Args:
+            document_id (str): Indexed document id
+            threshold (float, optional): Minimum estimated Jaccard similarity.
+                Defaults to Config.CORPUS_DUPLICATE_THRESHOLD.
+
+        Returns:
+            list: (document id, estimated Jaccard similarity) pairs, most similar first, or None if not indexed
+        """
+        if threshold is None:
+            threshold = Config.CORPUS_DUPLICATE_THRESHOLD
+        if not self._refresh():
+            return None
+        row = self._row(document_id)
+        if row is None:
+            return None
+        count = self.meta['count']
+        bands = self._arrays['bands'][:count]
+        candidates = np.flatnonzero((bands == bands[row]).any(axis=1))
+        candidates = candidates[candidates != row]
+        signatures = self._arrays['signatures']
+        jaccard = (signatures[candidates] == signatures[row]).mean(axis=1)
+        keep = jaccard >= threshold
+        candidates, jaccard = candidates[keep], jaccard[keep]
+        order = np.argsort(-jaccard, kind='stable')
+        ids = self._arrays['ids']
+        return [(ids[candidates[i]].decode('ascii'), float(jaccard[i])) for i in order]
+
+    def stats(self) -> dict:
+        """Number of indexed documents and the index layout."""
+        if not self._refresh():
+            return {'documents': 0}
+        return {'documents': self.meta['count'], 'capacity': self.meta['capacity'], 'dim': self.meta['dim'],
+                'permutations': self.meta['permutations'], 'bands': self.meta['bands']}
+
+
+@lru_cache(maxsize=1)
+def get_index() -> CorpusIndex:
+    """The index in Config.CORPUS_INDEX_DIR, one per process."""
+    return CorpusIndex(Config.CORPUS_INDEX_DIR)
+
+
+def add_document(document_id: str, words: list, keywords=()) -> bool:
+    """Add or replace a document in the corpus index.
+
+    Args:
+        document_id (str): Document id
+        words (list): Lowercased words of the document, in text order
+        keywords (iterable, optional): Keyword phrases of the document
+
+    Returns:
+        bool: True if the document was indexed
+    """
+    if not Config.CORPUS_INDEX_DIR:
+        return False
+    return get_index().add(document_id, words, keywords)
+
+
+def rebuild():
+    """Index every completed document from its stored text and keyword results."""
+    from app import create_app
+    from app.models.db import Document
+    from app.services.result_store import load_results
+    from app.services.text_extraction import get_text_path
+
+    with create_app().app_context():
+        indexed = 0
+        for doc in Document.query.filter_by(status='COMPLETED').yield_per(100):
+            try:
+                with open(get_text_path(doc.path), 'r', encoding='utf-8') as f:
+                    words = document_words(f.read())
+            except Exception as e:
+                print(f"Skipping document {doc.id}: {str(e)}")
+                continue
+            keywords = load_results(doc.id, ['keyword_extraction']).get('keyword_extraction') or {}
+            if add_document(doc.id, words, keywords.get('keywords', [])):
+                indexed += 1
+        print(f"Indexed {indexed} documents into {Config.CORPUS_INDEX_DIR}")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['rebuild']:
+        print('Usage: python -m app.services.corpus_index rebuild')
+        sys.exit(2)
+    rebuild()
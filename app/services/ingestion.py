@@ -0,0 +1,90 @@
+"""Bounded-memory access to uploaded documents.
+
+Analyzers that can work incrementally read a document through
+iter_text_blocks instead of loading the whole file. Such a task holds at
+most one read buffer plus one pending block, so its text memory is capped
+at about read_chars + 2 * max_block_chars characters (under 1 MB with the
+defaults) no matter how large the file is. On top of that only the
+analyzer's own running state is kept (e.g. the vocabulary counter for
+lexical diversity).
+
+The per-service tasks and the reduce step of chunked analysis (keywords,
+preview, corpus index words) read documents this way. The other paths of
+text_analysis_service do load the whole text: documents below
+Config.CHUNKED_ANALYSIS_THRESHOLD_BYTES, so that read is bounded by the
+threshold, and segmented documents of any size, whose chapter headings
+are found over the whole text.
+"""
+
+READ_CHARS = 64 * 1024
+MAX_BLOCK_CHARS = 128 * 1024
+_SENTENCE_ENDS = ('. ', '! ', '? ', '\n')
+
+
+def _normalize(block: str) -> str:
+    """Collapse runs of whitespace (including hard line wraps) to single spaces."""
+    return ' '.join(block.split())
+
+
+def _cut_point(text: str, limit: int) -> int:
+    """Index of the last sentence end within text[:limit], or limit if there is none."""
+    cut = max(text.rfind(end, 0, limit) for end in _SENTENCE_ENDS)
+    return cut + 1 if cut > 0 else limit
+
+
+def _split_oversized(block: str, max_block_chars: int):
+    """Yield pieces of block no longer than max_block_chars, cut at sentence ends when possible."""
+    while len(block) > max_block_chars:
+        cut = _cut_point(block, max_block_chars)
+        yield block[:cut]
+        block = block[cut:]
+    yield block
+
+
+def iter_text_blocks(path: str, max_block_chars: int = MAX_BLOCK_CHARS, read_chars: int = READ_CHARS):
+    """Stream a UTF-8 text file as normalized paragraph blocks.
+
+    Paragraphs are separated by blank lines. A paragraph longer than
+    max_block_chars (or a file without any blank lines) is cut into
+    several blocks at sentence boundaries.
+
+    Args:
+        path (str): Path of the text file
+        max_block_chars (int, optional): Largest block yielded. Defaults to 128 KiB.
+        read_chars (int, optional): Characters read from disk per step. Defaults to 64 KiB.
+
+    Yields:
+        str: Non-empty paragraph blocks in document order
+    """
+    pending = ''
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            data = f.read(read_chars)
+            if not data:
+                break
+            pending += data
+            while True:
+                idx = pending.find('\n\n')
+                if idx == -1:
+                    if len(pending) <= max_block_chars:
+                        break
+                    # No paragraph break in sight: emit up to the last sentence end
+                    idx = _cut_point(pending, max_block_chars)
+                    paragraph, pending = pending[:idx], pending[idx:]
+                else:
+                    paragraph, pending = pending[:idx], pending[idx + 2:]
+                for piece in _split_oversized(paragraph, max_block_chars):
+                    piece = _normalize(piece)
+                    if piece:
+                        yield piece
+    for piece in _split_oversized(pending, max_block_chars):
+        piece = _normalize(piece)
+        if piece:
+            yield piece
+
+
+def read_text_head(path: str, length: int = 200) -> str:
+    """Return a preview of the first length characters, with '...' if the file is longer."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read(length + 1)
+    return text[:length] + '...' if len(text) > length else text
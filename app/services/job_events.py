@@ -0,0 +1,204 @@
+"""Job status in Redis, pushed to clients instead of polled from Postgres.
+
+Workers call publish_status after every commit. It keeps a small state
+hash per job (status, finished analyzers, version) and publishes the change,
+with the new analyzer results, on the job's pub/sub channel. The web process
+listens on all job channels through one shared subscriber, so any number of
+long-poll or SSE clients cost one Redis connection per process and no
+database queries while they wait.
+"""
+import json
+import queue
+import threading
+import time
+
+import redis
+
+from app.core.config import Config
+from app.utils.redis_client import get_redis
+
+TERMINAL_STATUSES = ('COMPLETED', 'FAILED')
+_STATE_KEY = 'wordlens:job:{}:state'
+_ANALYZERS_KEY = 'wordlens:job:{}:analyzers'
+_CHANNEL = 'wordlens:job:{}:events'
+_CHANNEL_PATTERN = 'wordlens:job:*:events'
+
+
+def publish_status(job_id: str, status: str, results: dict = None) -> int:
+    """Record a job's new status and notify everyone watching it.
+
+    Args:
+        job_id (str): Document ID
+        status (str): New document status
+        results (dict, optional): Analyzer results that were just stored
+
+    Returns:
+        int: New state version, or 0 if Redis is unavailable
+    """
+    names = [name for name in (results or {}) if name not in ('analysis_metrics', 'analysis_timestamp')]
+    key = _STATE_KEY.format(job_id)
+    analyzers_key = _ANALYZERS_KEY.format(job_id)
+    try:
+        r = get_redis()
+        pipe = r.pipeline()
+        if names:
+            pipe.sadd(analyzers_key, *names)
+        pipe.hset(key, 'status', status)
+        pipe.hincrby(key, 'version', 1)
+        pipe.expire(key, Config.JOB_STATE_TTL_SECONDS)
+        pipe.expire(analyzers_key, Config.JOB_STATE_TTL_SECONDS)
+        pipe.smembers(analyzers_key)
+        replies = pipe.execute()
+        version = replies[-4]
+        analyzers = sorted(name.decode() for name in replies[-1])
+        event = {'id': job_id, 'status': status, 'version': version, 'analyzers': analyzers,
+                 'results': {name: results[name] for name in names}}
+        r.publish(_CHANNEL.format(job_id), json.dumps(event))
+        return version
+    except redis.RedisError as e:
+        print(f"Could not publish status of {job_id}: {str(e)}")
+        return 0
+
+
+def get_status(job_id: str):
+    """Current state of a job from Redis, or None if Redis has no state for it.
+
+    Returns:
+        dict: 'id', 'status', 'version' and finished 'analyzers'
+    """
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hgetall(_STATE_KEY.format(job_id))
+        pipe.smembers(_ANALYZERS_KEY.format(job_id))
+        state, analyzers = pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not read status of {job_id}: {str(e)}")
+        return None
+    if not state:
+        return None
+    state = {key.decode(): value.decode() for key, value in state.items()}
+    return {
+        'id': job_id,
+        'status': state.get('status'),
+        'version': int(state.get('version', 0)),
+        'analyzers': sorted(name.decode() for name in analyzers),
+    }
+
+
+class _Subscriber:
+    """One pub/sub connection per process that fans job events out to waiting clients."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._thread = None
+        self._subscribed = threading.Event()
+
+    def watch(self, job_id: str) -> queue.Queue:
+        """Start receiving events of a job; pair every call with unwatch."""
+        events = queue.Queue()
+        with self._lock:
+            self._waiters.setdefault(job_id, set()).add(events)
+            if self._thread is None or not self._thread.is_alive():
+                self._subscribed.clear()
+                self._thread = threading.Thread(target=self._listen, name='job-events', daemon=True)
+                self._thread.start()
+        # Events published before the subscription is active would be lost
+        self._subscribed.wait(timeout=5)
+        return events
+
+    def unwatch(self, job_id: str, events: queue.Queue):
+        with self._lock:
+            waiters = self._waiters.get(job_id)
+            if waiters:
+                waiters.discard(events)
+                if not waiters:
+                    del self._waiters[job_id]
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(_CHANNEL_PATTERN)
+                self._subscribed.set()
+                for message in pubsub.listen():
+                    if message.get('type') != 'pmessage':
+                        continue
+                    event = json.loads(message['data'])
+                    with self._lock:
+                        waiters = list(self._waiters.get(event['id'], ()))
+                    for events in waiters:
+                        events.put(event)
+            except redis.RedisError as e:
+                print(f"Job event subscriber disconnected: {str(e)}")
+                self._subscribed.clear()
+                time.sleep(1)
+
+
+_subscriber = _Subscriber()
+
+
+def wait_for_change(job_id: str, since: int, timeout: float, current):
+    """Block until a job's state version passes since, or the timeout runs out.
+
+    Args:
+        job_id (str): Document ID
+        since (int): Last version the client has seen
+        timeout (float): Seconds to wait at most
+        current (callable): Returns the job's current state; called after
+            subscribing, so a change in between is never missed
+
+    Returns:
+        dict: The newer state or event, or None on timeout
+    """
+    events = _subscriber.watch(job_id)
+    try:
+        state = current()
+        if state is None or state['version'] > since or state['status'] in TERMINAL_STATUSES:
+            return state
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                event = events.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if event['version'] > since:
+                return event
+    finally:
+        _subscriber.unwatch(job_id, events)
+
+
+def iter_events(job_id: str, since: int, current, heartbeat: float = 15.0, timeout: float = 3600.0):
+    """Yield job states as they change until the job finishes.
+
+    Yields None every heartbeat seconds without a change, so callers can keep
+    the connection alive. Stops after timeout seconds in any case.
+    """
+    events = _subscriber.watch(job_id)
+    deadline = time.monotonic() + timeout
+    try:
+        state = current()
+        if state is None:
+            return
+        if state['version'] > since or state['status'] in TERMINAL_STATUSES:
+            since = state['version']
+            yield state
+            if state['status'] in TERMINAL_STATUSES:
+                return
+        while time.monotonic() < deadline:
+            try:
+                event = events.get(timeout=heartbeat)
+            except queue.Empty:
+                yield None
+                continue
+            if event['version'] <= since:
+                continue
+            since = event['version']
+            yield event
+            if event['status'] in TERMINAL_STATUSES:
+                return
+    finally:
+        _subscriber.unwatch(job_id, events)
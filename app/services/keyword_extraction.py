@@ -1,33 +1,217 @@
-from rake_nltk import Rake
+import re
+import math
+import heapq
+import hashlib
+from collections import Counter
+from functools import lru_cache
 
-# Ensure required NLTK data for RAKE (stopwords/punkt)
-import nltk
+import redis
+from nltk.corpus import stopwords
 
-def _ensure_nltk_data():
-    for resource in ['punkt', 'stopwords']:
-        try:
-            nltk.data.find(f'tokenizers/{resource}') if resource == 'punkt' else nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download(resource, quiet=True)
+from app.core.config import Config
+from app.utils.redis_client import get_redis
 
-_ensure_nltk_data()
+# The NLTK stopwords are installed by app.download_models
 
+# Document frequency of every word across the documents seen so far, the
+# number of those documents, and a Bloom filter of the documents already
+# counted. The filter has a fixed size, so, like the frequency hash (bounded
+# by the vocabulary), it does not grow with the number of documents
+_DF_KEY = 'wordlens:keyword_df'
+_DOCS_KEY = 'wordlens:keyword_docs'
+_SEEN_KEY = 'wordlens:keyword_seen_filter'
+_SEEN_HASHES = 7
 
-def extract_keywords(text: str, max_keywords: int = 10) -> dict:
-    """Extract keywords from text using RAKE.
+# Anything that is not a letter ends a candidate phrase, like a stopword does
+_NON_WORD = r"[^\w\s]+|[\d_]+"
+
+
+@lru_cache(maxsize=1)
+def stopword_set() -> frozenset:
+    """English stopwords; they end candidate phrases and are never counted in the document frequencies."""
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=1)
+def _splitter():
+    """Regex splitting lowercased text into candidate phrases at stopwords and punctuation."""
+    words = sorted(stopword_set(), key=len, reverse=True)
+    return re.compile(r"%s|\b(?:%s)\b" % (_NON_WORD, '|'.join(map(re.escape, words))))
+
+
+def candidate_phrases(text: str) -> list:
+    """Split text into RAKE candidate phrases: maximal runs of words without stopwords or punctuation.
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        list: Candidate phrases as tuples of lowercased words, in text order
+    """
+    phrases = []
+    for fragment in _splitter().split(text.lower()):
+        words = fragment.split()
+        if words:
+            phrases.append(tuple(words))
+    return phrases
+
+
+def _rake_scores(counts: Counter) -> dict:
+    """RAKE degree-to-frequency score of every distinct phrase."""
+    frequency = Counter()
+    degree = Counter()
+    for phrase, count in counts.items():
+        for word in phrase:
+            frequency[word] += count
+            degree[word] += count * len(phrase)
+    ratio = {word: degree[word] / frequency[word] for word in frequency}
+    return {phrase: sum(ratio[word] for word in phrase) for phrase in counts}
+
+
+def corpus_frequencies(words: list):
+    """Number of documents in the corpus and the document frequency of each word.
+
+    Args:
+        words (list): Distinct words to look up
+
+    Returns:
+        tuple: (number of documents counted, dict of word -> documents containing it, for words seen before)
+    """
+    if not Config.REDIS_URL:
+        return 0, {}
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.get(_DOCS_KEY)
+        pipe.hmget(_DF_KEY, words)
+        n_docs, frequencies = pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not read keyword document frequencies: {str(e)}")
+        return 0, {}
+    return int(n_docs or 0), {word: int(df) for word, df in zip(words, frequencies, strict=True) if df}
+
+
+def _seen_bits(text: str) -> list:
+    """Bloom filter positions of a document's content."""
+    digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=4 * _SEEN_HASHES).digest()
+    return [int.from_bytes(digest[i:i + 4], 'little') % Config.KEYWORD_SEEN_FILTER_BITS
+            for i in range(0, len(digest), 4)]
+
+
+def record_document(text: str, words) -> bool:
+    """Add a document's distinct words to the corpus document frequencies, once per content.
+
+    Documents are remembered in a Bloom filter of Config.KEYWORD_SEEN_FILTER_BITS
+    bits; a false positive, which is rare until millions of documents,
+    only leaves a new document out of the frequencies.
+
+    Args:
+        text (str): Document text, identifies the document
+        words (iterable): Distinct words of the document
+
+    Returns:
+        bool: True if the document was counted, False if it had been already or Redis is unavailable
+    """
+    if not Config.REDIS_URL:
+        return False
+    try:
+        client = get_redis()
+        # SETBIT returns the previous bit; all of them set means seen before
+        pipe = client.pipeline()
+        for bit in _seen_bits(text):
+            pipe.setbit(_SEEN_KEY, bit, 1)
+        if all(pipe.execute()):
+            return False
+        pipe = client.pipeline(transaction=False)
+        for word in words:
+            pipe.hincrby(_DF_KEY, word, 1)
+        pipe.incr(_DOCS_KEY)
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not update keyword document frequencies: {str(e)}")
+        return False
+    return True
+
+
+def _tfidf_scores(phrases: Counter, update_corpus: bool, document_key: str) -> dict:
+    """Score candidate phrases by frequency and the corpus rarity of their words.
+
+    Only phrases of up to Config.KEYWORD_MAX_PHRASE_WORDS words are
+    candidates; when some phrase repeats, phrases seen once are dropped.
+    A phrase scores (1 + ln tf) times the summed smoothed IDF of its words,
+    so rare multi-word names outrank common words however frequent.
+    """
+    counts = Counter({phrase: count for phrase, count in phrases.items()
+                      if len(phrase) <= Config.KEYWORD_MAX_PHRASE_WORDS})
+    if any(count > 1 for count in counts.values()):
+        counts = Counter({phrase: count for phrase, count in counts.items() if count > 1})
+    vocabulary = list({word for phrase in phrases for word in phrase})
+
+    # Read before counting this document, so it is not part of its own IDF
+    n_docs, frequencies = corpus_frequencies(vocabulary)
+    if update_corpus:
+        record_document(document_key, vocabulary)
+
+    idf = {}
+    for phrase in counts:
+        for word in phrase:
+            if word not in idf:
+                idf[word] = math.log((1 + n_docs) / (1 + frequencies.get(word, 0))) + 1
+    return {
+        phrase: (1 + math.log(count)) * sum(idf[word] for word in phrase)
+        for phrase, count in counts.items()
+    }
+
+
+def extract_keywords(text: str, max_keywords: int = 10, scoring: str = None, update_corpus: bool = True) -> dict:
+    """Extract keywords from text using RAKE or corpus-aware TF-IDF scoring.
 
     Args:
         text (str): Input text
         max_keywords (int, optional): Maximum number of keywords to return. Defaults to 10.
+        scoring (str, optional): 'tfidf' or 'rake'. Defaults to Config.KEYWORD_SCORING.
+        update_corpus (bool, optional): Count this document in the corpus
+            document frequencies used by tfidf scoring. Defaults to True.
 
     Returns:
-        dict: List of extracted keywords
+        dict: List of extracted keywords, best first
     """
     if not text or not isinstance(text, str):
         return {'keywords': []}
+    return _top_keywords(Counter(candidate_phrases(text)), text, max_keywords, scoring, update_corpus)
+
+
+def extract_keywords_stream(blocks, document_key: str, max_keywords: int = 10, scoring: str = None,
+                            update_corpus: bool = True) -> dict:
+    """Extract keywords from an iterable of text blocks, e.g. from ingestion.iter_text_blocks.
+
+    Only the count of each distinct candidate phrase is kept, so memory is
+    bounded by the phrases, not the length of the text.
+
+    Args:
+        blocks (iterable): Text blocks in document order; phrases never span two blocks
+        document_key (str): Identifies the document in the corpus, e.g. its content hash
+        max_keywords (int, optional): Maximum number of keywords to return. Defaults to 10.
+        scoring (str, optional): 'tfidf' or 'rake'. Defaults to Config.KEYWORD_SCORING.
+        update_corpus (bool, optional): Count this document in the corpus
+            document frequencies used by tfidf scoring. Defaults to True.
+
+    Returns:
+        dict: List of extracted keywords, best first
+    """
+    counts = Counter()
+    for block in blocks:
+        counts.update(candidate_phrases(block))
+    return _top_keywords(counts, document_key, max_keywords, scoring, update_corpus)
+
 
-    rake = Rake()
-    rake.extract_keywords_from_text(text)
-    keywords = rake.get_ranked_phrases()
+def _top_keywords(counts: Counter, document_key: str, max_keywords: int, scoring: str, update_corpus: bool) -> dict:
+    scoring = scoring or Config.KEYWORD_SCORING
+    if scoring not in ('tfidf', 'rake'):
+        raise ValueError(f"Unknown keyword scoring {scoring!r}, expected 'tfidf' or 'rake'")
+    if scoring == 'rake':
+        scores = _rake_scores(counts)
+    else:
+        scores = _tfidf_scores(counts, update_corpus, document_key)
 
-    return {'keywords': keywords[:max_keywords]} 
\ No newline at end of file
+    top = heapq.nlargest(max_keywords, scores.items(), key=lambda item: item[1])
+    return {'keywords': [' '.join(phrase) for phrase, _ in top]}
@@ -1,53 +1,364 @@
-import nltk
+from itertools import islice
+
+import numpy as np
 from nltk import tokenize
-from collections import Counter
 
-# Ensure NLTK data
+# NLTK data is installed ahead of time by app.download_models; see
+# app.utils.nltk_data for the readiness check.
+
+# Moving-average TTR window (Covington & McFall)
+MATTR_WINDOW = 50
+# MTLD factor threshold and HD-D sample size (McCarthy & Jarvis)
+MTLD_THRESHOLD = 0.72
+HDD_SAMPLE = 42
+# Points of the vocabulary growth curve
+GROWTH_POINTS = 40
+# Words buffered before a vectorized update
+_BATCH_WORDS = 8192
+
+
+class LexicalStats:
+    """Lexical statistics of a word stream, updated batch by batch in one pass.
+
+    Words are interned to integer ids and counted in NumPy arrays; besides
+    the vocabulary, only MATTR_WINDOW - 1 words at either end of the stream
+    are kept, so memory is bounded by the vocabulary size, not the token
+    count. Stats of consecutive chunks merge: counts, HD-D, Yule's K, MATTR
+    and the growth curve exactly, MTLD up to one partial factor per seam.
+    """
+
+    def __init__(self):
+        self.vocab = {}
+        self.counts = np.zeros(1024, dtype=np.int64)
+        # Position of each word's first and latest occurrence
+        self.first_seen = np.zeros(1024, dtype=np.int64)
+        self.last_seen = np.full(1024, -1, dtype=np.int64)
+        self.token_count = 0
+        self.head = np.zeros(0, dtype=np.int64)
+        self.tail = np.zeros(0, dtype=np.int64)
+        # Sum over tokens of the windows they are new in; see _update_mattr
+        self._mattr_raw = 0
+        # MTLD: completed factors, fractional factors of merged chunks and the open segment
+        self._mtld_factors = 0
+        self._mtld_extra = 0.0
+        self._segment_start = 0
+        self._segment_tokens = 0
+        self._segment_types = 0
+        self._buffer = []
+
+    @property
+    def type_count(self) -> int:
+        return len(self.vocab)
+
+    def add(self, words):
+        """Add lowercased words in stream order."""
+        words = iter(words)
+        while True:
+            batch = list(islice(words, _BATCH_WORDS - len(self._buffer)))
+            if not batch:
+                return
+            self._buffer.extend(batch)
+            if len(self._buffer) >= _BATCH_WORDS:
+                self._flush()
+
+    def _grow(self, size: int):
+        capacity = len(self.counts)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        extra = capacity - len(self.counts)
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+        self.first_seen = np.concatenate([self.first_seen, np.zeros(extra, dtype=np.int64)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(extra, -1, dtype=np.int64)])
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        known = len(self.vocab)
+        vocab = self.vocab
+        ids = list(map(vocab.get, self._buffer))
+        if None in ids:
+            for i, word in enumerate(self._buffer):
+                if ids[i] is None:
+                    ids[i] = vocab.setdefault(word, len(vocab))
+        ids = np.asarray(ids, dtype=np.int64)
+        self._buffer = []
+        self._grow(len(vocab))
+        positions = self.token_count + np.arange(len(ids))
+
+        new = ids >= known
+        if new.any():
+            new_ids, first = np.unique(ids[new], return_index=True)
+            self.first_seen[new_ids] = positions[new][first]
+        self.counts += np.bincount(ids, minlength=len(self.counts))
+
+        # Previous occurrence of every token: within the batch via a stable
+        # sort by id, else the word's latest position before the batch
+        order = np.argsort(ids, kind='stable')
+        same = ids[order[1:]] == ids[order[:-1]]
+        prev = self.last_seen[ids]
+        prev[order[1:][same]] = positions[order[:-1][same]]
+        np.maximum.at(self.last_seen, ids, positions)
+
+        self._update_mattr(prev, positions)
+        self._update_mtld(prev, positions)
+        self.token_count += len(ids)
+        if len(self.head) < MATTR_WINDOW - 1:
+            self.head = np.concatenate([self.head, ids[:MATTR_WINDOW - 1 - len(self.head)]])
+        self.tail = np.concatenate([self.tail, ids])[-(MATTR_WINDOW - 1):]
+
+    def _update_mattr(self, prev, positions):
+        # A token at j is new in every window starting in (prev_j, j], so it
+        # adds that many (clipped to windows containing j) to the sum of the
+        # window type counts; windows left incomplete are removed in _mattr_sum()
+        start = np.maximum(np.maximum(prev + 1, positions - MATTR_WINDOW + 1), 0)
+        self._mattr_raw += int((positions - start + 1).sum())
+
+    def _update_mtld(self, prev, positions):
+        # A token is new in the open segment if it last occurred before the segment started
+        k = 0
+        lookahead = 128
+        while k < len(prev):
+            new = prev[k:k + lookahead] < self._segment_start
+            types = self._segment_types + np.cumsum(new)
+            tokens = self._segment_tokens + np.arange(1, len(new) + 1)
+            done = np.flatnonzero(types <= MTLD_THRESHOLD * tokens)
+            if not done.size:
+                self._segment_types, self._segment_tokens = int(types[-1]), int(tokens[-1])
+                k += len(new)
+                # Long segments are rare; look further ahead for them
+                lookahead *= 2
+                continue
+            lookahead = 128
+            self._mtld_factors += 1
+            k += int(done[0]) + 1
+            self._segment_start = int(positions[k - 1]) + 1
+            self._segment_types = self._segment_tokens = 0
+
+    @staticmethod
+    def _window_type_sum(ids) -> int:
+        """Sum of the type counts of every complete MATTR window of ids."""
+        windows = len(ids) - MATTR_WINDOW + 1
+        if windows <= 0:
+            return 0
+        seen = {}
+        for i in ids[:MATTR_WINDOW]:
+            seen[i] = seen.get(i, 0) + 1
+        total = len(seen)
+        for i in range(1, windows):
+            out, into = ids[i - 1], ids[i + MATTR_WINDOW - 1]
+            seen[out] -= 1
+            if not seen[out]:
+                del seen[out]
+            seen[into] = seen.get(into, 0) + 1
+            total += len(seen)
+        return total
+
+    def _incomplete_sum(self) -> int:
+        """Type counts of the windows starting in the tail, which never completed."""
+        # Each such window holds the distinct words of a suffix of the tail
+        total = 0
+        seen = set()
+        for i in self.tail[::-1].tolist():
+            seen.add(i)
+            total += len(seen)
+        return total
+
+    def _mattr_sum(self) -> int:
+        """Type counts summed over complete windows only."""
+        return self._mattr_raw - self._incomplete_sum()
+
+    def _mtld_factor_count(self) -> float:
+        factors = self._mtld_factors + self._mtld_extra
+        if self._segment_tokens:
+            ttr = self._segment_types / self._segment_tokens
+            factors += (1 - ttr) / (1 - MTLD_THRESHOLD)
+        return factors
+
+    def merge(self, other: 'LexicalStats') -> 'LexicalStats':
+        """Append the stats of the text that follows this one."""
+        self._flush()
+        other._flush()
+        offset = self.token_count
+        mattr = self._mattr_sum() + other._mattr_sum()
+        mtld_factors = self._mtld_factor_count()
+
+        # Re-intern the other vocabulary; mapping[other id] = id here
+        vocab = self.vocab
+        words = sorted(other.vocab, key=other.vocab.get)
+        mapping = np.fromiter((vocab.setdefault(word, len(vocab)) for word in words), dtype=np.int64, count=len(words))
+        self._grow(len(vocab))
+        size = len(words)
+        new = self.counts[mapping] == 0
+        self.counts[mapping] += other.counts[:size]
+        self.first_seen[mapping[new]] = offset + other.first_seen[:size][new]
+        self.last_seen[mapping] = offset + other.last_seen[:size]
+
+        # Windows across the seam lie within the old tail plus the new head
+        mattr += self._window_type_sum(np.concatenate([self.tail, mapping[other.head]]).tolist())
+        self.head = np.concatenate([self.head, mapping[other.head]])[:MATTR_WINDOW - 1]
+        self.tail = np.concatenate([self.tail, mapping[other.tail]])[-(MATTR_WINDOW - 1):]
+        self.token_count += other.token_count
+        # Back to the running form, so more words can still be added
+        self._mattr_raw = mattr + self._incomplete_sum()
 
-def _ensure_nltk_data():
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt', quiet=True)
+        self._mtld_factors = other._mtld_factors
+        self._mtld_extra = mtld_factors + other._mtld_extra
+        self._segment_start = offset + other._segment_start
+        self._segment_tokens = other._segment_tokens
+        self._segment_types = other._segment_types
+        return self
 
-_ensure_nltk_data()
+    def mattr(self) -> float:
+        """Moving-average type-token ratio; plain TTR for texts shorter than a window."""
+        windows = self.token_count - MATTR_WINDOW + 1
+        if windows <= 0:
+            return self.type_count / self.token_count if self.token_count else 0.0
+        return self._mattr_sum() / (windows * MATTR_WINDOW)
 
-def analyze_lexical_diversity(text: str) -> dict:
-    """Compute lexical diversity metrics (TTR, hapax legomena, etc.).
+    def mtld(self) -> float:
+        """Measure of textual lexical diversity, forward pass."""
+        factors = self._mtld_factor_count()
+        return self.token_count / factors if factors else float(self.token_count)
+
+    def _spectrum(self):
+        """Distinct word frequencies and how many words have each."""
+        return np.unique(self.counts[:self.type_count], return_counts=True)
+
+    def hdd(self) -> float:
+        """HD-D: expected type-token ratio of a random HDD_SAMPLE-token sample."""
+        n = self.token_count
+        if n < HDD_SAMPLE:
+            return 0.0
+        frequencies, words = self._spectrum()
+        # P(word absent from the sample) = C(n - f, s) / C(n, s), as a product over the sample draws
+        draws = np.arange(HDD_SAMPLE)
+        absent = np.clip((n - frequencies[:, None] - draws) / (n - draws), 0.0, None).prod(axis=1)
+        return float((words * (1.0 - absent)).sum() / HDD_SAMPLE)
+
+    def yules_k(self) -> float:
+        """Yule's characteristic K; lower means more diverse, independent of length."""
+        n = self.token_count
+        if not n:
+            return 0.0
+        frequencies, words = self._spectrum()
+        return float(1e4 * ((words * frequencies.astype(float) ** 2).sum() - n) / n ** 2)
+
+    def growth_curve(self) -> list:
+        """Vocabulary size after geometrically spaced token counts: [[tokens, types], ...]."""
+        n = self.token_count
+        if not n:
+            return []
+        first = np.sort(self.first_seen[:self.type_count])
+        points = np.unique(np.geomspace(1, n, GROWTH_POINTS).round().astype(np.int64))
+        types = np.searchsorted(first, points, side='left')
+        return [[int(p), int(t)] for p, t in zip(points, types, strict=True)]
+
+    def result(self) -> dict:
+        """Lexical diversity statistics of everything added so far."""
+        self._flush()
+        n = self.token_count
+        if not n:
+            return {
+                'token_count': 0,
+                'type_count': 0,
+                'type_token_ratio': 0.0,
+                'hapax_legomena_count': 0,
+                'mattr': 0.0,
+                'mtld': 0.0,
+                'hdd': 0.0,
+                'yules_k': 0.0,
+                'vocabulary_growth': {'heaps_k': None, 'heaps_beta': None, 'curve': []},
+            }
+
+        curve = self.growth_curve()
+        # Heaps' law V = K * N^beta, least squares in log space past the first few tokens
+        fit = [(tokens, types) for tokens, types in curve if tokens >= 10]
+        heaps_k = heaps_beta = None
+        if len(fit) >= 2:
+            beta, log_k = np.polyfit(np.log([t for t, _ in fit]), np.log([v for _, v in fit]), 1)
+            heaps_k, heaps_beta = round(float(np.exp(log_k)), 3), round(float(beta), 3)
+        return {
+            'token_count': n,
+            'type_count': self.type_count,
+            'type_token_ratio': round(self.type_count / n, 3),
+            'hapax_legomena_count': int(np.count_nonzero(self.counts[:self.type_count] == 1)),
+            'mattr': round(self.mattr(), 3),
+            'mtld': round(self.mtld(), 2),
+            'hdd': round(self.hdd(), 3),
+            'yules_k': round(self.yules_k(), 2),
+            'vocabulary_growth': {'heaps_k': heaps_k, 'heaps_beta': heaps_beta, 'curve': curve},
+        }
+
+    def to_dict(self) -> dict:
+        """JSON serializable state, e.g. a chunk's partial result."""
+        self._flush()
+        size = self.type_count
+        return {
+            'words': sorted(self.vocab, key=self.vocab.get),
+            'counts': self.counts[:size].tolist(),
+            'first_seen': self.first_seen[:size].tolist(),
+            'last_seen': self.last_seen[:size].tolist(),
+            'token_count': self.token_count,
+            'head': self.head.tolist(),
+            'tail': self.tail.tolist(),
+            'mattr_raw': self._mattr_raw,
+            'mtld': [self._mtld_factors, self._mtld_extra, self._segment_start,
+                     self._segment_tokens, self._segment_types],
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'LexicalStats':
+        stats = cls()
+        stats.vocab = {word: i for i, word in enumerate(state['words'])}
+        stats._grow(len(stats.vocab))
+        size = len(stats.vocab)
+        stats.counts[:size] = state['counts']
+        stats.first_seen[:size] = state['first_seen']
+        stats.last_seen[:size] = state['last_seen']
+        stats.token_count = state['token_count']
+        stats.head = np.asarray(state['head'], dtype=np.int64)
+        stats.tail = np.asarray(state['tail'], dtype=np.int64)
+        stats._mattr_raw = state['mattr_raw']
+        (stats._mtld_factors, stats._mtld_extra, stats._segment_start,
+         stats._segment_tokens, stats._segment_types) = state['mtld']
+        return stats
+
+
+def analyze_lexical_diversity(text: str, analyzed=None) -> dict:
+    """Compute lexical diversity metrics (TTR, MTLD, HD-D, Yule's K, MATTR, vocabulary growth).
 
     Args:
         text (str): Input text
+        analyzed (AnalyzedDocument, optional): Pre-tokenized document. When given,
+            its lowercased alphabetic words are used instead of re-tokenizing text.
 
     Returns:
         dict: Lexical diversity statistics
     """
+    stats = LexicalStats()
     if not text or not isinstance(text, str):
-        return {
-            'token_count': 0,
-            'type_count': 0,
-            'type_token_ratio': 0.0,
-            'hapax_legomena_count': 0
-        }
+        return stats.result()
+    if analyzed is not None:
+        stats.add(analyzed.words)
+    else:
+        stats.add(t.lower() for t in tokenize.word_tokenize(text) if t.isalpha())
+    return stats.result()
 
-    tokens = [t.lower() for t in tokenize.word_tokenize(text) if t.isalpha()]
-    token_count = len(tokens)
-    if token_count == 0:
-        return {
-            'token_count': 0,
-            'type_count': 0,
-            'type_token_ratio': 0.0,
-            'hapax_legomena_count': 0
-        }
 
-    type_count = len(set(tokens))
-    ttr = type_count / token_count
+def analyze_lexical_diversity_stream(blocks) -> dict:
+    """Compute lexical diversity metrics over an iterable of text blocks.
 
-    freq_dist = Counter(tokens)
-    hapax_legomena_count = sum(1 for w, c in freq_dist.items() if c == 1)
+    Memory is bounded by the vocabulary size, not the token count.
 
-    return {
-        'token_count': token_count,
-        'type_count': type_count,
-        'type_token_ratio': round(ttr, 3),
-        'hapax_legomena_count': hapax_legomena_count
-    } 
\ No newline at end of file
+    Args:
+        blocks (iterable): Paragraph blocks, e.g. from ingestion.iter_text_blocks
+
+    Returns:
+        dict: Lexical diversity statistics
+    """
+    stats = LexicalStats()
+    for block in blocks:
+        stats.add(t.lower() for t in tokenize.word_tokenize(block) if t.isalpha())
+    return stats.result()
@@ -0,0 +1,242 @@
+"""Per-analyzer timing, CPU, memory and throughput instrumentation.
+
+Measurements are attached to the document result under 'analysis_metrics'
+and aggregated in Redis so the web app (/metrics) and the worker exporter
+report the same numbers in the Prometheus text format regardless of which
+worker process did the work.
+"""
+import time
+import resource
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import redis
+
+from app.core.config import Config
+from app.utils.redis_client import get_redis
+
+_METRICS_KEY = 'wordlens:metrics'
+
+# Upper bounds (seconds) of the seconds-per-1k-tokens histogram
+PER_1K_TOKENS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Counter suffix -> help text
+_COUNTERS = {
+    'runs': 'Analyzer runs',
+    'errors': 'Analyzer runs that raised',
+    'wall_seconds': 'Wall clock time spent in the analyzer',
+    'cpu_seconds': 'CPU time spent in the analyzer',
+    'input_characters': 'Characters of input text',
+    'input_tokens': 'Words of input text',
+    'peak_rss_delta_bytes': 'Peak worker RSS while the analyzer ran, above the RSS it started with',
+}
+
+_PAGE_SIZE = resource.getpagesize()
+
+
+def _rss_bytes() -> int:
+    """Current resident set size, or the lifetime peak where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _reset_peak_rss() -> bool:
+    """Restart the kernel's RSS high-water mark (VmHWM) from the current RSS; Linux only."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_bytes() -> int:
+    """RSS high-water mark since the last _reset_peak_rss."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    return _rss_bytes()
+
+
+def count_input(record: dict, text: str):
+    """Add the characters and tokens of text to a measurement record."""
+    record['characters'] += len(text)
+    record['tokens'] += len(text.split())
+
+
+def counted_blocks(blocks, record: dict):
+    """Pass text blocks through unchanged while counting them into record."""
+    for block in blocks:
+        count_input(record, block)
+        yield block
+
+
+@contextmanager
+def instrument(analyzer: str, text: str = None):
+    """Measure one analyzer run and publish it when the block exits.
+
+    Args:
+        analyzer (str): Analyzer or stage name
+        text (str, optional): Input text; streaming callers leave it out and
+            count blocks with counted_blocks instead
+
+    Yields:
+        dict: Measurement record, filled in on exit
+    """
+    record = {'characters': 0, 'tokens': 0}
+    if text is not None:
+        count_input(record, text)
+    # The process-wide peak only says something about this run once it is
+    # reset; with a thread pool, concurrent runs share it
+    rss_before = _rss_bytes()
+    peak_reset = _reset_peak_rss()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    failed = False
+    try:
+        yield record
+    except Exception:
+        failed = True
+        raise
+    finally:
+        record['wall_seconds'] = round(time.perf_counter() - wall_start, 6)
+        record['cpu_seconds'] = round(time.process_time() - cpu_start, 6)
+        peak = _peak_rss_bytes() if peak_reset else _rss_bytes()
+        record['peak_rss_delta_bytes'] = max(0, peak - rss_before)
+        if record['tokens']:
+            record['seconds_per_1k_tokens'] = round(record['wall_seconds'] * 1000 / record['tokens'], 6)
+        record_analyzer_run(analyzer, record, failed)
+
+
+def record_analyzer_run(analyzer: str, record: dict, failed: bool = False):
+    """Add one measurement to the aggregated counters and histogram in Redis."""
+    if not Config.ANALYZER_METRICS:
+        return
+    fields = {
+        'runs': 1,
+        'errors': int(failed),
+        'wall_seconds': record['wall_seconds'],
+        'cpu_seconds': record['cpu_seconds'],
+        'input_characters': record['characters'],
+        'input_tokens': record['tokens'],
+        'peak_rss_delta_bytes': record['peak_rss_delta_bytes'],
+    }
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for name, value in fields.items():
+            pipe.hincrbyfloat(_METRICS_KEY, f'{analyzer}|{name}', value)
+        for name in ('word_cache_hits', 'word_cache_misses', 'word_table_hits'):
+            if name in record:
+                pipe.hincrbyfloat(_METRICS_KEY, f'{analyzer}|{name}', record[name])
+        if 'seconds_per_1k_tokens' in record:
+            value = record['seconds_per_1k_tokens']
+            # Cumulative buckets, as Prometheus expects
+            for bound in PER_1K_TOKENS_BUCKETS:
+                if value <= bound:
+                    pipe.hincrbyfloat(_METRICS_KEY, f'{analyzer}|bucket|{bound}', 1)
+            pipe.hincrbyfloat(_METRICS_KEY, f'{analyzer}|bucket|+Inf', 1)
+            pipe.hincrbyfloat(_METRICS_KEY, f'{analyzer}|per_1k_sum', value)
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Could not record metrics for {analyzer}: {str(e)}")
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Render the aggregated analyzer metrics in the Prometheus text exposition format."""
+    try:
+        raw = get_redis().hgetall(_METRICS_KEY)
+    except redis.RedisError as e:
+        return f'# metrics unavailable: {str(e)}\n'
+
+    series = {}
+    for key, value in raw.items():
+        analyzer, _, name = key.decode().partition('|')
+        series.setdefault(analyzer, {})[name] = float(value)
+
+    lines = []
+    for name, help_text in _COUNTERS.items():
+        metric = f'wordlens_analyzer_{name}_total'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for analyzer in sorted(series):
+            lines.append(f'{metric}{{analyzer="{analyzer}"}} {_format(series[analyzer].get(name, 0))}')
+
+    metric = 'wordlens_word_cache_lookups_total'
+    lines.append(f'# HELP {metric} Word feature cache lookups while tokenizing')
+    lines.append(f'# TYPE {metric} counter')
+    for analyzer in sorted(series):
+        for result, name in (('hit', 'word_cache_hits'), ('miss', 'word_cache_misses')):
+            if name in series[analyzer]:
+                lines.append(f'{metric}{{analyzer="{analyzer}",result="{result}"}} {_format(series[analyzer][name])}')
+
+    metric = 'wordlens_word_table_hits_total'
+    lines.append(f'# HELP {metric} Word feature cache misses answered by the warm-start table instead of computed')
+    lines.append(f'# TYPE {metric} counter')
+    for analyzer in sorted(series):
+        if 'word_table_hits' in series[analyzer]:
+            lines.append(f'{metric}{{analyzer="{analyzer}"}} {_format(series[analyzer]["word_table_hits"])}')
+
+    metric = 'wordlens_word_cache_hit_ratio'
+    lines.append(f'# HELP {metric} Share of word feature lookups answered by the cache, for sizing WORD_FEATURE_CACHE_SIZE')
+    lines.append(f'# TYPE {metric} gauge')
+    for analyzer in sorted(series):
+        hits = series[analyzer].get('word_cache_hits', 0)
+        lookups = hits + series[analyzer].get('word_cache_misses', 0)
+        if lookups:
+            lines.append(f'{metric}{{analyzer="{analyzer}"}} {_format(round(hits / lookups, 4))}')
+
+    metric = 'wordlens_analyzer_seconds_per_1k_tokens'
+    lines.append(f'# HELP {metric} Wall clock seconds per 1000 input tokens')
+    lines.append(f'# TYPE {metric} histogram')
+    for analyzer in sorted(series):
+        values = series[analyzer]
+        if 'bucket|+Inf' not in values:
+            continue
+        for bound in PER_1K_TOKENS_BUCKETS:
+            count = values.get(f'bucket|{bound}', 0)
+            lines.append(f'{metric}_bucket{{analyzer="{analyzer}",le="{bound}"}} {_format(count)}')
+        lines.append(f'{metric}_bucket{{analyzer="{analyzer}",le="+Inf"}} {_format(values["bucket|+Inf"])}')
+        lines.append(f'{metric}_sum{{analyzer="{analyzer}"}} {_format(values.get("per_1k_sum", 0))}')
+        lines.append(f'{metric}_count{{analyzer="{analyzer}"}} {_format(values["bucket|+Inf"])}')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_exporter(port: int):
+    """Serve /metrics from a daemon thread, for workers that run without the web app.
+
+    Args:
+        port (int): TCP port to listen on
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    server = ThreadingHTTPServer(('0.0.0.0', port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Metrics exporter listening on port {port}")
+    return server
@@ -0,0 +1,314 @@
+"""One process per box that holds the NER and summarization models for every worker.
+
+Without it each Celery prefork child loads its own spaCy model and BART
+copy, so memory, not CPU, caps the number of workers. With
+MODEL_SERVER_ADDRESS set, workers send texts to this process instead:
+
+    MODEL_SERVER_ADDRESS=/run/wordlens/models.sock MODEL_SERVER_AUTHKEY=... python -m app.services.model_server
+
+The address is a Unix socket path or host:port. Connections are
+authenticated with MODEL_SERVER_AUTHKEY (required on both ends) and
+messages are JSON, so a peer can never make the other side unpickle
+anything. Requests from all workers that arrive within
+MODEL_SERVER_BATCH_WINDOW_MS are merged into one batched model call (spaCy
+nlp.pipe, batched summarizer inputs) of at most the model's batch size. If
+a batch raises, its texts are run again one by one so only the text that
+failed gets an error result. Workers use named_entities and summaries
+below, which fall back to in-process models when no server is configured.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import threading
+from multiprocessing.connection import Listener, Client
+
+from app.core.config import Config
+
+
+class ModelServerError(RuntimeError):
+    """The model server rejected a request or is not configured; retrying will not help."""
+
+
+class ModelServerUnavailable(ModelServerError):
+    """The model server could not be reached."""
+
+
+class ModelServerTimeout(ModelServerError):
+    """The model server did not answer in time; it is likely still busy with the request."""
+
+
+def _address(address: str):
+    """A Unix socket path, or (host, port) for host:port."""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address:
+        return (host or '127.0.0.1', int(port))
+    return address
+
+
+def _authkey() -> bytes:
+    if not Config.MODEL_SERVER_AUTHKEY:
+        raise ModelServerError('MODEL_SERVER_AUTHKEY must be set to use the model server')
+    return Config.MODEL_SERVER_AUTHKEY.encode('utf-8')
+
+
+def _send(conn, message):
+    conn.send_bytes(json.dumps(message).encode('utf-8'))
+
+
+def _recv(conn):
+    return json.loads(conn.recv_bytes())
+
+
+# ------------------------------- server -------------------------------- #
+
+
+def _run_ner(texts):
+    from app.services.named_entity_recognition import analyze_named_entities_batch
+    # Inference stays on the batcher thread instead of forking spaCy processes
+    return analyze_named_entities_batch(texts, n_process=1)
+
+
+def _run_summaries(texts):
+    from app.services.auto_summarization import generate_summaries
+    return generate_summaries(texts, batch_size=Config.SUMMARY_BATCH_SIZE)
+
+
+def _load_ner():
+    from app.services.named_entity_recognition import get_nlp
+    get_nlp()
+
+
+def _load_summarizer():
+    from app.services.auto_summarization import _get_summarizer
+    _get_summarizer()
+
+
+# Model name -> (batched run over a list of texts, loader, max texts per batch)
+_MODELS = {
+    'ner': (_run_ner, _load_ner, lambda: Config.NER_BATCH_SIZE),
+    'summary': (_run_summaries, _load_summarizer, lambda: Config.SUMMARY_BATCH_SIZE),
+}
+
+
+class _Request:
+    """Texts of one client call and the slot its results are delivered to."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.results = None
+        self.done = threading.Event()
+
+
+class _MicroBatcher:
+    """Merges concurrent requests for one model into batched calls on a single thread."""
+
+    def __init__(self, name, run, max_batch, window_seconds):
+        self.name = name
+        self.run = run
+        self.max_batch = max(max_batch, 1)
+        self.window_seconds = window_seconds
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.texts = 0
+        threading.Thread(target=self._loop, name=f'batcher-{name}', daemon=True).start()
+
+    def submit(self, texts: list) -> list:
+        request = _Request(texts)
+        self.requests.put(request)
+        request.done.wait()
+        return request.results
+
+    def _collect(self):
+        """Block for one request, then gather more until the window closes or the batch is full."""
+        batch = [self.requests.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.window_seconds
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _error(self, e):
+        """Result in place of a text the model raised on, shaped like the analyzers' errors."""
+        return {'error': f'Unexpected error during {self.name}: {str(e)}'}
+
+    def _run_one(self, text):
+        try:
+            return self.run([text])[0]
+        except Exception as e:
+            return self._error(e)
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                results = self.run(texts)
+            except Exception as e:
+                if len(texts) == 1:
+                    results = [self._error(e)]
+                else:
+                    # Usually one bad text; the others should not fail with it
+                    print(f"{self.name} batch of {len(texts)} failed, running its texts one by one: {str(e)}")
+                    results = [self._run_one(text) for text in texts]
+            self.batches += 1
+            self.texts += len(texts)
+            start = 0
+            for request in batch:
+                request.results = results[start:start + len(request.texts)]
+                start += len(request.texts)
+                request.done.set()
+
+
+def _handle(conn, batchers):
+    """Answer one worker's requests until it disconnects."""
+    try:
+        while True:
+            try:
+                model, texts = _recv(conn)
+            except EOFError:
+                return
+            if model == 'ping':
+                _send(conn, ('ok', {name: {'batches': b.batches, 'texts': b.texts} for name, b in batchers.items()}))
+                continue
+            batcher = batchers.get(model)
+            if batcher is None:
+                _send(conn, ('error', f'Unknown model {model!r}'))
+                continue
+            _send(conn, ('ok', batcher.submit(texts)))
+    except (OSError, ValueError) as e:
+        # ValueError: a message that is not the JSON request format
+        print(f"Model server connection closed: {str(e)}")
+    finally:
+        conn.close()
+
+
+def serve(address: str = None, models=None):
+    """Load the models once and serve worker requests until interrupted.
+
+    Args:
+        address (str, optional): Unix socket path or host:port. Defaults to Config.MODEL_SERVER_ADDRESS.
+        models (list, optional): Names of _MODELS to serve. Defaults to all.
+    """
+    address = _address(address or Config.MODEL_SERVER_ADDRESS)
+    authkey = _authkey()
+    window = Config.MODEL_SERVER_BATCH_WINDOW_MS / 1000
+    batchers = {}
+    for name in models or _MODELS:
+        run, load, max_batch = _MODELS[name]
+        start = time.perf_counter()
+        load()
+        print(f"Model {name} loaded in {time.perf_counter() - start:.1f}s", flush=True)
+        batchers[name] = _MicroBatcher(name, run, max_batch(), window)
+
+    if isinstance(address, str) and os.path.exists(address):
+        # Left behind by a previous server on this box
+        os.remove(address)
+    with Listener(address, authkey=authkey) as listener:
+        print(f"Model server listening on {address}", flush=True)
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError) as e:
+                # Failed handshake, e.g. a client with the wrong authkey
+                print(f"Model server rejected a connection: {str(e)}")
+                continue
+            threading.Thread(target=_handle, args=(conn, batchers), daemon=True).start()
+
+
+# ------------------------------- client -------------------------------- #
+
+_connection = None
+_connection_pid = None
+
+
+def _connect():
+    global _connection, _connection_pid
+    # A connection inherited across fork would interleave two processes' messages
+    if _connection is None or _connection_pid != os.getpid():
+        _connection = Client(_address(Config.MODEL_SERVER_ADDRESS), authkey=_authkey())
+        _connection_pid = os.getpid()
+    return _connection
+
+
+def _call(model: str, texts):
+    """Send one request to the model server, reconnecting once if the server restarted."""
+    global _connection
+    for attempt in (1, 2):
+        try:
+            conn = _connect()
+            _send(conn, (model, texts))
+            if not conn.poll(Config.MODEL_SERVER_TIMEOUT_SECONDS):
+                raise ModelServerTimeout(
+                    f'No answer from the model server within {Config.MODEL_SERVER_TIMEOUT_SECONDS}s'
+                )
+            status, payload = _recv(conn)
+            break
+        except (OSError, EOFError) as e:
+            _connection = None
+            if attempt == 2:
+                raise ModelServerUnavailable(
+                    f'Model server at {Config.MODEL_SERVER_ADDRESS} unavailable: {str(e)}'
+                ) from e
+        except ModelServerTimeout:
+            # The late answer would be read as the reply to the next request
+            _connection = None
+            raise
+    if status != 'ok':
+        raise ModelServerError(payload)
+    return payload
+
+
+def ping() -> dict:
+    """Batches and texts served per model since the server started."""
+    return _call('ping', None)
+
+
+def named_entities(texts: list) -> list:
+    """Named entities of each text, from the model server when one is configured.
+
+    Args:
+        texts (list): Input texts
+
+    Returns:
+        list: One result per text, shaped like analyze_named_entities
+    """
+    if Config.MODEL_SERVER_ADDRESS:
+        return _call('ner', list(texts))
+    from app.services.named_entity_recognition import analyze_named_entities_batch
+    return analyze_named_entities_batch(texts)
+
+
+def summaries(texts: list) -> list:
+    """Summary of each text, from the model server when one is configured.
+
+    Args:
+        texts (list): Texts to summarize
+
+    Returns:
+        list: One result per text, shaped like generate_summary
+    """
+    if Config.MODEL_SERVER_ADDRESS:
+        return _call('summary', list(texts))
+    from app.services.auto_summarization import generate_summaries
+    return generate_summaries(texts, batch_size=Config.SUMMARY_BATCH_SIZE)
+
+
+if __name__ == '__main__':
+    if not Config.MODEL_SERVER_ADDRESS and len(sys.argv) < 2:
+        print('Usage: python -m app.services.model_server [address] [ner,summary]')
+        sys.exit(2)
+    if not Config.MODEL_SERVER_AUTHKEY:
+        print('MODEL_SERVER_AUTHKEY must be set; workers need the same value')
+        sys.exit(2)
+    serve(sys.argv[1] if len(sys.argv) > 1 else None,
+          sys.argv[2].split(',') if len(sys.argv) > 2 else None)
@@ -1,37 +1,122 @@
 import spacy
+from collections import Counter
+from functools import lru_cache
 
-# Ensure spaCy model is available
+from app.core.config import Config
+from app.services.segmentation import window_bounds
 
-def _ensure_spacy_model():
+SPACY_MODEL = 'en_core_web_sm'
+
+# Components of the model that entity recognition does not use; only the
+# tokenizer, tok2vec and ner run
+_UNUSED_COMPONENTS = ('tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter', 'morphologizer')
+
+
+@lru_cache(maxsize=1)
+def get_nlp():
+    """Load the spaCy model once per process, with only the components NER needs.
+
+    The model must be installed ahead of time (python -m app.download_models);
+    nothing is downloaded at runtime.
+    """
     try:
-        return spacy.load('en_core_web_sm')
-    except OSError:
-        from spacy.cli import download
-        download('en_core_web_sm')
-        return spacy.load('en_core_web_sm')
+        nlp = spacy.load(SPACY_MODEL, exclude=list(_UNUSED_COMPONENTS))
+    except OSError as e:
+        raise RuntimeError(f"spaCy model '{SPACY_MODEL}' is not installed, run: python -m app.download_models") from e
+    # Texts are split well below this, see split_text
+    nlp.max_length = max(nlp.max_length, Config.NER_CHUNK_CHARS * 2)
+    return nlp
 
-_nlp = _ensure_spacy_model()
 
+def split_text(text: str, chunk_chars: int) -> list:
+    """Split text into chunks of at most chunk_chars at paragraph, line, sentence or word boundaries.
 
-def analyze_named_entities(text: str) -> dict:
-    """Extract named entities from text.
+    Args:
+        text (str): Input text
+        chunk_chars (int): Maximum characters per chunk
+
+    Returns:
+        list: Consecutive chunks covering the text
+    """
+    return [text[start:end] for start, end in window_bounds(text, chunk_chars)]
+
+
+def analyze_named_entities(text: str, batch_size: int = None, n_process: int = None) -> dict:
+    """Extract named entities from text of any length.
 
     Args:
         text (str): Input text
+        batch_size (int, optional): Chunks per spaCy batch. Defaults to Config.NER_BATCH_SIZE.
+        n_process (int, optional): Worker processes used by spaCy. Defaults to Config.NER_N_PROCESS.
 
     Returns:
-        dict: Entities grouped by label
+        dict: Entities grouped by label, most frequent first, and their counts
     """
-    if not text or not isinstance(text, str):
-        return {'entities': {}}
+    return analyze_named_entities_batch([text], batch_size=batch_size, n_process=n_process)[0]
 
-    doc = _nlp(text)
-    entities_by_label = {}
+
+def _entity_counts(doc) -> dict:
+    counts = {}
     for ent in doc.ents:
-        entities_by_label.setdefault(ent.label_, []).append(ent.text)
+        counts.setdefault(ent.label_, Counter())[ent.text] += 1
+    return counts
+
+
+def _entities_result(counts: dict) -> dict:
+    """Shape per-label counters into a result; ties keep first-occurrence order."""
+    ordered = {label: dict(sorted(counter.items(), key=lambda item: -item[1])) for label, counter in counts.items()}
+    return {
+        'entities': {label: list(texts) for label, texts in ordered.items()},
+        'entity_counts': ordered,
+    }
 
-    # Deduplicate entity text per label
-    for label in entities_by_label:
-        entities_by_label[label] = list(set(entities_by_label[label]))
 
-    return {'entities': entities_by_label} 
\ No newline at end of file
+def analyze_named_entities_batch(texts: list, batch_size: int = None, n_process: int = None) -> list:
+    """Extract named entities from many texts with a single nlp.pipe pass.
+
+    Texts longer than Config.NER_CHUNK_CHARS are split into chunks, so
+    books never hit spaCy's max_length, and the chunks of all texts are
+    batched together.
+
+    Args:
+        texts (list): Input texts
+        batch_size (int, optional): Chunks per spaCy batch. Defaults to Config.NER_BATCH_SIZE.
+        n_process (int, optional): Worker processes used by spaCy; values above
+            1 do not work inside daemonic Celery children. Defaults to Config.NER_N_PROCESS.
+
+    Returns:
+        list: One result per text, in input order, shaped like analyze_named_entities
+    """
+    chunks = []
+    owners = []
+    for i, text in enumerate(texts):
+        if not text or not isinstance(text, str):
+            continue
+        for chunk in split_text(text, Config.NER_CHUNK_CHARS):
+            chunks.append(chunk)
+            owners.append(i)
+
+    counts = [{} for _ in texts]
+    docs = get_nlp().pipe(chunks, batch_size=batch_size or Config.NER_BATCH_SIZE,
+                          n_process=n_process or Config.NER_N_PROCESS)
+    for owner, doc in zip(owners, docs, strict=True):
+        for label, counter in _entity_counts(doc).items():
+            counts[owner].setdefault(label, Counter()).update(counter)
+    return [_entities_result(text_counts) for text_counts in counts]
+
+
+def merge_named_entities(first: dict, second: dict) -> dict:
+    """Merge NER results of two consecutive chunks, adding up entity counts.
+
+    Args:
+        first (dict): Result of analyze_named_entities for one chunk
+        second (dict): Result of analyze_named_entities for the following chunk
+
+    Returns:
+        dict: Entities grouped by label, most frequent first, and their counts
+    """
+    counts = {}
+    for result in (first, second):
+        for label, entity_counts in result.get('entity_counts', {}).items():
+            counts.setdefault(label, Counter()).update(entity_counts)
+    return _entities_result(counts)
@@ -1,4 +1,7 @@
 import textstat
+import numpy as np
+
+from app.core.config import Config
 
 def get_readability_scores(text):
     """
@@ -17,3 +20,258 @@ def get_readability_scores(text):
         'flesch_kincaid': flesch_kincaid_score,
         'gunning_fog': gunning_fog_score
     }
+
+
+def _reading_level(flesch_score):
+    """Map a Flesch reading ease score to a human readable level."""
+    if flesch_score >= 90:
+        return 'Very Easy'
+    elif flesch_score >= 80:
+        return 'Easy'
+    elif flesch_score >= 70:
+        return 'Fairly Easy'
+    elif flesch_score >= 60:
+        return 'Standard'
+    elif flesch_score >= 50:
+        return 'Fairly Difficult'
+    elif flesch_score >= 30:
+        return 'Difficult'
+    return 'Very Difficult'
+
+
+# Linsear Write only looks at the first 100 words of a text
+_LINSEAR_WORDS = 100
+
+# Per-window counts of the readability curve, stored column by column
+_CURVE_FIELDS = ('sentences', 'words', 'syllables', 'letters', 'difficult', 'hard_polysyllables',
+                 'linsear_points', 'linsear_sentences')
+
+
+def readability_counts(analyzed):
+    """
+    Collect the additive counts every readability formula is derived from.
+
+    Counts from separate chunks of a document can be combined with
+    merge_readability_counts and turned into metrics afterwards.
+
+    Args:
+        analyzed (AnalyzedDocument): Output of text_pipeline.analyze_document
+
+    Returns:
+        dict: Word, sentence, letter, syllable and difficult word totals,
+            plus the counts of every curve window
+    """
+    features = analyzed.features
+    difficult = ~features.easy
+    head = features.syllables[:_LINSEAR_WORDS]
+    return {
+        'word_count': analyzed.word_count,
+        'sentence_count': analyzed.sentence_count,
+        'character_count': len(analyzed.text),
+        'letter_count': int(features.letters.sum()),
+        'syllable_count': int(features.syllables.sum()),
+        'polysyllable_count': int(features.polysyllable.sum()),
+        'hard_polysyllable_count': int((features.polysyllable & difficult).sum()),
+        'difficult_word_count': int(difficult.sum()),
+        'linsear_head': head.tolist(),
+        'linsear_head_sentences': sum(1 for offset in analyzed.sentence_word_offsets if offset < len(head)),
+        'curve': _curve_windows(analyzed, Config.READABILITY_CURVE_WINDOW_SENTENCES),
+    }
+
+
+def merge_readability_counts(first, second):
+    """
+    Merge counts of two consecutive chunks; totals are summed exactly and
+    curve windows are appended.
+
+    Args:
+        first (dict): Counts of the earlier chunk
+        second (dict): Counts of the following chunk
+
+    Returns:
+        dict: Combined counts
+    """
+    merged = {key: first[key] + second[key] for key in first
+              if key not in ('linsear_head', 'linsear_head_sentences', 'curve')}
+    merged['curve'] = {field: first['curve'][field] + second['curve'][field] for field in _CURVE_FIELDS}
+    if len(first['linsear_head']) >= _LINSEAR_WORDS or not second['linsear_head']:
+        merged['linsear_head'] = first['linsear_head']
+        merged['linsear_head_sentences'] = first['linsear_head_sentences']
+    else:
+        merged['linsear_head'] = (first['linsear_head'] + second['linsear_head'])[:_LINSEAR_WORDS]
+        merged['linsear_head_sentences'] = first['linsear_head_sentences'] + second['linsear_head_sentences']
+    return merged
+
+
+def _indices(words, sentences, syllables, letters, difficult, hard_polysyllables, linsear_points, linsear_sentences):
+    """
+    Evaluate all seven readability formulas on arrays of counts at once.
+
+    Every argument is an array (or scalar) of per-span totals, so one call
+    scores a whole document or every window of a curve. Spans without words
+    score 0.
+    """
+    words = np.asarray(words, dtype=np.float64)
+    has_words = words > 0
+    safe_words = np.where(has_words, words, 1.0)
+    words_per_sentence = words / np.maximum(sentences, 1)
+    syllables_per_word = syllables / safe_words
+    letters_per_word = letters / safe_words
+    per_difficult = 100 * difficult / safe_words
+
+    linsear = linsear_points / np.maximum(linsear_sentences, 1)
+    dale_chall = 0.1579 * per_difficult + 0.0496 * words_per_sentence
+    indices = {
+        'flesch_reading_ease': 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word,
+        'flesch_kincaid_grade': 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59,
+        'gunning_fog': 0.4 * (words_per_sentence + 100 * hard_polysyllables / safe_words),
+        'automated_readability_index': 4.71 * letters_per_word + 0.5 * words_per_sentence - 21.43,
+        'coleman_liau_index': 0.058 * letters_per_word * 100 - 0.296 * (sentences / safe_words) * 100 - 15.8,
+        'linsear_write_formula': np.where(linsear > 20, linsear / 2, (linsear - 2) / 2),
+        'dale_chall_readability_score': np.where(per_difficult > 5, dale_chall + 3.6365, dale_chall),
+    }
+    return {name: np.where(has_words, values, 0.0) for name, values in indices.items()}
+
+
+def readability_from_counts(counts):
+    """
+    Calculate readability indices from (possibly merged) counts.
+
+    Args:
+        counts (dict): Output of readability_counts or merge_readability_counts
+
+    Returns:
+        dict: Dictionary containing counts and readability indices
+    """
+    word_count = counts['word_count']
+    sentence_count = counts['sentence_count']
+    words_per_sentence = word_count / max(sentence_count, 1)
+
+    head = np.asarray(counts['linsear_head'], dtype=np.int32)
+    indices = _indices(
+        word_count, sentence_count, counts['syllable_count'], counts['letter_count'],
+        counts['difficult_word_count'], counts['hard_polysyllable_count'],
+        int(np.where(head >= 3, 3, 1)[head > 0].sum()), counts['linsear_head_sentences'],
+    )
+
+    readability_metrics = {
+        'word_count': word_count,
+        'sentence_count': sentence_count,
+        'character_count': counts['character_count'],
+        'syllable_count': counts['syllable_count'],
+        'polysyllable_count': counts['polysyllable_count'],
+        'avg_words_per_sentence': round(words_per_sentence, 2),
+    }
+    readability_metrics.update({name: round(float(value), 2) for name, value in indices.items()})
+
+    # Add reading level interpretation
+    readability_metrics['reading_level'] = _reading_level(readability_metrics['flesch_reading_ease'])
+    readability_metrics['readability_curve'] = _score_curve(counts['curve'], Config.READABILITY_CURVE_POINTS)
+
+    return readability_metrics
+
+
+def _curve_windows(analyzed, window_sentences):
+    """Counts of consecutive windows of window_sentences sentences (the last may be shorter)."""
+    n = analyzed.sentence_count
+    starts = np.arange(0, n, window_sentences, dtype=np.int64)
+    ends = np.minimum(starts + window_sentences, n)
+    features = analyzed.features
+    difficult = ~features.easy
+
+    def prefix(values):
+        return np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+
+    # Word index where each sentence starts, plus the end of the last one
+    offsets = np.asarray(analyzed.sentence_word_offsets + [analyzed.word_count], dtype=np.int64)
+    first_word, end_word = offsets[starts], offsets[ends]
+
+    def span_sum(values):
+        sums = prefix(values)
+        return sums[end_word] - sums[first_word]
+
+    # Linsear Write counts 3 points per polysyllable in the first 100 words of the window
+    head_end = np.minimum(first_word + _LINSEAR_WORDS, end_word)
+    points = prefix(np.where(features.polysyllable, 3, 1) * (features.syllables > 0))
+    columns = {
+        'sentences': ends - starts,
+        'words': end_word - first_word,
+        'syllables': span_sum(features.syllables),
+        'letters': span_sum(features.letters),
+        'difficult': span_sum(difficult),
+        'hard_polysyllables': span_sum(features.polysyllable & difficult),
+        'linsear_points': points[head_end] - points[first_word],
+        'linsear_sentences': np.searchsorted(offsets[:-1], head_end, side='left') - starts,
+    }
+    return {field: columns[field].tolist() for field in _CURVE_FIELDS}
+
+
+def _halve_curve(columns):
+    """Merge neighbouring curve windows pairwise.
+
+    Totals add up; Linsear Write keeps the head of the first window when it
+    already holds 100 words, and otherwise approximates it with both heads.
+    """
+    merged = {}
+    for field, values in columns.items():
+        if len(values) % 2:
+            values = np.append(values, 0)
+        merged[field] = values[0::2] + values[1::2]
+    full_head = columns['words'][0::2] >= _LINSEAR_WORDS
+    for field in ('linsear_points', 'linsear_sentences'):
+        merged[field] = np.where(full_head, columns[field][0::2], merged[field])
+    return merged
+
+
+def _score_curve(curve, max_points):
+    """
+    Readability indices of every curve window, after merging neighbouring
+    windows until there are at most max_points of them.
+
+    Args:
+        curve (dict): Columns of window counts from readability_counts
+        max_points (int): Largest number of windows to return
+
+    Returns:
+        list: One dict per window with its sentence range, word count and indices
+    """
+    columns = {field: np.asarray(curve[field], dtype=np.int64) for field in _CURVE_FIELDS}
+    while len(columns['sentences']) > max(max_points, 1):
+        columns = _halve_curve(columns)
+    indices = _indices(
+        columns['words'], columns['sentences'], columns['syllables'], columns['letters'], columns['difficult'],
+        columns['hard_polysyllables'], columns['linsear_points'], columns['linsear_sentences'],
+    )
+    ends = np.cumsum(columns['sentences'])
+    return [
+        {
+            'start_sentence': int(ends[i] - columns['sentences'][i]),
+            'end_sentence': int(ends[i]),
+            'word_count': int(columns['words'][i]),
+            **{name: round(float(values[i]), 2) for name, values in indices.items()},
+        }
+        for i in range(len(ends))
+    ]
+
+
+def calculate_readability_metrics(analyzed):
+    """
+    Calculate comprehensive readability metrics from an analyzed document.
+
+    The formulas mirror textstat's, but sentence, word and syllable counts
+    come from the shared AnalyzedDocument so the text is only scanned once,
+    and all seven indices are reductions over its NumPy word features. On
+    the benchmark corpus every index is within 0.5 of textstat's (see
+    benchmarks/bench_readability.py); differences come from tokenization,
+    e.g. textstat counts ARI characters including digits and hyphens.
+
+    Args:
+        analyzed (AnalyzedDocument): Output of text_pipeline.analyze_document
+
+    Returns:
+        dict: Dictionary containing counts and readability indices
+    """
+    try:
+        return readability_from_counts(readability_counts(analyzed))
+    except Exception as e:
+        return {'error': f'Error calculating readability metrics: {str(e)}'}
@@ -0,0 +1,108 @@
+import redis
+
+from app import db
+from app.models.db import AnalysisCache
+from app.services.result_store import upsert
+from app.utils.redis_client import get_redis
+
+# Bump an analyzer's version whenever its output changes; only that
+# analyzer's cached entries are invalidated.
+ANALYZER_VERSIONS = {
+    'readability_analysis': 3,
+    'sentence_complexity': 1,
+    'lexical_diversity': 2,
+    'named_entity_recognition': 2,
+    'keyword_extraction': 2,
+    'sentiment_analysis': 2,
+    'auto_summarization': 2,
+    # Not an analyzer, but cached so a hit never has to extract PDF/EPUB text
+    'text_preview': 1,
+}
+
+_STATS_KEY = 'wordlens:result_cache'
+
+
+def _count(field: str, amount: int = 1):
+    if not amount:
+        return
+    try:
+        get_redis().hincrby(_STATS_KEY, field, amount)
+    except redis.RedisError as e:
+        print(f"Could not update cache counter {field}: {str(e)}")
+
+
+def get_cached_results(content_hash: str) -> dict:
+    """Load every cached analyzer result for content whose version is current.
+
+    Args:
+        content_hash (str): SHA-256 of the document content
+
+    Returns:
+        dict: Analyzer name -> cached result, only for up-to-date entries
+    """
+    if not content_hash:
+        return {}
+    rows = AnalysisCache.query.filter_by(content_hash=content_hash).all()
+    cached = {
+        row.analyzer: row.result for row in rows
+        if ANALYZER_VERSIONS.get(row.analyzer) == row.version
+    }
+    return cached
+
+
+def is_complete(cached: dict, analyzers: list = None) -> bool:
+    """Return True if cached results cover the given analyzers (default: all) and the preview."""
+    required = list(analyzers or ANALYZER_VERSIONS) + ['text_preview']
+    return all(analyzer in cached for analyzer in required)
+
+
+def record_lookup(hit: bool):
+    """Count a document-level cache hit or miss."""
+    _count('hits' if hit else 'misses')
+
+
+def record_analyzer_lookups(cached: dict, analyzers: list = None):
+    """Count per-analyzer hits and misses for the analyzers a task is about to run."""
+    analyzers = analyzers or list(ANALYZER_VERSIONS)
+    hits = sum(1 for analyzer in analyzers if analyzer in cached)
+    _count('analyzer_hits', hits)
+    _count('analyzer_misses', len(analyzers) - hits)
+
+
+def store_results(content_hash: str, results: dict):
+    """Store each analyzer's result under the content hash and its current version.
+
+    Results containing an error are not cached. The caller commits the session.
+
+    Args:
+        content_hash (str): SHA-256 of the document content
+        results (dict): Combined analysis results keyed by analyzer name
+    """
+    if not content_hash:
+        return
+    rows = []
+    for analyzer, version in ANALYZER_VERSIONS.items():
+        result = results.get(analyzer)
+        if result is None or (isinstance(result, dict) and 'error' in result):
+            continue
+        rows.append({'content_hash': content_hash, 'analyzer': analyzer, 'version': version, 'result': result})
+    if not rows:
+        return
+    # Identical uploads finishing together write the same keys; the last one wins
+    stmt = upsert(AnalysisCache).values(rows)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['content_hash', 'analyzer'],
+        set_={'version': stmt.excluded.version, 'result': stmt.excluded.result},
+    ))
+
+
+def cache_stats() -> dict:
+    """Return hit and miss counters for documents and individual analyzers."""
+    try:
+        raw = get_redis().hgetall(_STATS_KEY)
+    except redis.RedisError as e:
+        return {'error': str(e)}
+    stats = {key.decode(): int(value) for key, value in raw.items()}
+    lookups = stats.get('hits', 0) + stats.get('misses', 0)
+    stats['hit_rate'] = round(stats.get('hits', 0) / lookups, 3) if lookups else 0.0
+    return stats
@@ -0,0 +1,116 @@
+"""Per-analyzer result rows of a document.
+
+Every analyzer result is its own (document, analyzer) row, so a task only
+writes what it produced, concurrent tasks never rewrite each other's output
+and readers load just the fields they ask for.
+"""
+from sqlalchemy import func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models.db import AnalysisResult
+
+# Upsert support per database dialect
+_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+# Each segment of a segmented analysis is a row of its own; load_results
+# returns them as one 'segments' list in document order
+SEGMENT_PREFIX = 'segment:'
+
+
+def segment_name(index: int) -> str:
+    """Row name of a segment; zero padded so rows sort in document order."""
+    return f'{SEGMENT_PREFIX}{index:05d}'
+
+
+def upsert(model):
+    """INSERT into a model's table that supports on_conflict_do_update / do_nothing on this database."""
+    return _INSERTS[db.session.get_bind().dialect.name](model)
+
+
+def _is_error(result) -> bool:
+    return isinstance(result, dict) and 'error' in result
+
+
+def save_results(document_id: str, results: dict):
+    """Insert or replace one row per result. The caller commits the session.
+
+    Args:
+        document_id (str): Document ID
+        results (dict): Analyzer name -> result; an 'analysis_metrics' entry
+            is stored with the matching rows, measurements of stages without
+            a result (e.g. tokenize) get rows of their own
+    """
+    metrics = results.get('analysis_metrics') or {}
+    rows = {}
+    for name, result in results.items():
+        if name == 'analysis_metrics':
+            continue
+        rows[name] = {'document_id': document_id, 'analyzer': name, 'result': result,
+                      'failed': _is_error(result), 'metrics': metrics.get(name)}
+    for name, record in metrics.items():
+        if name not in rows:
+            rows[name] = {'document_id': document_id, 'analyzer': name, 'result': None,
+                          'failed': False, 'metrics': record}
+    if not rows:
+        return
+
+    stmt = upsert(AnalysisResult).values(list(rows.values()))
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['document_id', 'analyzer'],
+        set_={
+            'result': stmt.excluded.result,
+            'failed': stmt.excluded.failed,
+            'metrics': stmt.excluded.metrics,
+            'updated_at': func.now(),
+        },
+    ))
+
+
+def finished_analyzers(document_id: str) -> dict:
+    """Analyzer name -> whether it failed, for every stored result (payloads are not loaded)."""
+    rows = db.session.query(AnalysisResult.analyzer, AnalysisResult.failed).filter(
+        AnalysisResult.document_id == document_id, AnalysisResult.result.isnot(None)
+    )
+    return {analyzer: failed for analyzer, failed in rows}
+
+
+def load_results(document_id: str, fields: list = None) -> dict:
+    """Assemble a document's results, optionally only the requested fields.
+
+    Args:
+        document_id (str): Document ID
+        fields (list, optional): Analyzer names, 'segments', 'analysis_metrics'
+            and/or 'analysis_timestamp'. Defaults to everything.
+
+    Returns:
+        dict: Shaped like the former Document.result, plus 'segments' for segmented analyses
+    """
+    wanted = set(fields or ())
+    query = db.session.query(AnalysisResult.analyzer, AnalysisResult.result).filter(
+        AnalysisResult.document_id == document_id, AnalysisResult.result.isnot(None)
+    )
+    if fields:
+        selected = AnalysisResult.analyzer.in_(wanted)
+        if 'segments' in wanted:
+            selected = or_(selected, AnalysisResult.analyzer.startswith(SEGMENT_PREFIX))
+        query = query.filter(selected)
+    results = {analyzer: result for analyzer, result in query}
+    segments = sorted(name for name in results if name.startswith(SEGMENT_PREFIX))
+    if segments:
+        results['segments'] = [results.pop(name) for name in segments]
+
+    with_metrics = not fields or 'analysis_metrics' in wanted
+    if with_metrics or 'analysis_timestamp' in wanted:
+        # Measurements and timestamps only; result payloads are not loaded again
+        columns = [AnalysisResult.analyzer, AnalysisResult.updated_at]
+        if with_metrics:
+            columns.append(AnalysisResult.metrics)
+        rows = db.session.query(*columns).filter(AnalysisResult.document_id == document_id).all()
+        if with_metrics:
+            metrics = {row.analyzer: row.metrics for row in rows if row.metrics}
+            if metrics:
+                results['analysis_metrics'] = metrics
+        if rows and (not fields or 'analysis_timestamp' in wanted):
+            results['analysis_timestamp'] = max(row.updated_at for row in rows).isoformat()
+    return results
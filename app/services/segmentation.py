@@ -0,0 +1,167 @@
+"""Split a book into chapters or fixed-size windows for segmented analysis.
+
+Chapters are found from heading lines ("CHAPTER XII", "Part Two",
+"Book 3: The Return", or a Roman numeral alone on a line). A dense run of
+headings near the start whose entries repeat later in the text is a table
+of contents and those entries are dropped; repeats anywhere else are kept,
+as chapter numbering may restart in every part. Headings closer together than Config.SEGMENT_MIN_CHARS do not start a
+segment of their own. Books without at least two chapters fall back to
+windows of Config.SEGMENT_WINDOW_CHARS characters, cut at paragraph,
+sentence or word boundaries. Segments always tile the text, so their
+mergeable analyzer states add up to the whole document.
+"""
+import re
+
+from app.core.config import Config
+
+MODES = ('chapters', 'windows')
+
+_NUMBER_WORDS = frozenset((
+    'one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen sixteen '
+    'seventeen eighteen nineteen twenty thirty forty fifty sixty seventy eighty ninety hundred first second '
+    'third fourth fifth sixth seventh eighth ninth tenth eleventh twelfth last final'
+).split())
+
+_HEADING = re.compile(
+    r'^[ \t]*(?P<title>(?:chapter|book|part|section|volume|letter|act|canto|stave)[ \t]+'
+    r'(?P<number>[0-9]+|[ivxlcdm]+|[a-z]+(?:-[a-z]+)?)\b[^\n]{0,80}?)[ \t]*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+# Roman numeral alone on its line, e.g. "IV." between two blank lines
+_NUMERAL_HEADING = re.compile(r'^[ \t]*(?P<title>[IVXLC]{1,7}\.?)[ \t]*$', re.MULTILINE)
+# Table of contents lines are at most this many characters apart
+_CONTENTS_GAP_CHARS = 500
+
+# Preferred window cut points, best first
+_BOUNDARIES = ('\n\n', '\n', '. ', ' ')
+
+
+def window_bounds(text: str, window_chars: int) -> list:
+    """Cut text into spans of at most window_chars at paragraph, line, sentence or word boundaries.
+
+    Args:
+        text (str): Input text
+        window_chars (int): Maximum characters per span
+
+    Returns:
+        list: (start, end) character offsets of consecutive spans covering the text
+    """
+    bounds = []
+    start = 0
+    while len(text) - start > window_chars:
+        end = start + window_chars
+        for boundary in _BOUNDARIES:
+            # Only cut in the second half so spans do not get tiny
+            idx = text.rfind(boundary, start + window_chars // 2, end)
+            if idx != -1:
+                end = idx + len(boundary)
+                break
+        bounds.append((start, end))
+        start = end
+    bounds.append((start, len(text)))
+    return bounds
+
+
+def _headings(text: str) -> list:
+    """(offset, title, key) of every line that looks like a chapter heading, in text order.
+
+    The key is the heading without its subtitle, e.g. 'chapter xii', so a
+    table of contents line and the heading it points to share it.
+    """
+    found = {}
+    for match in _HEADING.finditer(text):
+        number = match.group('number').lower()
+        if number.isdigit() or re.fullmatch(r'[ivxlcdm]+', number) or set(number.split('-')) <= _NUMBER_WORDS:
+            key = f"{match.group('title').split()[0].lower()} {number}"
+            found[match.start('title')] = (match.group('title').strip(), key)
+    for match in _NUMERAL_HEADING.finditer(text):
+        title = match.group('title').strip()
+        found.setdefault(match.start('title'), (title, title.rstrip('.').lower()))
+    return [(offset, title, key) for offset, (title, key) in sorted(found.items())]
+
+
+def _contents_entries(headings: list, text_length: int) -> set:
+    """Offsets of the headings that are table of contents entries.
+
+    The table of contents is the first run of headings, each within
+    _CONTENTS_GAP_CHARS of the next, if it starts in the first tenth of the
+    text. Its entries are the headings of the run seen again after it.
+    """
+    if not headings or headings[0][0] > text_length // 10:
+        return set()
+    n = 1
+    while n < len(headings) and headings[n][0] - headings[n - 1][0] < _CONTENTS_GAP_CHARS:
+        n += 1
+    if n < 2:
+        return set()
+    later = {key for _, _, key in headings[n:]}
+    return {offset for offset, _, key in headings[:n] if key in later}
+
+
+def chapter_bounds(text: str, min_chars: int = None) -> list:
+    """Chapter spans of a text, or an empty list if it has fewer than two chapters.
+
+    Args:
+        text (str): Input text
+        min_chars (int, optional): Shortest chapter; a heading closer than this
+            to the previous one, or to the end of the text, does not start a
+            new chapter. Defaults to Config.SEGMENT_MIN_CHARS.
+
+    Returns:
+        list: (start, end, title) of consecutive spans covering the text; the
+            span before the first heading, if long enough, has title None
+    """
+    min_chars = Config.SEGMENT_MIN_CHARS if min_chars is None else min_chars
+    headings = _headings(text)
+    contents = _contents_entries(headings, len(text))
+    headings = [(offset, title) for offset, title, _ in headings if offset not in contents]
+
+    kept = []
+    for offset, title in headings:
+        if kept and offset - kept[-1][0] < min_chars:
+            # Too close to the previous heading: part of the same segment
+            continue
+        kept.append((offset, title))
+    if kept and len(text) - kept[-1][0] < min_chars:
+        # A short last chapter is joined to the one before it
+        kept.pop()
+    if len(kept) < 2:
+        return []
+
+    if kept[0][0] >= min_chars:
+        kept.insert(0, (0, None))
+    else:
+        kept[0] = (0, kept[0][1])
+    ends = [offset for offset, _ in kept[1:]] + [len(text)]
+    return [(start, end, title) for (start, title), end in zip(kept, ends, strict=True)]
+
+
+def plan_segments(text: str, mode: str = 'chapters', window_chars: int = None) -> dict:
+    """Decide the segments of a text.
+
+    Args:
+        text (str): Input text
+        mode (str, optional): 'chapters' (falls back to windows when no
+            chapters are found) or 'windows'. Defaults to 'chapters'.
+        window_chars (int, optional): Window size. Defaults to Config.SEGMENT_WINDOW_CHARS.
+
+    Returns:
+        dict: 'mode' actually used and 'segments', a list of dicts with
+            'index', 'title', 'start_char' and 'end_char'
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown segmentation mode {mode!r}, expected one of {', '.join(MODES)}")
+    spans = chapter_bounds(text) if mode == 'chapters' else []
+    if spans:
+        used = 'chapters'
+    else:
+        used = 'windows'
+        bounds = window_bounds(text, window_chars or Config.SEGMENT_WINDOW_CHARS)
+        spans = [(start, end, f'Window {i + 1}') for i, (start, end) in enumerate(bounds)]
+    return {
+        'mode': used,
+        'segments': [
+            {'index': i, 'title': title, 'start_char': start, 'end_char': end}
+            for i, (start, end, title) in enumerate(spans)
+        ],
+    }
@@ -1,22 +1,16 @@
-import nltk
 from nltk import tokenize
 from statistics import mean, variance
 
-# Ensure required NLTK corpora
+# NLTK data is installed ahead of time by app.download_models; see
+# app.utils.nltk_data for the readiness check.
 
-def _ensure_nltk_data():
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt', quiet=True)
-
-_ensure_nltk_data()
-
-def analyze_sentence_complexity(text: str) -> dict:
+def analyze_sentence_complexity(text: str, analyzed=None) -> dict:
     """Compute sentence complexity metrics.
 
     Args:
         text (str): Input text
+        analyzed (AnalyzedDocument, optional): Pre-tokenized document. When given,
+            sentence lengths are read from it instead of re-tokenizing text.
 
     Returns:
         dict: Average sentence length, variance, sentence count, word count
@@ -29,8 +23,11 @@ def analyze_sentence_complexity(text: str) -> dict:
             'sentence_length_variance': 0.0
         }
 
-    sentences = tokenize.sent_tokenize(text)
-    sentence_lengths = [len(tokenize.word_tokenize(s)) for s in sentences if s.strip()]
+    if analyzed is not None:
+        sentence_lengths = [len(tokens) for tokens in analyzed.sentence_tokens]
+    else:
+        sentences = tokenize.sent_tokenize(text)
+        sentence_lengths = [len(tokenize.word_tokenize(s)) for s in sentences if s.strip()]
 
     if not sentence_lengths:
         return {
@@ -48,4 +45,92 @@ def analyze_sentence_complexity(text: str) -> dict:
         'word_count': sum(sentence_lengths),
         'average_sentence_length': round(avg_len, 2),
         'sentence_length_variance': round(var_len, 2)
-    } 
\ No newline at end of file
+    } 
+
+def sentence_length_stats(analyzed) -> dict:
+    """Summarize sentence lengths as count, total, mean and sum of squared deviations.
+
+    Args:
+        analyzed (AnalyzedDocument): Pre-tokenized document or chunk
+
+    Returns:
+        dict: Mergeable sentence length statistics
+    """
+    sentence_lengths = [len(tokens) for tokens in analyzed.sentence_tokens]
+    if not sentence_lengths:
+        return {'n': 0, 'total': 0, 'mean': 0.0, 'm2': 0.0}
+    avg_len = mean(sentence_lengths)
+    return {
+        'n': len(sentence_lengths),
+        'total': sum(sentence_lengths),
+        'mean': avg_len,
+        'm2': sum((length - avg_len) ** 2 for length in sentence_lengths)
+    }
+
+
+def merge_sentence_length_stats(first: dict, second: dict) -> dict:
+    """Combine two sentence length summaries (Chan et al. parallel variance).
+
+    Args:
+        first (dict): Statistics of one chunk
+        second (dict): Statistics of another chunk
+
+    Returns:
+        dict: Statistics equal to those of the concatenated chunks
+    """
+    n = first['n'] + second['n']
+    if n == 0:
+        return {'n': 0, 'total': 0, 'mean': 0.0, 'm2': 0.0}
+    delta = second['mean'] - first['mean']
+    return {
+        'n': n,
+        'total': first['total'] + second['total'],
+        'mean': first['mean'] + delta * second['n'] / n,
+        'm2': first['m2'] + second['m2'] + delta ** 2 * first['n'] * second['n'] / n
+    }
+
+
+def sentence_complexity_from_stats(stats: dict) -> dict:
+    """Build the sentence complexity result from (merged) statistics.
+
+    Args:
+        stats (dict): Output of sentence_length_stats or merge_sentence_length_stats
+
+    Returns:
+        dict: Average sentence length, variance, sentence count, word count
+    """
+    n = stats['n']
+    return {
+        'sentence_count': n,
+        'word_count': stats['total'],
+        'average_sentence_length': round(stats['mean'], 2) if n else 0.0,
+        'sentence_length_variance': round(stats['m2'] / (n - 1), 2) if n > 1 else 0.0
+    }
+
+
+def analyze_sentence_complexity_stream(blocks) -> dict:
+    """Compute sentence complexity metrics over an iterable of text blocks.
+
+    Only the running count, mean and squared deviation are kept, so memory
+    does not grow with the number of blocks.
+
+    Args:
+        blocks (iterable): Paragraph blocks, e.g. from ingestion.iter_text_blocks
+
+    Returns:
+        dict: Average sentence length, variance, sentence count, word count
+    """
+    stats = {'n': 0, 'total': 0, 'mean': 0.0, 'm2': 0.0}
+    for block in blocks:
+        lengths = [len(tokenize.word_tokenize(s)) for s in tokenize.sent_tokenize(block) if s.strip()]
+        if not lengths:
+            continue
+        block_mean = mean(lengths)
+        block_stats = {
+            'n': len(lengths),
+            'total': sum(lengths),
+            'mean': block_mean,
+            'm2': sum((length - block_mean) ** 2 for length in lengths)
+        }
+        stats = merge_sentence_length_stats(stats, block_stats)
+    return sentence_complexity_from_stats(stats)
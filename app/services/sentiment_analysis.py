@@ -1,19 +1,200 @@
-import nltk
+import string
+
+import numpy as np
+from nltk import tokenize
 from nltk.sentiment import SentimentIntensityAnalyzer
-import os
 
-# Ensure VADER lexicon is downloaded
-def ensure_nltk_data():
-    """Ensure required NLTK data is available"""
-    try:
-        nltk.data.find('vader_lexicon')
-    except LookupError:
-        nltk.download('vader_lexicon', quiet=True)
+from app.core.config import Config
+
+# Columns of a scored sentence batch
+_COMPOUND, _POSITIVE, _NEGATIVE, _NEUTRAL = range(4)
+_SCORE_KEYS = ('compound', 'positive', 'negative', 'neutral')
+# Histogram of sentence compound scores: ten bins of width 0.2 over [-1, 1]
+_HISTOGRAM_BINS = 10
+# Longest sentence text kept for the most positive/negative sentence
+_EXTREME_TEXT_CHARS = 200
+
+
+def _classify(compound):
+    if compound >= 0.05:
+        return 'positive'
+    if compound <= -0.05:
+        return 'negative'
+    return 'neutral'
+
+
+def iter_sentences(blocks):
+    """Split an iterable of paragraph blocks into sentences, one block at a time."""
+    for block in blocks:
+        for sentence in tokenize.sent_tokenize(block):
+            if sentence.strip():
+                yield sentence
+
+
+def _halve(buckets):
+    """Merge neighbouring [sentences, compound sum] arc buckets pairwise."""
+    return [
+        [sum(b[0] for b in pair), sum(b[1] for b in pair)]
+        for pair in (buckets[i:i + 2] for i in range(0, len(buckets), 2))
+    ]
+
+
+class SentimentStream:
+    """Running sentiment aggregates over sentences in document order.
+
+    Holds sums, class counts, a compound histogram, the two extreme
+    sentences and at most 2 * arc_points arc buckets, so memory does not
+    grow with the document. Streams of consecutive chunks merge exactly,
+    except that the arc buckets at the seam may be uneven.
+    """
+
+    def __init__(self, arc_points: int = None):
+        self.arc_points = arc_points or Config.SENTIMENT_ARC_POINTS
+        self.count = 0
+        self.sums = np.zeros(4)
+        self.classes = {'positive': 0, 'negative': 0, 'neutral': 0}
+        self.histogram = np.zeros(_HISTOGRAM_BINS, dtype=np.int64)
+        # (compound, sentence index, text) or None
+        self.most_positive = None
+        self.most_negative = None
+        # Arc buckets of [sentences, compound sum], each but the last holding bucket_width sentences
+        self.buckets = []
+        self.bucket_width = 1
+
+    def add(self, scores: np.ndarray, sentences: list):
+        """Add a batch of scored sentences (rows of compound, positive, negative, neutral)."""
+        if not len(scores):
+            return
+        compound = scores[:, _COMPOUND]
+        self.sums += scores.sum(axis=0)
+        self.classes['positive'] += int((compound >= 0.05).sum())
+        self.classes['negative'] += int((compound <= -0.05).sum())
+        self.classes['neutral'] = self.count + len(scores) - self.classes['positive'] - self.classes['negative']
+        self.histogram += np.histogram(compound, bins=_HISTOGRAM_BINS, range=(-1.0, 1.0))[0]
+
+        i = int(compound.argmax())
+        if compound[i] > 0 and (self.most_positive is None or compound[i] > self.most_positive[0]):
+            self.most_positive = (float(compound[i]), self.count + i, sentences[i][:_EXTREME_TEXT_CHARS])
+        i = int(compound.argmin())
+        if compound[i] < 0 and (self.most_negative is None or compound[i] < self.most_negative[0]):
+            self.most_negative = (float(compound[i]), self.count + i, sentences[i][:_EXTREME_TEXT_CHARS])
+
+        self._add_to_arc(compound)
+        self.count += len(scores)
+
+    def _add_to_arc(self, compound):
+        i = 0
+        while i < len(compound):
+            if not self.buckets or self.buckets[-1][0] >= self.bucket_width:
+                if len(self.buckets) >= 2 * self.arc_points:
+                    self._coarsen()
+                self.buckets.append([0, 0.0])
+            bucket = self.buckets[-1]
+            take = min(self.bucket_width - bucket[0], len(compound) - i)
+            bucket[0] += take
+            bucket[1] += float(compound[i:i + take].sum())
+            i += take
+
+    def _coarsen(self):
+        """Halve the arc resolution by merging neighbouring buckets."""
+        self.buckets = _halve(self.buckets)
+        self.bucket_width *= 2
+
+    def merge(self, other: 'SentimentStream'):
+        """Append the aggregates of the text that follows this stream's text."""
+        self.sums += other.sums
+        for key in self.classes:
+            self.classes[key] += other.classes[key]
+        self.histogram += other.histogram
+        if other.most_positive and (self.most_positive is None or other.most_positive[0] > self.most_positive[0]):
+            self.most_positive = (other.most_positive[0], self.count + other.most_positive[1], other.most_positive[2])
+        if other.most_negative and (self.most_negative is None or other.most_negative[0] < self.most_negative[0]):
+            self.most_negative = (other.most_negative[0], self.count + other.most_negative[1], other.most_negative[2])
+
+        other_buckets, other_width = other.buckets, other.bucket_width
+        while self.bucket_width < other_width:
+            self._coarsen()
+        while other_width < self.bucket_width:
+            other_buckets = _halve(other_buckets)
+            other_width *= 2
+        self.buckets.extend(list(b) for b in other_buckets)
+        while len(self.buckets) > 2 * self.arc_points:
+            self._coarsen()
+        self.count += other.count
+        return self
+
+    def arc(self) -> list:
+        """Mean compound score of up to arc_points consecutive stretches of the document.
+
+        Returns:
+            list: Points with 'position' (stretch midpoint as a fraction of
+                the sentences), 'sentence' (first sentence index) and 'compound'
+        """
+        # Regroup the buckets into arc_points equal stretches by their midpoints;
+        # buckets are never wider than a stretch, so none comes out empty
+        groups = {}
+        start = 0
+        for sentences, total in self.buckets:
+            group = min(int((start + sentences / 2) * self.arc_points / self.count), self.arc_points - 1)
+            first, size, compound = groups.get(group, (start, 0, 0.0))
+            groups[group] = (first, size + sentences, compound + total)
+            start += sentences
+        return [
+            {
+                'position': round((first + size / 2) / self.count, 3),
+                'sentence': first,
+                'compound': round(compound / size, 3),
+            }
+            for first, size, compound in groups.values()
+        ]
+
+    def to_dict(self) -> dict:
+        """JSON serializable state, e.g. a chunk's partial result."""
+        return {
+            'arc_points': self.arc_points,
+            'count': self.count,
+            'sums': self.sums.tolist(),
+            'classes': dict(self.classes),
+            'histogram': self.histogram.tolist(),
+            'most_positive': self.most_positive,
+            'most_negative': self.most_negative,
+            'buckets': self.buckets,
+            'bucket_width': self.bucket_width,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'SentimentStream':
+        stream = cls(state['arc_points'])
+        stream.count = state['count']
+        stream.sums = np.asarray(state['sums'], dtype=float)
+        stream.classes = dict(state['classes'])
+        stream.histogram = np.asarray(state['histogram'], dtype=np.int64)
+        stream.most_positive = tuple(state['most_positive']) if state['most_positive'] else None
+        stream.most_negative = tuple(state['most_negative']) if state['most_negative'] else None
+        stream.buckets = [list(b) for b in state['buckets']]
+        stream.bucket_width = state['bucket_width']
+        return stream
+
 
 class SentimentAnalyzer:
     def __init__(self):
-        ensure_nltk_data()
-        self.analyzer = SentimentIntensityAnalyzer()
+        self._analyzer = None
+        self._lexicon_words = None
+    
+    @property
+    def analyzer(self):
+        """VADER analyzer, loaded on first use (the lexicon is installed by app.download_models)"""
+        if self._analyzer is None:
+            self._analyzer = SentimentIntensityAnalyzer()
+        return self._analyzer
+
+    def load(self):
+        """Load the VADER analyzer now instead of on first use"""
+        return self.analyzer
+    
+    @property
+    def is_loaded(self):
+        return self._analyzer is not None
     
     def analyze_sentiment(self, text):
         """
@@ -37,34 +218,134 @@ class SentimentAnalyzer:
         # Get sentiment scores
         scores = self.analyzer.polarity_scores(text)
         
-        # Classify based on compound score
-        if scores['compound'] >= 0.05:
-            classification = 'positive'
-        elif scores['compound'] <= -0.05:
-            classification = 'negative'
-        else:
-            classification = 'neutral'
-        
         return {
             'compound': round(scores['compound'], 3),
             'positive': round(scores['pos'], 3),
             'negative': round(scores['neg'], 3),
             'neutral': round(scores['neu'], 3),
-            'classification': classification
+            'classification': _classify(scores['compound'])
         }
     
-    def get_sentiment_summary(self, text):
+    def get_sentiment_summary(self, text, sentences=None):
         """
         Get a summary of sentiment analysis including additional metrics
         
+        Sentences are scored one by one; the document scores are their means.
+        
         Args:
             text (str): Text to analyze
+            sentences (list, optional): Sentences of text if already split, e.g. AnalyzedDocument.sentences
             
         Returns:
             dict: Comprehensive sentiment analysis results
         """
-        sentiment = self.analyze_sentiment(text)
+        if sentences is None:
+            sentences = iter_sentences([text] if isinstance(text, str) else [])
+        return self.summarize_stream(self.analyze_sentences(sentences))
+
+    def get_sentiment_summary_stream(self, blocks):
+        """
+        Get a sentiment summary from an iterable of text blocks
+        
+        Blocks are split into sentences as they arrive and only running
+        aggregates are kept, so memory stays constant in document length.
+        
+        Args:
+            blocks (iterable): Paragraph blocks, e.g. from ingestion.iter_text_blocks
+            
+        Returns:
+            dict: Comprehensive sentiment analysis results
+        """
+        return self.summarize_stream(self.analyze_sentences(iter_sentences(blocks)))
+
+    @property
+    def lexicon_words(self):
+        """Words VADER has a valence for, as a set for fast membership tests"""
+        if self._lexicon_words is None:
+            self._lexicon_words = frozenset(self.analyzer.lexicon)
+        return self._lexicon_words
+
+    def score_sentences(self, sentences):
+        """
+        Score a batch of sentences with VADER
         
+        Sentences that contain no lexicon word get no valence from VADER, so
+        they are recognised with one set lookup and skipped; non-ASCII
+        sentences always go through VADER, which translates emoji.
+        
+        Args:
+            sentences (list): Sentences to score
+            
+        Returns:
+            np.ndarray: One row per sentence of compound, positive, negative and neutral scores
+        """
+        scores = np.zeros((len(sentences), 4))
+        scores[:, _NEUTRAL] = 1.0
+        lexicon = self.lexicon_words
+        for i, sentence in enumerate(sentences):
+            if sentence.isascii():
+                words = sentence.lower().split()
+                if lexicon.isdisjoint(words) and lexicon.isdisjoint(w.strip(string.punctuation) for w in words):
+                    continue
+            polarity = self.analyzer.polarity_scores(sentence)
+            scores[i] = (polarity['compound'], polarity['pos'], polarity['neg'], polarity['neu'])
+        return scores
+
+    def analyze_sentences(self, sentences, stream=None, batch_size=None):
+        """
+        Score sentences in batches and fold them into a running SentimentStream
+        
+        Args:
+            sentences (iterable): Sentences in document order
+            stream (SentimentStream, optional): Stream to continue. Defaults to a new one.
+            batch_size (int, optional): Sentences per batch. Defaults to Config.SENTIMENT_BATCH_SENTENCES.
+            
+        Returns:
+            SentimentStream: The updated stream
+        """
+        stream = stream or SentimentStream()
+        batch_size = batch_size or Config.SENTIMENT_BATCH_SENTENCES
+        batch = []
+        for sentence in sentences:
+            batch.append(sentence)
+            if len(batch) >= batch_size:
+                stream.add(self.score_sentences(batch), batch)
+                batch = []
+        if batch:
+            stream.add(self.score_sentences(batch), batch)
+        return stream
+
+    def summarize_stream(self, stream):
+        """
+        Build the document-level summary from a SentimentStream
+        
+        Args:
+            stream (SentimentStream): Aggregates of all sentences of the document
+            
+        Returns:
+            dict: Comprehensive sentiment analysis results, with the sentence
+                distribution, extremes and the sentiment arc
+        """
+        means = stream.sums / (stream.count or 1)
+        if not stream.count:
+            means[_NEUTRAL] = 0.0
+        sentiment = {key: round(float(means[i]), 3) for i, key in enumerate(_SCORE_KEYS)}
+        sentiment['classification'] = _classify(sentiment['compound'])
+        summary = self._summarize(sentiment)
+        
+        summary['sentence_count'] = stream.count
+        summary['sentence_distribution'] = {
+            key: round(count / (stream.count or 1), 3) for key, count in stream.classes.items()
+        }
+        summary['compound_histogram'] = stream.histogram.tolist()
+        summary['extremes'] = {
+            name: {'sentence': extreme[1], 'compound': round(extreme[0], 3), 'text': extreme[2]} if extreme else None
+            for name, extreme in (('most_positive', stream.most_positive), ('most_negative', stream.most_negative))
+        }
+        summary['sentiment_arc'] = stream.arc()
+        return summary
+    
+    def _summarize(self, sentiment):
         # Calculate confidence level based on compound score
         confidence = abs(sentiment['compound'])
         if confidence >= 0.5:
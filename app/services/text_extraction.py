@@ -0,0 +1,150 @@
+import os
+import uuid
+import zipfile
+import posixpath
+from urllib.parse import unquote
+from html.parser import HTMLParser
+from xml.etree import ElementTree
+
+from pypdf import PdfReader
+
+EXTRACTED_SUFFIX = '.extracted.txt'
+
+
+class ExtractionError(Exception):
+    """Raised when text cannot be extracted from an uploaded file."""
+
+
+class _XHTMLText(HTMLParser):
+    """Collect the visible text of an XHTML chapter, one paragraph per block element."""
+    _BLOCK_TAGS = {'p', 'div', 'br', 'li', 'tr', 'section', 'blockquote', 'pre',
+                   'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    _SKIP_TAGS = {'script', 'style', 'head', 'title'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip += 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append('\n\n')
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS:
+            self._skip = max(self._skip - 1, 0)
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append('\n\n')
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def _paragraphs(text: str):
+    """Split raw text on blank lines and collapse whitespace inside each paragraph."""
+    for paragraph in text.split('\n\n'):
+        paragraph = ' '.join(paragraph.split())
+        if paragraph:
+            yield paragraph
+
+
+def iter_epub_chapters(path: str):
+    """Yield the plain text of each EPUB chapter in reading (spine) order.
+
+    Only one chapter is decompressed and parsed at a time.
+    """
+    try:
+        with zipfile.ZipFile(path) as epub:
+            container = ElementTree.fromstring(epub.read('META-INF/container.xml'))
+            rootfile = container.find('.//{*}rootfile')
+            if rootfile is None:
+                raise ExtractionError('EPUB container has no rootfile')
+            opf_path = rootfile.get('full-path')
+            opf = ElementTree.fromstring(epub.read(opf_path))
+            opf_dir = posixpath.dirname(opf_path)
+
+            manifest = {item.get('id'): item.get('href') for item in opf.findall('.//{*}item')}
+            for itemref in opf.findall('.//{*}itemref'):
+                href = manifest.get(itemref.get('idref'))
+                if not href:
+                    continue
+                chapter = epub.read(posixpath.normpath(posixpath.join(opf_dir, unquote(href))))
+                parser = _XHTMLText()
+                parser.feed(chapter.decode('utf-8', errors='replace'))
+                parser.close()
+                yield ''.join(parser.parts)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise ExtractionError(f'Invalid EPUB file: {str(e)}') from e
+
+
+def iter_pdf_pages(path: str):
+    """Yield the text of each PDF page in order; pages are parsed lazily one at a time."""
+    try:
+        reader = PdfReader(path)
+        for page in reader.pages:
+            yield page.extract_text() or ''
+    except Exception as e:
+        raise ExtractionError(f'Invalid PDF file: {str(e)}') from e
+
+
+_EXTRACTORS = {
+    '.epub': iter_epub_chapters,
+    '.pdf': iter_pdf_pages,
+}
+
+
+def extract_to_file(path: str, output_path: str) -> int:
+    """Stream the text of a PDF or EPUB into a UTF-8 text file, paragraph by paragraph.
+
+    Args:
+        path (str): Source document
+        output_path (str): Destination text file
+
+    Returns:
+        int: Number of pages or chapters processed
+    """
+    extractor = _EXTRACTORS[os.path.splitext(path)[1].lower()]
+    units = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for unit in extractor(path):
+            units += 1
+            for paragraph in _paragraphs(unit):
+                out.write(paragraph)
+                out.write('\n\n')
+    return units
+
+
+def get_text_path(path: str) -> str:
+    """Return a UTF-8 text file with the content of an uploaded document.
+
+    Plain text files are returned as is. PDF and EPUB files are extracted
+    once into a sidecar file next to the upload, which later tasks reuse.
+
+    Args:
+        path (str): Path of the uploaded file
+
+    Returns:
+        str: Path of a UTF-8 text file
+    """
+    if os.path.splitext(path)[1].lower() not in _EXTRACTORS:
+        return path
+
+    sidecar = path + EXTRACTED_SUFFIX
+    if os.path.exists(sidecar):
+        return sidecar
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    # Write to a private temp file so concurrent tasks never see a partial sidecar
+    tmp_path = f'{sidecar}.{uuid.uuid4().hex}.tmp'
+    try:
+        units = extract_to_file(path, tmp_path)
+        os.replace(tmp_path, sidecar)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"Extracted {units} pages/chapters from {path}")
+    return sidecar
@@ -0,0 +1,88 @@
+import numpy as np
+from nltk import tokenize
+from typing import NamedTuple
+from functools import cached_property
+from dataclasses import dataclass, field
+
+from app.services.word_features import word_features
+
+# NLTK data is installed ahead of time by app.download_models; see
+# app.utils.nltk_data for the readiness check.
+
+
+class WordFeatures(NamedTuple):
+    """Per-word features as parallel NumPy arrays, one entry per word."""
+    syllables: np.ndarray
+    letters: np.ndarray
+    polysyllable: np.ndarray
+    easy: np.ndarray
+    sentence_index: np.ndarray
+
+
+@dataclass
+class AnalyzedDocument:
+    """Text segmented once into sentences, tokens and per-word features.
+
+    Every analyzer that needs sentence or word level information reads it from
+    here instead of re-tokenizing the raw text.
+    """
+    text: str
+    sentences: list = field(default_factory=list)
+    sentence_tokens: list = field(default_factory=list)
+    words: list = field(default_factory=list)
+    syllables: list = field(default_factory=list)
+    easy_words: list = field(default_factory=list)
+    sentence_word_offsets: list = field(default_factory=list)
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentences)
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @cached_property
+    def features(self) -> WordFeatures:
+        """Word features as arrays, built once for vectorized readability formulas."""
+        syllables = np.asarray(self.syllables, dtype=np.int32)
+        offsets = np.asarray(self.sentence_word_offsets + [len(self.words)], dtype=np.int64)
+        return WordFeatures(
+            syllables=syllables,
+            letters=np.fromiter(map(len, self.words), dtype=np.int32, count=len(self.words)),
+            polysyllable=syllables >= 3,
+            easy=np.asarray(self.easy_words, dtype=bool),
+            sentence_index=np.repeat(np.arange(len(self.sentences)), np.diff(offsets)),
+        )
+
+
+def analyze_document(text: str) -> AnalyzedDocument:
+    """Segment text into sentences, tokens and words in a single pass.
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        AnalyzedDocument: Shared structure consumed by the analyzers
+    """
+    analyzed = AnalyzedDocument(text=text if isinstance(text, str) else '')
+    if not analyzed.text.strip():
+        return analyzed
+
+    for sentence in tokenize.sent_tokenize(analyzed.text):
+        if not sentence.strip():
+            continue
+        tokens = tokenize.word_tokenize(sentence)
+        analyzed.sentences.append(sentence)
+        analyzed.sentence_tokens.append(tokens)
+        analyzed.sentence_word_offsets.append(len(analyzed.words))
+        for token in tokens:
+            if not token.isalpha():
+                continue
+            word = token.lower()
+            feature = word_features(word)
+            analyzed.words.append(word)
+            analyzed.syllables.append(feature.syllables)
+            analyzed.easy_words.append(feature.easy)
+
+    return analyzed
@@ -0,0 +1,135 @@
+"""Process-wide cache of per-word features for the readability pipeline.
+
+Syllable counts and Dale-Chall lookups are the expensive part of scoring a
+word, and most of a corpus shares a small vocabulary, so features are
+computed once per normalized word and kept in a bounded LRU cache.
+
+Optionally a prebuilt table of common words (see build_table) is memory
+mapped from Config.WORD_FEATURE_TABLE, so a fresh worker process starts
+warm instead of recomputing the same 100k words:
+
+    python -m app.services.word_features words.txt data/word_features.npy
+
+where words.txt lists one word per line, most frequent first.
+"""
+import os
+import sys
+from typing import NamedTuple
+from functools import lru_cache
+
+import numpy as np
+import textstat
+
+from app.core.config import Config
+
+# Words longer than this are never stored in the table; they are still cached
+_TABLE_WORD_BYTES = 32
+TABLE_DTYPE = np.dtype([('word', f'S{_TABLE_WORD_BYTES}'), ('syllables', 'u1'), ('easy', '?')])
+
+
+class WordFeature(NamedTuple):
+    syllables: int
+    length: int
+    polysyllable: bool
+    easy: bool
+
+
+_table = None
+_table_loaded = False
+_table_hits = 0
+
+
+def compute_features(word: str) -> WordFeature:
+    """Compute the features of a lowercased word with textstat."""
+    syllables = textstat.syllable_count(word)
+    easy = not textstat.is_difficult_word(word, syllable_threshold=0)
+    return WordFeature(syllables, len(word), syllables >= 3, easy)
+
+
+def load_table(path: str) -> int:
+    """Memory map a table written by build_table; returns its number of words."""
+    global _table, _table_loaded
+    table = np.load(path, mmap_mode='r')
+    if table.dtype != TABLE_DTYPE:
+        raise ValueError(f'{path} is not a word feature table')
+    _table = table
+    _table_loaded = True
+    return len(table)
+
+
+def _from_table(word: str):
+    global _table_loaded
+    if not _table_loaded:
+        # Warm start on first use, so processes that never score text skip it
+        _table_loaded = True
+        if Config.WORD_FEATURE_TABLE and os.path.exists(Config.WORD_FEATURE_TABLE):
+            load_table(Config.WORD_FEATURE_TABLE)
+    if _table is None:
+        return None
+    key = word.encode('utf-8')
+    if len(key) > _TABLE_WORD_BYTES:
+        return None
+    words = _table['word']
+    i = int(np.searchsorted(words, key))
+    if i == len(words) or words[i] != key:
+        return None
+    syllables = int(_table['syllables'][i])
+    return WordFeature(syllables, len(word), syllables >= 3, bool(_table['easy'][i]))
+
+
+@lru_cache(maxsize=Config.WORD_FEATURE_CACHE_SIZE)
+def word_features(word: str) -> WordFeature:
+    """Features of a lowercased word, from the cache, the warm-start table or textstat."""
+    global _table_hits
+    feature = _from_table(word)
+    if feature is not None:
+        _table_hits += 1
+        return feature
+    return compute_features(word)
+
+
+def lookup_counts() -> tuple:
+    """Cumulative (hits, misses, table hits) of the in-memory cache in this process.
+
+    Table hits are the misses answered by the warm-start table instead of
+    being computed; /metrics reports them with the hit rate.
+    """
+    info = word_features.cache_info()
+    return info.hits, info.misses, _table_hits
+
+
+def build_table(words, path: str, limit: int = 100_000) -> int:
+    """Compute features for the first limit distinct words and save them as a table.
+
+    Args:
+        words (iterable): Words, most frequent first
+        path (str): Output .npy file
+        limit (int, optional): Maximum number of words. Defaults to 100_000.
+
+    Returns:
+        int: Number of words written
+    """
+    seen = {}
+    for word in words:
+        word = word.strip().lower()
+        if not word.isalpha() or word in seen or len(word.encode('utf-8')) > _TABLE_WORD_BYTES:
+            continue
+        seen[word] = compute_features(word)
+        if len(seen) >= limit:
+            break
+
+    table = np.zeros(len(seen), dtype=TABLE_DTYPE)
+    for i, word in enumerate(sorted(seen, key=lambda w: w.encode('utf-8'))):
+        table[i] = (word.encode('utf-8'), seen[word].syllables, seen[word].easy)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.save(path, table)
+    return len(table)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('Usage: python -m app.services.word_features <words.txt> <output.npy>')
+        sys.exit(2)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        count = build_table(f, sys.argv[2])
+    print(f"Wrote features of {count} words to {sys.argv[2]}")
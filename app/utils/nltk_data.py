@@ -0,0 +1,29 @@
+import nltk
+
+# NLTK resources used by the analyzers, mapped to their nltk.data paths
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+}
+
+
+def missing_nltk_data() -> list:
+    """Return the names of required NLTK resources that are not installed.
+
+    This only looks at the local data directories and never downloads.
+    """
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+
+def download_nltk_data():
+    """Download every required NLTK resource. Meant for build time only."""
+    for name in NLTK_RESOURCES:
+        nltk.download(name, quiet=True)
@@ -0,0 +1,15 @@
+from functools import lru_cache
+
+import redis
+
+from app.core.config import Config
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    """Client for Config.REDIS_URL, shared by every service in the process.
+
+    Connections are made lazily and the pool checks the process ID, so the
+    client is safe to create before a worker forks.
+    """
+    return redis.Redis.from_url(Config.REDIS_URL)
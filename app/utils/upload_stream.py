@@ -0,0 +1,40 @@
+import os
+import hashlib
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+def save_and_hash(file_storage, path: str, chunk_size: int = 1024 * 1024, max_bytes: int = None) -> str:
+    """Stream an uploaded file to disk and hash it in the same pass.
+
+    Only one chunk is held in memory at a time. If the upload grows past
+    max_bytes, the partial file is removed and UploadTooLarge is raised.
+
+    Args:
+        file_storage (FileStorage): Uploaded file from request.files, or any
+            readable binary stream such as a zip archive member
+        path (str): Destination path
+        chunk_size (int, optional): Bytes read per iteration. Defaults to 1 MiB.
+        max_bytes (int, optional): Maximum accepted size. Defaults to no limit.
+
+    Returns:
+        str: Hex encoded SHA-256 of the file content
+    """
+    stream = getattr(file_storage, 'stream', file_storage)
+    digest = hashlib.sha256()
+    written = 0
+    with open(path, 'wb') as f:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            written += len(chunk)
+            if max_bytes is not None and written > max_bytes:
+                f.close()
+                os.remove(path)
+                raise UploadTooLarge(f'File exceeds the {max_bytes} byte limit')
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
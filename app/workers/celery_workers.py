@@ -1,14 +1,37 @@
-from app import create_app, db
-from app.models.db import Document
-from celery import Celery
+import os
+from datetime import datetime, timedelta, timezone
+import redis
+from sqlalchemy import exists
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models.db import Document, AnalysisResult
+from celery import Celery, chord
+from celery.utils.time import get_exponential_backoff_interval
 from app.core.config import Config
+from app.workers.lifecycle import get_app, readiness
+from app.workers.pools import LIGHT_QUEUE, NER_QUEUE, SUMMARY_QUEUE, route_task, configure_worker_pool, analysis_queue
 from app.services.sentiment_analysis import sentiment_analyzer
-import textstat
-from app.services.sentence_complexity import analyze_sentence_complexity
-from app.services.lexical_diversity import analyze_lexical_diversity
-from app.services.named_entity_recognition import analyze_named_entities
-from app.services.keyword_extraction import extract_keywords
-from app.services.auto_summarization import generate_summary
+from app.services.text_pipeline import analyze_document
+from app.services.word_features import lookup_counts
+from app.services.readability import calculate_readability_metrics as compute_readability_metrics
+from app.services.sentence_complexity import analyze_sentence_complexity, analyze_sentence_complexity_stream
+from app.services.lexical_diversity import analyze_lexical_diversity, analyze_lexical_diversity_stream
+from app.services.model_server import named_entities, summaries, ModelServerUnavailable
+from app.services.keyword_extraction import extract_keywords, extract_keywords_stream
+from app.services.corpus_index import add_document, document_words
+from app.services.result_cache import get_cached_results, record_analyzer_lookups, store_results
+from app.services.ingestion import iter_text_blocks, read_text_head
+from app.services.text_extraction import get_text_path, ExtractionError
+from app.services.analysis_plan import ANALYZERS, build_plan, document_status
+from app.services.result_store import save_results, finished_analyzers, segment_name
+from app.services.segmentation import plan_segments
+from app.services.job_events import publish_status
+from app.services.metrics import instrument, count_input, counted_blocks
+from app.services.chunked_analysis import plan_chunks, read_chunk, analyze_chunk, merge_chunk_results
+from app.services.checkpoints import (
+    partial_key, load_partial, save_partial, start_attempt, clear_attempts, claim_requeue,
+    claim_in_flight, renew_in_flight, clear_in_flight, in_flight
+)
 
 celery = Celery(
     'wordlens',
@@ -16,217 +39,674 @@ celery = Celery(
     backend=Config.CELERY_RESULT_BACKEND
 )
 
-celery.conf.task_routes = {
-    'app.workers.celery_workers.text_analysis_service': {'queue': 'celery'},
-    'app.workers.celery_workers.readability_service': {'queue': 'celery'},  # backward compatibility
-    'app.workers.celery_workers.sentence_complexity_service': {'queue': 'celery'},
-    'app.workers.celery_workers.lexical_diversity_service': {'queue': 'celery'},
-    'app.workers.celery_workers.ner_service': {'queue': 'celery'},
-    'app.workers.celery_workers.keyword_extraction_service': {'queue': 'celery'},
-    'app.workers.celery_workers.auto_summarization_service': {'queue': 'celery'},
+# Tasks whose queue depends on their arguments go through route_task;
+# the rest have a fixed queue (see app.workers.pools)
+celery.conf.task_routes = (route_task, {
+    'app.workers.celery_workers.text_analysis_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.readability_service': {'queue': LIGHT_QUEUE},  # backward compatibility
+    'app.workers.celery_workers.sentence_complexity_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.lexical_diversity_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.sentiment_analysis_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.ner_service': {'queue': NER_QUEUE},
+    'app.workers.celery_workers.keyword_extraction_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.auto_summarization_service': {'queue': SUMMARY_QUEUE},
+    'app.workers.celery_workers.merge_chunks_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.batch_analysis_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.worker_readiness_service': {'queue': LIGHT_QUEUE},
+    'app.workers.celery_workers.reap_stuck_documents_service': {'queue': LIGHT_QUEUE},
+})
+configure_worker_pool(celery, Config.WORKER_POOL)
+
+# Acknowledge tasks only once they finish, so the task of a worker that is
+# OOM-killed or restarted is delivered again instead of lost; reruns resume
+# from the checkpoints (see app.services.checkpoints)
+celery.conf.task_acks_late = True
+celery.conf.task_reject_on_worker_lost = True
+celery.conf.broker_transport_options = {'visibility_timeout': Config.TASK_VISIBILITY_TIMEOUT_SECONDS}
+# Requeues stuck documents; needs `celery -A app.workers.celery_workers beat`
+celery.conf.beat_schedule = {
+    'reap-stuck-documents': {
+        'task': 'app.workers.celery_workers.reap_stuck_documents_service',
+        'schedule': Config.REAPER_INTERVAL_SECONDS,
+    },
 }
 
-def calculate_readability_metrics(text):
+# Failures worth retrying: the service or connection is expected to come back.
+# A model server that answers with an error, or not within
+# MODEL_SERVER_TIMEOUT_SECONDS, fails the analyzer instead; a retry would
+# queue the same work again behind the run it is still busy with
+_TRANSIENT_ERRORS = (ModelServerUnavailable, redis.RedisError, OperationalError)
+
+def calculate_readability_metrics(text, analyzed=None):
     """Calculate comprehensive readability metrics for the text"""
+    if analyzed is None:
+        analyzed = analyze_document(text)
+    return compute_readability_metrics(analyzed)
+
+class _AnalysisContext:
+    """Text of one document plus its shared tokenization, built on first use"""
+
+    def __init__(self, text):
+        self.text = text
+        self._analyzed = None
+        self.metrics = {}
+
+    def tokenize(self):
+        """Tokenize the text unless that has been done already; returns the AnalyzedDocument"""
+        if self._analyzed is None:
+            with instrument('tokenize') as record:
+                before = lookup_counts()
+                self._analyzed = analyze_document(self.text)
+                after = lookup_counts()
+                record['characters'] = len(self.text)
+                record['tokens'] = self._analyzed.word_count
+                record['word_cache_hits'] = after[0] - before[0]
+                record['word_cache_misses'] = after[1] - before[1]
+                record['word_table_hits'] = after[2] - before[2]
+            self.metrics['tokenize'] = record
+        return self._analyzed
+
+    @property
+    def sentences(self):
+        """Sentences of the text if it has been tokenized already, else None"""
+        return self._analyzed.sentences if self._analyzed is not None else None
+
+    @property
+    def words(self):
+        """Words of the text if it has been tokenized already, else None"""
+        return self._analyzed.words if self._analyzed is not None else None
+
+
+# Analyzer name (see analysis_plan.ANALYZERS) -> how to run it
+_RUNNERS = {
+    'readability_analysis': lambda ctx: calculate_readability_metrics(ctx.text, ctx.tokenize()),
+    'sentence_complexity': lambda ctx: analyze_sentence_complexity(ctx.text, ctx.tokenize()),
+    'lexical_diversity': lambda ctx: analyze_lexical_diversity(ctx.text, ctx.tokenize()),
+    'keyword_extraction': lambda ctx: extract_keywords(ctx.text),
+    'sentiment_analysis': lambda ctx: sentiment_analyzer.get_sentiment_summary(ctx.text, ctx.sentences),
+    'named_entity_recognition': lambda ctx: named_entities([ctx.text])[0],
+    'auto_summarization': lambda ctx: summaries([ctx.text])[0],
+}
+
+
+def _run_analyzers(doc, text, analyzers, ctx=None, checkpoint=False):
+    """
+    Run the named analyzers over text, reusing cached results that are still
+    current. With checkpoint, each result is stored as soon as it is ready
+    so a rerun after a crash skips it
+    """
+    cached = get_cached_results(doc.content_hash)
+    record_analyzer_lookups(cached, analyzers)
+
+    ctx = ctx or _AnalysisContext(text)
+    if any('tokenize' in ANALYZERS[name]['requires'] for name in analyzers if name not in cached):
+        # Tokenize up front so its cost is measured on its own, not in the first analyzer
+        ctx.tokenize()
+    # Untokenized text only goes to model analyzers, whose cost dwarfs one split of it
+    tokens = len(ctx.words) if ctx.words is not None else len(text.split())
+    input_size = {'characters': len(text), 'tokens': tokens}
+    results = {}
+    for name in analyzers:
+        if name in cached:
+            results[name] = cached[name]
+            continue
+        try:
+            with instrument(name) as record:
+                record.update(input_size)
+                results[name] = _RUNNERS[name](ctx)
+        except _TRANSIENT_ERRORS:
+            raise
+        except Exception as e:
+            results[name] = {'error': f'Unexpected error during analysis: {str(e)}'}
+        ctx.metrics[name] = record
+        if checkpoint:
+            _save_results(doc.id, {name: results[name], 'analysis_metrics': {name: record}})
+    if ctx.metrics:
+        results['analysis_metrics'] = ctx.metrics
+    return results
+
+
+def _requested(doc):
+    """Analyzers requested for a document; documents from before analysis plans get all"""
+    return doc.requested_analyses or list(ANALYZERS)
+
+
+def _finished(results):
+    """Analyzer name -> whether it failed, for results that are about to be stored"""
+    return {name: isinstance(result, dict) and 'error' in result for name, result in results.items()}
+
+
+def _completed(file_id):
+    """Analyzers with a stored, successful result, e.g. from an earlier interrupted run"""
+    return {name for name, failed in finished_analyzers(file_id).items() if not failed}
+
+
+def _retry(task, exc):
+    """Retry a task after a transient error with exponential backoff; returns when no retries are left"""
+    if task.request.retries >= task.max_retries:
+        return
+    countdown = get_exponential_backoff_interval(
+        Config.TASK_RETRY_BACKOFF_SECONDS, task.request.retries, Config.TASK_RETRY_BACKOFF_MAX_SECONDS, full_jitter=True
+    )
+    print(f"{task.name} retry {task.request.retries + 1} in {countdown}s after: {str(exc)}")
+    raise task.retry(exc=exc, countdown=countdown)
+
+
+def _index_document(file_id, text, results, words=None, path=None):
+    """
+    Add a document to the corpus similarity index; a failure only loses the
+    index entry. Without text or words, the words are streamed from path
+    """
+    if not Config.CORPUS_INDEX_DIR:
+        return
+    keywords = results.get('keyword_extraction') or {}
     try:
-        word_count = len(text.split())
-        sentence_count = textstat.sentence_count(text)
-        
-        readability_metrics = {
-            'word_count': word_count,
-            'sentence_count': sentence_count,
-            'character_count': len(text),
-            'avg_words_per_sentence': round(word_count / max(sentence_count, 1), 2),
-            'flesch_reading_ease': round(textstat.flesch_reading_ease(text), 2),
-            'flesch_kincaid_grade': round(textstat.flesch_kincaid_grade(text), 2),
-            'gunning_fog': round(textstat.gunning_fog(text), 2),
-            'automated_readability_index': round(textstat.automated_readability_index(text), 2),
-            'coleman_liau_index': round(textstat.coleman_liau_index(text), 2),
-            'linsear_write_formula': round(textstat.linsear_write_formula(text), 2),
-            'dale_chall_readability_score': round(textstat.dale_chall_readability_score(text), 2)
-        }
-        
-        # Add reading level interpretation
-        flesch_score = readability_metrics['flesch_reading_ease']
-        if flesch_score >= 90:
-            reading_level = 'Very Easy'
-        elif flesch_score >= 80:
-            reading_level = 'Easy'
-        elif flesch_score >= 70:
-            reading_level = 'Fairly Easy'
-        elif flesch_score >= 60:
-            reading_level = 'Standard'
-        elif flesch_score >= 50:
-            reading_level = 'Fairly Difficult'
-        elif flesch_score >= 30:
-            reading_level = 'Difficult'
-        else:
-            reading_level = 'Very Difficult'
-        
-        readability_metrics['reading_level'] = reading_level
-        
-        return readability_metrics
+        with instrument('corpus_index', text) as record:
+            if words is None and text is None:
+                words = [word for block in counted_blocks(iter_text_blocks(path), record)
+                         for word in document_words(block)]
+            add_document(file_id, words if words is not None else document_words(text), keywords.get('keywords', []))
     except Exception as e:
-        return {'error': f'Error calculating readability metrics: {str(e)}'}
+        print(f"Could not add document {file_id} to the corpus index: {str(e)}")
+
+
+def _save_results(file_id, results):
+    """Store analyzer results as their own rows, then update the document status under a row lock"""
+    save_results(file_id, results)
+    doc = db.session.get(Document, file_id, with_for_update=True, populate_existing=True)
+    doc.status = document_status(finished_analyzers(file_id), _requested(doc))
+    with instrument('db_commit'):
+        db.session.commit()
+    publish_status(doc.id, doc.status, results)
+    return doc
 
-@celery.task(name='app.workers.celery_workers.text_analysis_service')
-def text_analysis_service(file_id):
+
+@celery.task(bind=True, name='app.workers.celery_workers.text_analysis_service', max_retries=Config.TASK_MAX_RETRIES)
+def text_analysis_service(self, file_id, analyses=None):
     """
-    Combined task that performs both readability analysis and sentiment analysis
+    Run the analysis plan of a document. Cheap analyzers run in this task;
+    heavy ones (NER, summary) are queued as separate tasks so the cheap
+    results are stored as soon as they are ready. Analyzers stored by an
+    earlier, interrupted run are skipped
     """
-    # Create a new app context for this task
-    flask_app = create_app()
-    with flask_app.app_context():
+    # The app and DB engine are built once per worker process
+    with get_app().app_context():
         doc = Document.query.get(file_id)
         print(f"Processing document with ID: {doc.id}")
-        
+        attempt = start_attempt('text_analysis', doc.id)
+        if attempt > Config.TASK_MAX_ATTEMPTS:
+            doc.status = 'FAILED'
+            doc.result = {'error': f'Analysis was interrupted {attempt - 1} times, giving up'}
+            db.session.commit()
+            publish_status(doc.id, doc.status)
+            print(f"Document {doc.id} failed after {attempt - 1} interrupted runs")
+            return
+        plan = build_plan(analyses or doc.requested_analyses)
+        done = _completed(doc.id)
+        if done:
+            print(f"Document {doc.id} resumes with {', '.join(sorted(done))} already stored")
+
         try:
+            # PDF/EPUB uploads are extracted once into a cached text file
+            text_path = get_text_path(doc.path)
+
+            # Segmented documents are analyzed segment by segment in this task instead
+            if not doc.segmentation and os.path.getsize(text_path) > Config.CHUNKED_ANALYSIS_THRESHOLD_BYTES:
+                _start_chunked_analysis(doc, text_path, plan, done)
+                clear_attempts('text_analysis', doc.id)
+                return
+
             # Read the file content
-            with open(doc.path, 'r', encoding='utf-8') as f:
+            with open(text_path, 'r', encoding='utf-8') as f:
                 text = f.read()
             
             if not text.strip():
                 doc.status = 'FAILED'
                 doc.result = {'error': 'File is empty or could not be read'}
                 db.session.commit()
+                publish_status(doc.id, doc.status)
                 return
-            
-            # Perform readability analysis
-            readability_results = calculate_readability_metrics(text)
-            
-            # Perform sentiment analysis
-            sentiment_results = sentiment_analyzer.get_sentiment_summary(text)
-            
-            # Perform sentence complexity analysis
-            complexity_results = analyze_sentence_complexity(text)
-            
-            # Perform lexical diversity analysis
-            lexical_results = analyze_lexical_diversity(text)
-            
-            # Perform NER analysis
-            ner_results = analyze_named_entities(text)
-            
-            # Perform keyword extraction
-            keyword_results = extract_keywords(text)
-            
-            # Perform auto summarization (lightweight default limits)
-            summary_results = generate_summary(text)
-            
-            # Combine results
-            analysis_results = {
-                'readability_analysis': readability_results,
-                'sentence_complexity': complexity_results,
-                'lexical_diversity': lexical_results,
-                'named_entity_recognition': ner_results,
-                'keyword_extraction': keyword_results,
-                'sentiment_analysis': sentiment_results,
-                'auto_summarization': summary_results,
-                'text_preview': text[:200] + '...' if len(text) > 200 else text,
-                'analysis_timestamp': None  # Will be set by the database
-            }
-            
-            doc.status = 'COMPLETED'
-            doc.result = analysis_results
-            
+
+            for name in plan['heavy']:
+                # Still queued or running from an earlier run of this task
+                if name not in done and claim_in_flight(name, doc.id):
+                    run_analyzers_service.delay(doc.id, [name])
+
+            if doc.segmentation:
+                _run_segmented(doc, text, plan['light'])
+                clear_attempts('text_analysis', doc.id)
+                return
+
+            ctx = _AnalysisContext(text)
+            # Small documents are cheaper to redo than to checkpoint analyzer by analyzer
+            analysis_results = _run_analyzers(doc, text, [name for name in plan['light'] if name not in done], ctx,
+                                              checkpoint=len(text) > Config.SMALL_DOCUMENT_BYTES)
+            analysis_results['text_preview'] = text[:200] + '...' if len(text) > 200 else text
+            store_results(doc.content_hash, analysis_results)
+
+            doc = _save_results(doc.id, analysis_results)
+            print(f"Document {doc.id} analysis stored with status: {doc.status}")
+            clear_attempts('text_analysis', doc.id)
+            _index_document(doc.id, text, analysis_results, ctx.words)
+            return
+
+        except _TRANSIENT_ERRORS as e:
+            db.session.rollback()
+            _retry(self, e)
+            doc.status = 'FAILED'
+            doc.result = {'error': f'Analysis failed after {self.request.retries} retries: {str(e)}'}
         except FileNotFoundError:
+            db.session.rollback()
             doc.status = 'FAILED'
             doc.result = {'error': 'File not found'}
+        except ExtractionError as e:
+            db.session.rollback()
+            doc.status = 'FAILED'
+            doc.result = {'error': f'Could not extract text: {str(e)}'}
         except UnicodeDecodeError:
+            db.session.rollback()
             doc.status = 'FAILED'
             doc.result = {'error': 'File encoding not supported. Please use UTF-8 encoded text files.'}
         except Exception as e:
+            # The session may hold a failed flush, e.g. a database error
+            db.session.rollback()
             doc.status = 'FAILED'
             doc.result = {'error': f'Unexpected error during analysis: {str(e)}'}
         
         db.session.commit()
+        publish_status(doc.id, doc.status)
         print(f"Document {doc.id} analysis completed with status: {doc.status}")
 
+
+@celery.task(bind=True, name='app.workers.celery_workers.run_analyzers_service', max_retries=Config.TASK_MAX_RETRIES)
+def run_analyzers_service(self, file_id, analyzers):
+    """Run a subset of analyzers (usually one heavy model) and merge the results into the document"""
+    with get_app().app_context():
+        doc = Document.query.get(file_id)
+        # A redelivered task whose results were stored before its worker died
+        done = _completed(file_id)
+        clear_in_flight([name for name in analyzers if name in done], file_id)
+        analyzers = [name for name in analyzers if name not in done]
+        if not analyzers:
+            return
+        renew_in_flight(analyzers, file_id)
+        task = f"run_analyzers:{','.join(analyzers)}"
+        attempt = start_attempt(task, file_id)
+        try:
+            if attempt > Config.TASK_MAX_ATTEMPTS:
+                raise RuntimeError(f'Analysis was interrupted {attempt - 1} times, giving up')
+            with open(get_text_path(doc.path), 'r', encoding='utf-8') as f:
+                text = f.read()
+            results = _run_analyzers(doc, text, analyzers)
+            store_results(doc.content_hash, results)
+        except _TRANSIENT_ERRORS as e:
+            db.session.rollback()
+            _retry(self, e)
+            results = {name: {'error': f'Analysis failed after {self.request.retries} retries: {str(e)}'}
+                       for name in analyzers}
+        except Exception as e:
+            db.session.rollback()
+            results = {name: {'error': f'Unexpected error during analysis: {str(e)}'} for name in analyzers}
+
+        doc = _save_results(file_id, results)
+        clear_attempts(task, file_id)
+        clear_in_flight(analyzers, file_id)
+        print(f"Document {doc.id} {', '.join(analyzers)} stored with status: {doc.status}")
+
+# -------------------  CHUNKED (MAP-REDUCE) ANALYSIS  ------------------- #
+
+
+def _start_chunked_analysis(doc, text_path, plan, done=()):
+    """
+    Fan a large document out as one subtask per chunk, merged by a chord
+    callback. The summary is not additive and runs as its own task.
+    Analyzers in done are already stored and are not run again
+    """
+    wanted = [name for name in plan['analyzers'] if name not in done]
+    analyzers = [name for name in wanted if name != 'auto_summarization']
+    if 'auto_summarization' in wanted and claim_in_flight('auto_summarization', doc.id):
+        run_analyzers_service.delay(doc.id, ['auto_summarization'])
+    if not analyzers:
+        return
+
+    chunks = plan_chunks(text_path, Config.ANALYSIS_CHUNK_BYTES)
+    print(f"Document {doc.id} split into {len(chunks)} chunks")
+    chord(
+        analyze_chunk_service.s(text_path, start, end, analyzers) for start, end in chunks
+    )(merge_chunks_service.s(doc.id, analyzers))
+
+
+@celery.task(name='app.workers.celery_workers.analyze_chunk_service', autoretry_for=_TRANSIENT_ERRORS,
+             max_retries=Config.TASK_MAX_RETRIES, retry_backoff=Config.TASK_RETRY_BACKOFF_SECONDS,
+             retry_backoff_max=Config.TASK_RETRY_BACKOFF_MAX_SECONDS)
+def analyze_chunk_service(path, start, end, analyzers=None):
+    """
+    Map step: analyze one byte range of a document. The partial state is
+    checkpointed, so a chord redelivered after a crash only redoes the
+    chunks that had not finished
+    """
+    key = partial_key('chunk', path, start, end, analyzers)
+    partial = load_partial(key)
+    if partial is not None:
+        return partial
+    text = read_chunk(path, start, end)
+    with instrument('analyze_chunk', text) as record:
+        partial = analyze_chunk(text, analyzers)
+    partial['metrics'] = record
+    save_partial(key, partial)
+    return partial
+
+
+def _sum_metrics(records):
+    """Combine chunk measurements: times and sizes add up, memory growth is the largest one"""
+    total = {'characters': 0, 'tokens': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_rss_delta_bytes': 0}
+    for record in records:
+        if not record:
+            continue
+        for key in ('characters', 'tokens', 'wall_seconds', 'cpu_seconds'):
+            total[key] += record.get(key, 0)
+        total['peak_rss_delta_bytes'] = max(total['peak_rss_delta_bytes'], record.get('peak_rss_delta_bytes', 0))
+    total['wall_seconds'] = round(total['wall_seconds'], 6)
+    total['cpu_seconds'] = round(total['cpu_seconds'], 6)
+    return total
+
+
+@celery.task(bind=True, name='app.workers.celery_workers.merge_chunks_service', max_retries=Config.TASK_MAX_RETRIES)
+def merge_chunks_service(self, partials, file_id, analyzers=None):
+    """
+    Reduce step: merge chunk results and run keyword extraction, which is
+    not additive, over the whole text streamed from disk
+    """
+    analyzers = analyzers or list(ANALYZERS)
+    with get_app().app_context():
+        doc = Document.query.get(file_id)
+        text_path = None
+        try:
+            analysis_results = merge_chunk_results(partials, analyzers)
+
+            text_path = get_text_path(doc.path)
+            if 'keyword_extraction' in analyzers:
+                analysis_results['keyword_extraction'] = extract_keywords_stream(
+                    iter_text_blocks(text_path), doc.content_hash or doc.id
+                )
+            analysis_results['text_preview'] = read_text_head(text_path)
+            analysis_results['chunk_count'] = len(partials)
+            analysis_results['analysis_metrics'] = {'analyze_chunks': _sum_metrics(p.get('metrics') for p in partials)}
+            store_results(doc.content_hash, analysis_results)
+        except _TRANSIENT_ERRORS as e:
+            db.session.rollback()
+            _retry(self, e)
+            analysis_results = {name: {'error': f'Analysis failed after {self.request.retries} retries: {str(e)}'}
+                                for name in analyzers}
+        except Exception as e:
+            db.session.rollback()
+            analysis_results = {name: {'error': f'Unexpected error during analysis: {str(e)}'} for name in analyzers}
+
+        doc = _save_results(file_id, analysis_results)
+        print(f"Document {doc.id} chunked analysis stored with status: {doc.status}")
+        if text_path is not None:
+            _index_document(doc.id, None, analysis_results, path=text_path)
+
+# -------------------  SEGMENTED (PER-CHAPTER) ANALYSIS  ------------------- #
+
+
+def _run_segmented(doc, text, analyzers):
+    """
+    Run the light analyzers per chapter or window, storing and publishing
+    each segment as soon as it is done. Document-level results are merged
+    from the segments' additive states; keywords, which are not additive,
+    are extracted once over the whole text. Finished segments are
+    checkpointed and reused when the task is rerun after a crash
+    """
+    segmentation = plan_segments(text, doc.segmentation.get('mode', 'chapters'), doc.segmentation.get('window_chars'))
+    segments = segmentation['segments']
+    doc = _save_results(doc.id, {'segmentation': {'mode': segmentation['mode'], 'segment_count': len(segments),
+                                                  'segments': segments}})
+    print(f"Document {doc.id} split into {len(segments)} {segmentation['mode']}")
+
+    partials = []
+    for segment in segments:
+        key = partial_key('segment', doc.id, segment['start_char'], segment['end_char'], analyzers)
+        partial = load_partial(key)
+        if partial is not None:
+            # Its row was saved before the checkpoint
+            partials.append(partial)
+            continue
+        segment_text = text[segment['start_char']:segment['end_char']]
+        with instrument('segment', segment_text) as record:
+            partial = analyze_chunk(segment_text, analyzers)
+            results = merge_chunk_results([partial], analyzers)
+            if 'keyword_extraction' in analyzers:
+                results['keyword_extraction'] = extract_keywords(segment_text, update_corpus=False)
+        partial['metrics'] = record
+        partials.append(partial)
+        _save_results(doc.id, {segment_name(segment['index']): dict(segment, results=results, metrics=record)})
+        save_partial(key, partial)
+
+    analysis_results = merge_chunk_results(partials, analyzers)
+    if 'keyword_extraction' in analyzers:
+        analysis_results['keyword_extraction'] = extract_keywords(text)
+    analysis_results['text_preview'] = text[:200] + '...' if len(text) > 200 else text
+    analysis_results['analysis_metrics'] = {'segments': _sum_metrics(p['metrics'] for p in partials)}
+    store_results(doc.content_hash, analysis_results)
+
+    doc = _save_results(doc.id, analysis_results)
+    print(f"Document {doc.id} segmented analysis stored with status: {doc.status}")
+    _index_document(doc.id, text, analysis_results)
+
+# -------------------  BATCHED MULTI-DOCUMENT ANALYSIS  ------------------- #
+
+
+def _read_texts(docs):
+    """Read the text of each document, marking unreadable or empty ones FAILED"""
+    texts = {}
+    for doc in docs:
+        try:
+            with open(get_text_path(doc.path), 'r', encoding='utf-8') as f:
+                text = f.read()
+            if text.strip():
+                texts[doc.id] = text
+            else:
+                doc.status = 'FAILED'
+                doc.result = {'error': 'File is empty or could not be read'}
+        except (OSError, UnicodeDecodeError, ExtractionError) as e:
+            doc.status = 'FAILED'
+            doc.result = {'error': f'Could not read file: {str(e)}'}
+    return texts
+
+
+@celery.task(name='app.workers.celery_workers.batch_analysis_service')
+def batch_analysis_service(file_ids):
+    """
+    Analyze many small documents in one task. Light analyzers run here and
+    every Document row is committed together; NER and summaries are queued
+    as one batched task per model on their own pools
+    """
+    with get_app().app_context():
+        docs = Document.query.filter(Document.id.in_(file_ids)).all()
+        print(f"Processing batch of {len(docs)} documents")
+
+        texts = _read_texts(docs)
+        ready = [doc for doc in docs if doc.id in texts]
+        batch_results = {}
+        try:
+            for doc in ready:
+                text = texts[doc.id]
+                light = [name for name in _requested(doc) if not ANALYZERS[name]['heavy']]
+                analysis_results = _run_analyzers(doc, text, light)
+                analysis_results['text_preview'] = text[:200] + '...' if len(text) > 200 else text
+                store_results(doc.content_hash, analysis_results)
+                save_results(doc.id, analysis_results)
+                batch_results[doc.id] = analysis_results
+                doc.status = document_status(_finished(analysis_results), _requested(doc))
+        except Exception as e:
+            db.session.rollback()
+            docs = Document.query.filter(Document.id.in_(file_ids)).all()
+            for doc in docs:
+                doc.status = 'FAILED'
+                doc.result = {'error': f'Unexpected error during batch analysis: {str(e)}'}
+            ready = []
+            batch_results = {}
+
+        db.session.commit()
+        for doc in docs:
+            publish_status(doc.id, doc.status, batch_results.get(doc.id))
+        print(f"Batch of {len(docs)} documents committed")
+        for doc in ready:
+            _index_document(doc.id, texts[doc.id], batch_results.get(doc.id, {}))
+
+        # Queued after the commit so the model tasks merge into the stored results
+        for name in ANALYZERS:
+            if ANALYZERS[name]['heavy']:
+                ids = [doc.id for doc in ready if name in _requested(doc)]
+                if ids:
+                    batch_model_service.delay(ids, name)
+
+
+# Heavy analyzer name -> batched implementation over a list of texts; both
+# go through the model server when one is configured
+_BATCH_RUNNERS = {
+    'named_entity_recognition': named_entities,
+    'auto_summarization': summaries,
+}
+
+
+@celery.task(name='app.workers.celery_workers.batch_model_service')
+def batch_model_service(file_ids, analyzer):
+    """
+    Run one heavy model over many documents in a single batched call (spaCy
+    nlp.pipe or batched summarizer inputs) and merge each result into its document
+    """
+    with get_app().app_context():
+        docs = Document.query.filter(Document.id.in_(file_ids)).all()
+        texts = _read_texts(docs)
+        ready = [doc for doc in docs if doc.id in texts]
+        batch_texts = [texts[doc.id] for doc in ready]
+        try:
+            with instrument(analyzer) as record:
+                for text in batch_texts:
+                    count_input(record, text)
+                batch_results = _BATCH_RUNNERS[analyzer](batch_texts)
+        except Exception as e:
+            batch_results = [{'error': f'Unexpected error during batch analysis: {str(e)}'}] * len(ready)
+        # The measurement covers the whole batch
+        record['batch_size'] = len(ready)
+
+        for doc, result in zip(ready, batch_results, strict=True):
+            store_results(doc.content_hash, {analyzer: result})
+            _save_results(doc.id, {analyzer: result, 'analysis_metrics': {analyzer: record}})
+        print(f"Batch {analyzer} stored for {len(ready)} documents")
+
 # Keep the old task name for backward compatibility, but redirect to new service
 @celery.task(name='app.workers.celery_workers.readability_service')
 def readability_service(file_id):
     """Legacy task - redirects to the new comprehensive text analysis service"""
     return text_analysis_service(file_id)
 
+@celery.task(name='app.workers.celery_workers.worker_readiness_service')
+def worker_readiness_service():
+    """Report which models this worker process has loaded"""
+    return readiness()
+
+@celery.task(name='app.workers.celery_workers.reap_stuck_documents_service')
+def reap_stuck_documents_service():
+    """
+    Requeue documents left PENDING or PARTIAL with no result stored for
+    Config.STUCK_DOCUMENT_SECONDS, e.g. when the broker dropped their task.
+    The rerun resumes from the stored results. Documents only waiting for
+    heavy analyzer tasks that are still queued or running are left alone
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=Config.STUCK_DOCUMENT_SECONDS)
+    with get_app().app_context():
+        recent = exists().where(AnalysisResult.document_id == Document.id, AnalysisResult.updated_at >= cutoff)
+        docs = Document.query.filter(
+            Document.status.in_(('PENDING', 'PARTIAL')), Document.created_at < cutoff, ~recent
+        ).limit(Config.REAPER_BATCH_SIZE).all()
+
+        requeued = 0
+        for doc in docs:
+            missing = set(_requested(doc)) - set(finished_analyzers(doc.id))
+            if missing and missing <= in_flight(missing, doc.id):
+                continue
+            if not claim_requeue(doc.id):
+                continue
+            try:
+                queue = analysis_queue(os.path.getsize(doc.path))
+            except OSError:
+                queue = LIGHT_QUEUE
+            text_analysis_service.apply_async((doc.id,), queue=queue)
+            requeued += 1
+        if requeued:
+            print(f"Requeued {requeued} stuck documents")
+        return requeued
+
 # -------------------  INDIVIDUAL SERVICE TASKS  ------------------- #
 
 
 def _load_document(file_id):
-    """Utility to load document by ID inside an app context."""
-    flask_app = create_app()
-    with flask_app.app_context():
-        return Document.query.get(file_id), flask_app
+    """Utility to load document by ID; call inside the worker's app context."""
+    return Document.query.get(file_id)
 
 
-@celery.task(name='app.workers.celery_workers.sentence_complexity_service')
-def sentence_complexity_service(file_id):
-    doc, app_ctx = _load_document(file_id)
-    with app_ctx.app_context():
+def _read_text(path, record):
+    """Read a whole document for analyzers that need it at once, counting its size into record."""
+    with open(get_text_path(path), 'r', encoding='utf-8') as f:
+        text = f.read()
+    count_input(record, text)
+    return text
+
+
+def _run_service(file_id, analyzer, run):
+    """Run one analyzer as a standalone task and store its result with its measurements"""
+    with get_app().app_context():
+        doc = _load_document(file_id)
         try:
-            with open(doc.path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            doc.result = analyze_sentence_complexity(text)
-            doc.status = 'COMPLETED'
+            with instrument(analyzer) as record:
+                result = run(doc.path, record)
+            results = {analyzer: result, 'analysis_metrics': {analyzer: record}}
         except Exception as e:
-            doc.status = 'FAILED'
-            doc.result = {'error': str(e)}
-        db.session.commit()
+            results = {analyzer: {'error': str(e)}}
+        # Only this analyzer's row is written; other results of the document are kept
+        _save_results(doc.id, results)
+
+
+@celery.task(name='app.workers.celery_workers.sentence_complexity_service')
+def sentence_complexity_service(file_id):
+    _run_service(file_id, 'sentence_complexity', lambda path, record: analyze_sentence_complexity_stream(
+        counted_blocks(iter_text_blocks(get_text_path(path)), record)
+    ))
 
 
 @celery.task(name='app.workers.celery_workers.lexical_diversity_service')
 def lexical_diversity_service(file_id):
-    doc, app_ctx = _load_document(file_id)
-    with app_ctx.app_context():
-        try:
-            with open(doc.path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            doc.result = analyze_lexical_diversity(text)
-            doc.status = 'COMPLETED'
-        except Exception as e:
-            doc.status = 'FAILED'
-            doc.result = {'error': str(e)}
-        db.session.commit()
+    _run_service(file_id, 'lexical_diversity', lambda path, record: analyze_lexical_diversity_stream(
+        counted_blocks(iter_text_blocks(get_text_path(path)), record)
+    ))
+
+
+@celery.task(name='app.workers.celery_workers.sentiment_analysis_service')
+def sentiment_analysis_service(file_id):
+    _run_service(file_id, 'sentiment_analysis', lambda path, record: sentiment_analyzer.get_sentiment_summary_stream(
+        counted_blocks(iter_text_blocks(get_text_path(path)), record)
+    ))
 
 
 @celery.task(name='app.workers.celery_workers.ner_service')
 def ner_service(file_id):
-    doc, app_ctx = _load_document(file_id)
-    with app_ctx.app_context():
-        try:
-            with open(doc.path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            doc.result = analyze_named_entities(text)
-            doc.status = 'COMPLETED'
-        except Exception as e:
-            doc.status = 'FAILED'
-            doc.result = {'error': str(e)}
-        db.session.commit()
+    _run_service(file_id, 'named_entity_recognition', lambda path, record: named_entities(
+        [_read_text(path, record)]
+    )[0])
 
 
 @celery.task(name='app.workers.celery_workers.keyword_extraction_service')
 def keyword_extraction_service(file_id):
-    doc, app_ctx = _load_document(file_id)
-    with app_ctx.app_context():
-        try:
-            with open(doc.path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            doc.result = extract_keywords(text)
-            doc.status = 'COMPLETED'
-        except Exception as e:
-            doc.status = 'FAILED'
-            doc.result = {'error': str(e)}
-        db.session.commit()
+    _run_service(file_id, 'keyword_extraction', lambda path, record: extract_keywords(
+        _read_text(path, record)
+    ))
 
 
 @celery.task(name='app.workers.celery_workers.auto_summarization_service')
 def auto_summarization_service(file_id):
-    doc, app_ctx = _load_document(file_id)
-    with app_ctx.app_context():
-        try:
-            with open(doc.path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            doc.result = generate_summary(text)
-            doc.status = 'COMPLETED'
-        except Exception as e:
-            doc.status = 'FAILED'
-            doc.result = {'error': str(e)}
-        db.session.commit()
+    _run_service(file_id, 'auto_summarization', lambda path, record: summaries(
+        [_read_text(path, record)]
+    )[0])
@@ -0,0 +1,108 @@
+import time
+
+from celery.signals import worker_init, worker_process_init
+
+from app import create_app, db
+from app.core.config import Config
+from app.workers.pools import preload_models
+from app.utils.nltk_data import missing_nltk_data
+
+_app = None
+
+# name -> {'ready': bool, 'load_seconds' | 'error': ...}
+MODEL_READINESS = {}
+
+
+def get_app():
+    """Return the Flask app for this process, creating it on first use."""
+    global _app
+    if _app is None:
+        _app = create_app()
+    return _app
+
+
+def _check_nltk():
+    missing = missing_nltk_data()
+    if missing:
+        raise LookupError(f"Missing NLTK data: {', '.join(missing)}; run: python -m app.download_models")
+
+
+def _load_ner():
+    if Config.MODEL_SERVER_ADDRESS:
+        # Served by the shared model server; only check that it is reachable
+        from app.services.model_server import ping
+        ping()
+        return
+    from app.services.named_entity_recognition import get_nlp
+    get_nlp()
+
+
+def _load_sentiment():
+    from app.services.sentiment_analysis import sentiment_analyzer
+    sentiment_analyzer.load()
+
+
+def _load_summarizer():
+    if Config.MODEL_SERVER_ADDRESS:
+        from app.services.model_server import ping
+        ping()
+        return
+    from app.services.auto_summarization import _get_summarizer
+    _get_summarizer()
+
+
+_LOADERS = {
+    'nltk': _check_nltk,
+    'ner': _load_ner,
+    'sentiment': _load_sentiment,
+    'summarizer': _load_summarizer,
+}
+
+
+def warm_models(names):
+    """Load the named models once and record whether each became ready.
+
+    Args:
+        names (list): Keys of _LOADERS to load
+
+    Returns:
+        dict: Readiness of every requested model
+    """
+    for name in names:
+        loader = _LOADERS.get(name)
+        if loader is None:
+            MODEL_READINESS[name] = {'ready': False, 'error': 'Unknown model'}
+            continue
+        start = time.perf_counter()
+        try:
+            loader()
+            MODEL_READINESS[name] = {'ready': True, 'load_seconds': round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            MODEL_READINESS[name] = {'ready': False, 'error': str(e)}
+        print(f"Model {name}: {MODEL_READINESS[name]}", flush=True)
+    return {name: MODEL_READINESS[name] for name in names}
+
+
+def readiness():
+    """Report every known model; ones not preloaded show up as not loaded yet."""
+    report = {name: {'ready': False, 'loaded': False} for name in _LOADERS}
+    report.update(MODEL_READINESS)
+    return report
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Build the app and DB engine once per worker process and warm models."""
+    app = get_app()
+    with app.app_context():
+        # Connections inherited from the parent process must not be reused after fork
+        db.engine.dispose()
+    warm_models(preload_models())
+
+
+@worker_init.connect
+def init_worker(**kwargs):
+    """Start the metrics exporter once in the worker's main process."""
+    if Config.WORKER_METRICS_PORT:
+        from app.services.metrics import start_metrics_exporter
+        start_metrics_exporter(Config.WORKER_METRICS_PORT)
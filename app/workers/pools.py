@@ -0,0 +1,124 @@
+"""Queues and worker pools for CPU-light and model-heavy analyzers.
+
+Each pool consumes its own queues and has its own concurrency, prefetch
+multiplier, max-tasks-per-child and preloaded models, so a long BART
+summary never holds up readability metrics for a short essay:
+
+    WORKER_POOL=priority celery -A app.workers.celery_workers worker
+    WORKER_POOL=light    celery -A app.workers.celery_workers worker
+    WORKER_POOL=ner      celery -A app.workers.celery_workers worker
+    WORKER_POOL=summary  celery -A app.workers.celery_workers worker
+
+Every setting can be overridden with WORKER_<POOL>_<SETTING>, e.g.
+WORKER_SUMMARY_CONCURRENCY=2. A worker started without WORKER_POOL
+consumes every queue, which keeps single-worker development setups working.
+"""
+import os
+
+from app.core.config import Config
+
+PRIORITY_QUEUE = 'priority'
+LIGHT_QUEUE = 'light'
+NER_QUEUE = 'ner'
+SUMMARY_QUEUE = 'summary'
+
+# Analyzers that need a dedicated model pool; everything else is light
+ANALYZER_QUEUES = {
+    'named_entity_recognition': NER_QUEUE,
+    'auto_summarization': SUMMARY_QUEUE,
+}
+
+_POOL_DEFAULTS = {
+    # Whole-document analysis of small uploads: few processes, no prefetching
+    # so a free slot is always available for the next short document
+    'priority': {'queues': [PRIORITY_QUEUE], 'concurrency': 2, 'prefetch_multiplier': 1,
+                 'max_tasks_per_child': 1000, 'preload': 'nltk,sentiment'},
+    # NLTK/textstat metrics, chunk map/reduce steps and batch coordination
+    'light': {'queues': [LIGHT_QUEUE], 'concurrency': os.cpu_count() or 2, 'prefetch_multiplier': 4,
+              'max_tasks_per_child': 1000, 'preload': 'nltk,sentiment'},
+    # spaCy; one task at a time per process since each holds the model in memory
+    'ner': {'queues': [NER_QUEUE], 'concurrency': 2, 'prefetch_multiplier': 1,
+            'max_tasks_per_child': 200, 'preload': 'nltk,ner'},
+    # Transformer summarization; recycled often to return torch memory
+    'summary': {'queues': [SUMMARY_QUEUE], 'concurrency': 1, 'prefetch_multiplier': 1,
+                'max_tasks_per_child': 50, 'preload': 'summarizer'},
+}
+
+
+def _pool_settings(name: str, defaults: dict) -> dict:
+    """Apply WORKER_<POOL>_<SETTING> environment overrides to a pool's defaults."""
+    prefix = f'WORKER_{name.upper()}_'
+    return {
+        'queues': [q for q in os.getenv(prefix + 'QUEUES', ','.join(defaults['queues'])).split(',') if q],
+        'concurrency': int(os.getenv(prefix + 'CONCURRENCY', defaults['concurrency'])),
+        'prefetch_multiplier': int(os.getenv(prefix + 'PREFETCH_MULTIPLIER', defaults['prefetch_multiplier'])),
+        'max_tasks_per_child': int(os.getenv(prefix + 'MAX_TASKS_PER_CHILD', defaults['max_tasks_per_child'])),
+        'preload': [m for m in os.getenv(prefix + 'PRELOAD', defaults['preload']).split(',') if m],
+    }
+
+
+POOLS = {name: _pool_settings(name, defaults) for name, defaults in _POOL_DEFAULTS.items()}
+ALL_QUEUES = [PRIORITY_QUEUE, LIGHT_QUEUE, NER_QUEUE, SUMMARY_QUEUE]
+
+
+def analysis_queue(size_bytes: int) -> str:
+    """Queue for the main analysis task of a document of the given size."""
+    return PRIORITY_QUEUE if size_bytes <= Config.SMALL_DOCUMENT_BYTES else LIGHT_QUEUE
+
+
+def analyzers_queue(analyzers) -> str:
+    """Queue for a task that runs the given analyzers; the heaviest model decides."""
+    for name in ('auto_summarization', 'named_entity_recognition'):
+        if name in (analyzers or ()):
+            return ANALYZER_QUEUES[name]
+    return LIGHT_QUEUE
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """Celery router for tasks whose queue depends on the analyzers they run."""
+    if name == 'app.workers.celery_workers.run_analyzers_service':
+        return {'queue': analyzers_queue(args[1] if len(args) > 1 else kwargs.get('analyzers'))}
+    if name == 'app.workers.celery_workers.analyze_chunk_service':
+        analyzers = args[3] if len(args) > 3 else kwargs.get('analyzers')
+        # Chunks only need the NER pool when entities were requested
+        if analyzers is None or 'named_entity_recognition' in analyzers:
+            return {'queue': NER_QUEUE}
+        return {'queue': LIGHT_QUEUE}
+    if name == 'app.workers.celery_workers.batch_model_service':
+        return {'queue': analyzers_queue([args[1] if len(args) > 1 else kwargs.get('analyzer')])}
+    return None
+
+
+def configure_worker_pool(celery, pool: str = None):
+    """Apply a pool's queues and worker settings to the Celery app.
+
+    Args:
+        celery (Celery): The Celery application
+        pool (str, optional): Key of POOLS. Without a pool the worker consumes
+            every queue (plus the legacy default queue) with Celery's defaults.
+
+    Returns:
+        dict: The pool settings that were applied
+    """
+    from kombu import Queue
+
+    if pool is None:
+        celery.conf.task_queues = [Queue(queue) for queue in ALL_QUEUES + ['celery']]
+        return {'queues': ALL_QUEUES + ['celery']}
+    if pool not in POOLS:
+        raise ValueError(f"Unknown worker pool: {pool}; expected one of {', '.join(POOLS)}")
+    settings = POOLS[pool]
+    celery.conf.update(
+        task_queues=[Queue(queue) for queue in settings['queues']],
+        worker_concurrency=settings['concurrency'],
+        worker_prefetch_multiplier=settings['prefetch_multiplier'],
+        worker_max_tasks_per_child=settings['max_tasks_per_child'],
+    )
+    return settings
+
+
+def preload_models() -> list:
+    """Models this worker process loads at startup."""
+    if Config.WORKER_POOL:
+        return POOLS[Config.WORKER_POOL]['preload']
+    return Config.PRELOAD_MODELS
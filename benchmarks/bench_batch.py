@@ -0,0 +1,42 @@
+"""Compare documents/second of one-at-a-time vs batched NER and summarization.
+
+Usage:
+    python -m benchmarks.bench_batch [n_docs] [--no-summary]
+"""
+import sys
+import time
+
+from benchmarks.corpus import generate_text
+from app.services.named_entity_recognition import analyze_named_entities, analyze_named_entities_batch
+from app.services.auto_summarization import generate_summary, generate_summaries
+from app.core.config import Config
+
+
+def _one_at_a_time(texts, summarize):
+    for text in texts:
+        analyze_named_entities(text)
+        if summarize:
+            generate_summary(text)
+
+
+def _batched(texts, summarize):
+    analyze_named_entities_batch(texts, batch_size=Config.NER_BATCH_SIZE, n_process=Config.NER_N_PROCESS)
+    if summarize:
+        generate_summaries(texts, batch_size=Config.SUMMARY_BATCH_SIZE)
+
+
+def main(n_docs, summarize):
+    texts = [generate_text(1500, seed=i) for i in range(n_docs)]
+    # Load models outside the timed sections
+    _batched(texts[:2], summarize)
+
+    for name, fn in (('one-at-a-time', _one_at_a_time), ('batched', _batched)):
+        start = time.perf_counter()
+        fn(texts, summarize)
+        elapsed = time.perf_counter() - start
+        print(f"{name:14} {n_docs} docs  {elapsed:8.2f}s  {n_docs / elapsed:8.1f} docs/s")
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    main(int(args[0]) if args else 200, '--no-summary' not in sys.argv)
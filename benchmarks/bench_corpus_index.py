@@ -0,0 +1,88 @@
+"""Insertion rate and query latency of the corpus similarity index as it grows.
+
+Synthetic documents are drawn from a fixed number of topics (word
+distributions over a shared vocabulary), and every tenth one is a lightly
+edited copy of an earlier document, so similarity and near-duplicate
+queries have true answers to find. The index is built in a temporary
+directory through add_document, then similar() and near_duplicates() are
+timed for random documents at each checkpoint size.
+
+Usage:
+    python -m benchmarks.bench_corpus_index [--docs 100000] [--words 300] [--queries 200]
+"""
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+from benchmarks.suite import percentile
+
+
+def _documents(n_docs: int, n_words: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocab = [f'word{i}' for i in range(20_000)]
+    topics = [rng.sample(vocab, 500) for _ in range(50)]
+    docs = []
+    for i in range(n_docs):
+        if i % 10 == 9 and docs:
+            words = list(rng.choice(docs))
+            for j in range(0, len(words), 40):
+                words[j] = rng.choice(vocab)
+        else:
+            topic = topics[i % len(topics)]
+            words = [rng.choice(topic) if rng.random() < 0.6 else rng.choice(vocab) for _ in range(n_words)]
+        docs.append(words)
+        yield f'{i:036d}', words
+
+
+def _time_queries(index, n_docs: int, n_queries: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    similar, duplicates = [], []
+    for _ in range(n_queries):
+        doc_id = f'{rng.randrange(n_docs):036d}'
+        start = time.perf_counter()
+        index.similar(doc_id, 10)
+        similar.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        index.near_duplicates(doc_id)
+        duplicates.append(time.perf_counter() - start)
+    return {
+        'similar_p50_ms': percentile(similar, 50) * 1000,
+        'similar_p95_ms': percentile(similar, 95) * 1000,
+        'duplicates_p50_ms': percentile(duplicates, 50) * 1000,
+        'duplicates_p95_ms': percentile(duplicates, 95) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_corpus_index')
+    parser.add_argument('--docs', type=int, default=100_000)
+    parser.add_argument('--words', type=int, default=300, help='Words per synthetic document')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    from app.core.config import Config
+    from app.services.corpus_index import CorpusIndex
+
+    # IDF stays flat so the run does not touch the keyword document frequencies in Redis
+    Config.REDIS_URL = None
+    checkpoints = {args.docs // 100, args.docs // 10, args.docs} - {0}
+    with tempfile.TemporaryDirectory() as path:
+        index = CorpusIndex(path)
+        start = time.perf_counter()
+        print(f"{'documents':>10} {'adds/s':>8} {'similar p50/p95 ms':>20} {'duplicates p50/p95 ms':>22}")
+        for n, (doc_id, words) in enumerate(_documents(args.docs, args.words), 1):
+            index.add(doc_id, words)
+            if n in checkpoints:
+                rate = n / (time.perf_counter() - start)
+                q = _time_queries(index, n, args.queries)
+                print(f"{n:10} {rate:8.0f} {q['similar_p50_ms']:9.2f} / {q['similar_p95_ms']:7.2f} "
+                      f"{q['duplicates_p50_ms']:10.2f} / {q['duplicates_p95_ms']:8.2f}")
+                # Leave the query time out of the insertion rate
+                start = time.perf_counter() - n / rate
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Report text extraction throughput per input format.
+
+Without arguments a synthetic EPUB is generated; pass PDF or EPUB paths
+to measure real files.
+
+Usage:
+    python -m benchmarks.bench_extraction [file ...]
+"""
+import os
+import sys
+import time
+import zipfile
+import tempfile
+
+from benchmarks.corpus import generate_text
+from app.services.text_extraction import extract_to_file
+
+_CONTAINER = """<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>"""
+
+
+def build_epub(path: str, chapters: int = 40, chapter_bytes: int = 50_000):
+    """Write a deterministic EPUB with the given number of XHTML chapters."""
+    manifest, spine = [], []
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as epub:
+        epub.writestr('mimetype', 'application/epub+zip')
+        epub.writestr('META-INF/container.xml', _CONTAINER)
+        for i in range(chapters):
+            body = ''.join(f'<p>{p}</p>' for p in generate_text(chapter_bytes, seed=i).split('\n\n'))
+            epub.writestr(f'OEBPS/ch{i}.xhtml', f'<html><head><title>{i}</title></head><body>{body}</body></html>')
+            manifest.append(f'<item id="ch{i}" href="ch{i}.xhtml" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="ch{i}"/>')
+        epub.writestr('OEBPS/content.opf', (
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0">'
+            f'<manifest>{"".join(manifest)}</manifest><spine>{"".join(spine)}</spine></package>'
+        ))
+
+
+def measure(path: str):
+    out = path + '.bench.txt'
+    start = time.perf_counter()
+    units = extract_to_file(path, out)
+    elapsed = time.perf_counter() - start
+    text_bytes = os.path.getsize(out)
+    os.remove(out)
+    fmt = os.path.splitext(path)[1].lower()
+    print(f"{fmt:6} {os.path.basename(path)[:30]:30} {units:5} units  {elapsed:7.3f}s  "
+          f"{os.path.getsize(path) / elapsed / 1e6:7.2f} MB/s in  {text_bytes / elapsed / 1e6:7.2f} MB/s text  "
+          f"{units / elapsed:8.1f} units/s")
+
+
+def main(paths):
+    if not paths:
+        path = os.path.join(tempfile.gettempdir(), 'wordlens_bench.epub')
+        build_epub(path)
+        paths = [path]
+    for path in paths:
+        measure(path)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
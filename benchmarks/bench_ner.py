@@ -0,0 +1,88 @@
+"""Compare docs/second and peak memory of the full and the trimmed spaCy NER pipeline.
+
+full:    every component of the model enabled, one nlp(text) call per
+         document (max_length raised so long documents do not fail), as
+         analyze_named_entities did before the pipeline was trimmed.
+trimmed: analyze_named_entities_batch, i.e. only tokenizer, tok2vec and ner,
+         long texts split into NER_CHUNK_CHARS chunks and fed through nlp.pipe.
+
+Each mode runs in its own process so peak RSS is not shared.
+
+Usage:
+    python -m benchmarks.bench_ner [--docs 20] [--size 50000] [--book 2000000]
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+from benchmarks.corpus import generate_text
+
+
+def _corpus(docs: int, size: int, book: int) -> list:
+    texts = [generate_text(size, seed=i) for i in range(docs)]
+    if book:
+        texts.append(generate_text(book, seed=docs))
+    return texts
+
+
+def _run_full(texts):
+    import spacy
+    from app.services.named_entity_recognition import SPACY_MODEL
+    nlp = spacy.load(SPACY_MODEL)
+    nlp.max_length = max(len(text) for text in texts) + 1
+    return [len(nlp(text).ents) for text in texts]
+
+
+def _run_trimmed(texts):
+    from app.services.named_entity_recognition import analyze_named_entities_batch
+    results = analyze_named_entities_batch(texts)
+    return [sum(sum(counts.values()) for counts in result['entity_counts'].values()) for result in results]
+
+
+_MODES = {'full': _run_full, 'trimmed': _run_trimmed}
+
+
+def _child(mode: str, docs: int, size: int, book: int) -> dict:
+    texts = _corpus(docs, size, book)
+    start = time.perf_counter()
+    entities = _MODES[mode](texts)
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': elapsed,
+        'docs_per_second': len(texts) / elapsed,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'entities': sum(entities),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_ner')
+    parser.add_argument('--docs', type=int, default=20)
+    parser.add_argument('--size', type=int, default=50_000, help='Characters per document')
+    parser.add_argument('--book', type=int, default=2_000_000, help='Characters of one extra long document; 0 = none')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_child(args.child, args.docs, args.size, args.book)))
+        return 0
+
+    print(f"{args.docs} docs of {args.size} chars" + (f" + one of {args.book} chars" if args.book else ''))
+    for mode in _MODES:
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.bench_ner', '--child', mode, '--docs', str(args.docs),
+                               '--size', str(args.size), '--book', str(args.book)], capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{mode:8} failed\n{proc.stderr.strip()[-2000:]}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{mode:8} {result['seconds']:8.2f}s  {result['docs_per_second']:7.2f} docs/s  "
+              f"peak RSS {result['peak_rss_mb']:8.1f} MB  entities {result['entities']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Compare the NumPy readability engine with textstat: speed and agreement.
+
+For each size, reports CPU time of the seven textstat formulas vs the
+engine (tokenization included; the formulas include the readability
+curve), and the largest absolute difference per index. Exits with status 1
+if any index differs from textstat by more than the tolerance.
+
+Usage:
+    python -m benchmarks.bench_readability [--tolerance 0.5] [size_bytes ...]
+"""
+import sys
+import time
+
+import textstat
+
+from benchmarks.corpus import generate_text
+from app.services.text_pipeline import analyze_document
+from app.services.readability import calculate_readability_metrics
+
+_TEXTSTAT = {
+    'flesch_reading_ease': textstat.flesch_reading_ease,
+    'flesch_kincaid_grade': textstat.flesch_kincaid_grade,
+    'gunning_fog': textstat.gunning_fog,
+    'automated_readability_index': textstat.automated_readability_index,
+    'coleman_liau_index': textstat.coleman_liau_index,
+    'linsear_write_formula': textstat.linsear_write_formula,
+    'dale_chall_readability_score': textstat.dale_chall_readability_score,
+}
+
+_SHORT = {
+    'flesch_reading_ease': 'FRE', 'flesch_kincaid_grade': 'FKG', 'gunning_fog': 'FOG',
+    'automated_readability_index': 'ARI', 'coleman_liau_index': 'CLI',
+    'linsear_write_formula': 'LWF', 'dale_chall_readability_score': 'DC',
+}
+
+
+def _cpu_time(fn, *args):
+    start = time.process_time()
+    result = fn(*args)
+    return time.process_time() - start, result
+
+
+def _textstat(text):
+    return {name: fn(text) for name, fn in _TEXTSTAT.items()}
+
+
+def main(sizes, tolerance):
+    worst = 0.0
+    for size in sizes:
+        text = generate_text(size)
+        legacy_time, expected = _cpu_time(_textstat, text)
+        engine_time, analyzed = _cpu_time(analyze_document, text)
+        metrics_time, metrics = _cpu_time(calculate_readability_metrics, analyzed)
+
+        diffs = {name: abs(metrics[name] - expected[name]) for name in _TEXTSTAT}
+        worst = max(worst, *diffs.values())
+        engine_total = engine_time + metrics_time
+        print(f"{size:>10} bytes  textstat {legacy_time:8.3f}s  engine {engine_total:8.3f}s "
+              f"(formulas {metrics_time * 1000:7.2f} ms)  speedup {legacy_time / max(engine_total, 1e-9):6.1f}x  "
+              f"curve points {len(metrics['readability_curve'])}")
+        print("           max |diff|  " + "  ".join(f"{_SHORT[name]} {diff:.2f}" for name, diff in diffs.items()))
+
+    print(f"largest difference from textstat: {worst:.2f} (tolerance {tolerance})")
+    return 0 if worst <= tolerance else 1
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    tolerance = 0.5
+    if '--tolerance' in args:
+        i = args.index('--tolerance')
+        tolerance = float(args[i + 1])
+        del args[i:i + 2]
+    sys.exit(main([int(a) for a in args] or [10_000, 100_000, 1_000_000], tolerance))
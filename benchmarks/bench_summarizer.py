@@ -0,0 +1,165 @@
+"""Compare summarizer backends: latency, memory and ROUGE drift from full precision.
+
+Every backend runs in its own process (SUMMARIZER_BACKEND set, models loaded
+from the local cache) over the same fixed corpus: passages of the .txt files
+in benchmarks/data, or synthetic prose when there are none. The torch
+backend is the baseline; the others report ROUGE-1/2/L F1 of their
+summaries against the baseline's, so a drop shows how far quantization or
+the ONNX export moved the output.
+
+Usage:
+    python -m benchmarks.bench_summarizer [--backends torch,torch-int8,onnx] [--docs 20]
+                                          [--threads 4] [--output summarizer.json]
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import resource
+import subprocess
+from collections import Counter
+
+from benchmarks.corpus import generate_text
+from benchmarks.suite import DATA_DIR, percentile
+
+_PASSAGE_CHARS = 3000
+
+
+def load_passages(n_docs: int) -> list:
+    """The fixed corpus: n_docs passages of about _PASSAGE_CHARS characters."""
+    passages = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, '*.txt'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        for start in range(0, len(source) - _PASSAGE_CHARS, _PASSAGE_CHARS):
+            passages.append(source[start:start + _PASSAGE_CHARS])
+            if len(passages) == n_docs:
+                return passages
+    seed = 0
+    while len(passages) < n_docs:
+        passages.append(generate_text(_PASSAGE_CHARS, seed=seed))
+        seed += 1
+    return passages
+
+
+def _ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _f1(overlap, candidate, reference):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def _lcs(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def rouge(candidate: str, reference: str) -> dict:
+    """ROUGE-1, ROUGE-2 and ROUGE-L F1 over lowercased whitespace tokens."""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    scores = {}
+    for n in (1, 2):
+        c, r = _ngrams(cand, n), _ngrams(ref, n)
+        scores[f'rouge{n}'] = _f1(sum((c & r).values()), sum(c.values()), sum(r.values()))
+    scores['rougeL'] = _f1(_lcs(cand, ref), len(cand), len(ref))
+    return scores
+
+
+def _run_backend(n_docs: int) -> dict:
+    """Child process: summarize the corpus with Config.SUMMARIZER_BACKEND."""
+    from app.services.auto_summarization import _get_summarizer, generate_summary
+
+    passages = load_passages(n_docs)
+    start = time.perf_counter()
+    _get_summarizer()
+    load_seconds = time.perf_counter() - start
+    # Warm-up call outside the timed loop
+    generate_summary(passages[0])
+
+    latencies, summaries = [], []
+    for text in passages:
+        start = time.perf_counter()
+        summaries.append(generate_summary(text)['summary'])
+        latencies.append(time.perf_counter() - start)
+    return {
+        'load_seconds': load_seconds,
+        'latencies': latencies,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'summaries': summaries,
+    }
+
+
+def run_backends(backends, n_docs: int, threads: int = 0) -> dict:
+    """Run every backend in a fresh process and score it against the first one."""
+    results = {}
+    for backend in backends:
+        env = dict(os.environ, SUMMARIZER_BACKEND=backend, ANALYZER_METRICS='0')
+        if threads:
+            env['SUMMARIZER_INTRA_OP_THREADS'] = str(threads)
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.bench_summarizer', '--child', str(n_docs)],
+                              env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{backend}: failed\n{proc.stderr.strip()[-2000:]}")
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    if not results:
+        return {}
+    baseline = results[backends[0]]['summaries'] if backends[0] in results else None
+    report = {}
+    for backend, run in results.items():
+        latencies = run['latencies']
+        entry = {
+            'load_seconds': round(run['load_seconds'], 2),
+            'p50_seconds': round(percentile(latencies, 50), 3),
+            'p95_seconds': round(percentile(latencies, 95), 3),
+            'peak_rss_mb': round(run['peak_rss_bytes'] / 2 ** 20, 1),
+        }
+        if baseline is not None:
+            scores = [rouge(summary, reference) for summary, reference in zip(run['summaries'], baseline, strict=True)]
+            for key in ('rouge1', 'rouge2', 'rougeL'):
+                entry[key] = round(sum(s[key] for s in scores) / len(scores), 4)
+        report[backend] = entry
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_summarizer')
+    parser.add_argument('--backends', default='torch,torch-int8,onnx')
+    parser.add_argument('--docs', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=0, help='Intra-op threads per backend; 0 = default')
+    parser.add_argument('--output')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_run_backend(args.child)))
+        return 0
+
+    backends = [b for b in args.backends.split(',') if b]
+    report = run_backends(backends, args.docs, args.threads)
+    print(f"{'backend':12} {'load s':>8} {'p50 s':>8} {'p95 s':>8} {'RSS MB':>8} {'R-1':>7} {'R-2':>7} {'R-L':>7}")
+    for backend, entry in report.items():
+        print(f"{backend:12} {entry['load_seconds']:8.2f} {entry['p50_seconds']:8.3f} {entry['p95_seconds']:8.3f} "
+              f"{entry['peak_rss_mb']:8.1f} {entry.get('rouge1', 0):7.3f} {entry.get('rouge2', 0):7.3f} "
+              f"{entry.get('rougeL', 0):7.3f}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'docs': args.docs, 'backends': report}, f, indent=2)
+    return 0 if report else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Measure per-task overhead of text_analysis_service on an empty document.
+
+Runs against a throwaway SQLite database so no Postgres or broker is needed.
+
+Usage:
+    python -m benchmarks.bench_task_overhead [iterations]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'wordlens_bench.db'))
+
+from app import create_app, db
+from app.models.db import Document
+from app.workers.lifecycle import get_app
+from app.workers.celery_workers import text_analysis_service
+
+
+def _legacy_task(file_id):
+    # What every task used to do before touching the document
+    flask_app = create_app()
+    with flask_app.app_context():
+        Document.query.get(file_id)
+
+
+def _time_per_call(fn, file_id, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(file_id)
+    return (time.perf_counter() - start) / iterations
+
+
+def main(iterations):
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    with get_app().app_context():
+        db.create_all()
+        doc = Document(id='bench-empty', filename='empty.txt', path=path, status='PENDING')
+        db.session.add(doc)
+        db.session.commit()
+
+    legacy = _time_per_call(_legacy_task, 'bench-empty', iterations)
+    warm = _time_per_call(text_analysis_service.run, 'bench-empty', iterations)
+    os.remove(path)
+
+    print(f"legacy setup per task : {legacy * 1000:8.3f} ms")
+    print(f"warm empty-doc task   : {warm * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,51 @@
+"""Compare worker CPU time of per-analyzer tokenization vs the shared pipeline.
+
+Usage:
+    python -m benchmarks.bench_text_pipeline [size_bytes ...]
+"""
+import sys
+import time
+
+import textstat
+
+from benchmarks.corpus import generate_text
+from app.services.text_pipeline import analyze_document
+from app.services.readability import calculate_readability_metrics
+from app.services.sentence_complexity import analyze_sentence_complexity
+from app.services.lexical_diversity import analyze_lexical_diversity
+
+
+def _legacy(text):
+    # What text_analysis_service did before: every analyzer re-tokenizes
+    for fn in (textstat.sentence_count, textstat.flesch_reading_ease, textstat.flesch_kincaid_grade,
+               textstat.gunning_fog, textstat.automated_readability_index, textstat.coleman_liau_index,
+               textstat.linsear_write_formula, textstat.dale_chall_readability_score):
+        fn(text)
+    analyze_sentence_complexity(text)
+    analyze_lexical_diversity(text)
+
+
+def _shared(text):
+    analyzed = analyze_document(text)
+    calculate_readability_metrics(analyzed)
+    analyze_sentence_complexity(text, analyzed)
+    analyze_lexical_diversity(text, analyzed)
+
+
+def _cpu_time(fn, text):
+    start = time.process_time()
+    fn(text)
+    return time.process_time() - start
+
+
+def main(sizes):
+    for size in sizes:
+        text = generate_text(size)
+        legacy = _cpu_time(_legacy, text)
+        shared = _cpu_time(_shared, text)
+        print(f"{size:>10} bytes  legacy {legacy:8.3f}s  shared {shared:8.3f}s  "
+              f"reduction {100 * (1 - shared / max(legacy, 1e-9)):5.1f}%")
+
+
+if __name__ == '__main__':
+    main([int(s) for s in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,35 @@
+import random
+
+_WORDS = (
+    'the a an of and to in was he she it that his her with as for had you not but on at by '
+    'which have from they this were all said one been would there could their when more some '
+    'time into them very what about little upon other only then after people house before '
+    'through should never great again against morning evening remember beautiful together '
+    'understand yesterday extraordinary philosophical consideration particularly individual '
+    'elizabeth darcy london captain river garden letter window journey country society'
+).split()
+
+
+def generate_text(size_bytes: int, seed: int = 42) -> str:
+    """Generate deterministic English-like prose of roughly size_bytes.
+
+    Args:
+        size_bytes (int): Target size of the generated text
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        str: Paragraphs of synthetic sentences
+    """
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+    while size < size_bytes:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(5, 30))]
+            sentence = ' '.join(words)
+            sentences.append(sentence[0].upper() + sentence[1:] + rng.choice('..!?'))
+        paragraph = ' '.join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)[:size_bytes]
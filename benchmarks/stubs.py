@@ -0,0 +1,56 @@
+"""Cheap stand-ins for the model-backed analyzers.
+
+They return results shaped like the real ones, so the rest of the pipeline
+can be benchmarked on a CPU-only box without spaCy or BART models.
+"""
+import re
+from collections import Counter
+
+_CAPITALIZED = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def stub_named_entities(text: str) -> dict:
+    """Treat runs of capitalized words as entities, like analyze_named_entities."""
+    if not text or not isinstance(text, str):
+        return {'entities': {}, 'entity_counts': {}}
+    counts = Counter(_CAPITALIZED.findall(text))
+    if not counts:
+        return {'entities': {}, 'entity_counts': {}}
+    ordered = dict(counts.most_common())
+    return {'entities': {'MISC': list(ordered)}, 'entity_counts': {'MISC': ordered}}
+
+
+def stub_named_entities_batch(texts: list, batch_size: int = None, n_process: int = None) -> list:
+    return [stub_named_entities(text) for text in texts]
+
+
+def stub_summary(text: str, max_length: int = 130, **kwargs) -> dict:
+    """Return the first sentences of text, shaped like generate_summary."""
+    words = []
+    for sentence in _SENTENCE_END.split(text or '')[:5]:
+        words.extend(sentence.split())
+    return {'summary': ' '.join(words[:max_length]), 'windows_total': 1, 'windows_processed': 1, 'levels': 1}
+
+
+def stub_summaries(texts: list, max_length: int = 130, **kwargs) -> list:
+    return [stub_summary(text, max_length) for text in texts]
+
+
+def install_model_stubs():
+    """Swap the NER and summarization analyzers for the stubs everywhere they are imported.
+
+    Without a model server, app.services.model_server looks the batched
+    functions up at call time, so patching their modules covers it.
+    """
+    from app.services import named_entity_recognition, auto_summarization
+    from app.workers import celery_workers
+
+    named_entity_recognition.analyze_named_entities = stub_named_entities
+    named_entity_recognition.analyze_named_entities_batch = stub_named_entities_batch
+    auto_summarization.generate_summary = stub_summary
+    auto_summarization.generate_summaries = stub_summaries
+    celery_workers._RUNNERS['named_entity_recognition'] = lambda ctx: stub_named_entities(ctx.text)
+    celery_workers._RUNNERS['auto_summarization'] = lambda ctx: stub_summary(ctx.text)
+    celery_workers._BATCH_RUNNERS['named_entity_recognition'] = stub_named_entities_batch
+    celery_workers._BATCH_RUNNERS['auto_summarization'] = stub_summaries
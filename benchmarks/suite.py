@@ -0,0 +1,326 @@
+"""Benchmark every text analyzer and the combined pipeline over fixed corpora.
+
+Each target runs over deterministic corpora from 1 KB to 5 MB (synthetic
+prose, plus any .txt files placed in benchmarks/data, e.g. public-domain
+books, tiled to each size). Nothing is downloaded. Results hold latency
+percentiles, throughput and peak Python memory and are saved as JSON so two
+runs (before/after a textstat, spaCy or transformers upgrade) can be compared.
+
+Usage:
+    python -m benchmarks.suite run [--stub-models] [--sizes 1024,1048576] [--targets a,b]
+                                   [--repeat 5] [--no-memory] [--output results.json]
+    python -m benchmarks.suite compare base.json new.json [--threshold 0.10]
+
+--stub-models swaps NER and summarization for cheap stand-ins (see
+benchmarks.stubs) so the suite runs on a CPU-only box without the models.
+compare exits with status 1 when any p50 latency or peak memory regressed
+by more than the threshold.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+
+# Measurements stay in process; nothing is published to Redis
+os.environ.setdefault('ANALYZER_METRICS', '0')
+
+from benchmarks.corpus import generate_text
+
+DEFAULT_SIZES = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 5 * 1024 * 1024)
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+_PACKAGES = ('textstat', 'nltk', 'spacy', 'transformers', 'torch')
+
+
+def load_corpora(sizes) -> dict:
+    """Build every corpus at every size.
+
+    Returns:
+        dict: (corpus name, size) -> text
+    """
+    corpora = {}
+    for size in sizes:
+        corpora[('synthetic', size)] = generate_text(size)
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, '*.txt'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        if not source.strip():
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        for size in sizes:
+            text = source
+            while len(text) < size:
+                text += '\n\n' + source
+            corpora[(name, size)] = text[:size]
+    return corpora
+
+
+def _write_temp(text):
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def _targets() -> dict:
+    """Target name -> (prepare, run, cleanup). prepare(text) is not timed."""
+    from app.services.text_pipeline import analyze_document
+    from app.services.readability import calculate_readability_metrics
+    from app.services.sentence_complexity import analyze_sentence_complexity
+    from app.services.lexical_diversity import analyze_lexical_diversity
+    from app.services.keyword_extraction import extract_keywords
+    from app.services.sentiment_analysis import sentiment_analyzer
+    from app.services import named_entity_recognition, auto_summarization
+    from app.services.chunked_analysis import analyze_chunk
+    from app.services.ingestion import iter_text_blocks
+    from app.workers.celery_workers import _AnalysisContext, _RUNNERS
+
+    def same(text):
+        return text
+
+    def pipeline(text):
+        # What text_analysis_service runs for a document, minus the DB and cache
+        ctx = _AnalysisContext(text)
+        return {name: run(ctx) for name, run in _RUNNERS.items()}
+
+    return {
+        'text_pipeline.analyze_document': (same, analyze_document, None),
+        'readability.calculate_readability_metrics': (analyze_document, calculate_readability_metrics, None),
+        'sentence_complexity.analyze_sentence_complexity': (
+            analyze_document, lambda analyzed: analyze_sentence_complexity(analyzed.text, analyzed), None),
+        'lexical_diversity.analyze_lexical_diversity': (
+            analyze_document, lambda analyzed: analyze_lexical_diversity(analyzed.text, analyzed), None),
+        'keyword_extraction.extract_keywords': (same, lambda text: extract_keywords(text, update_corpus=False), None),
+        'sentiment_analysis.get_sentiment_summary': (same, sentiment_analyzer.get_sentiment_summary, None),
+        # Looked up at call time so --stub-models takes effect
+        'named_entity_recognition.analyze_named_entities': (
+            same, lambda text: named_entity_recognition.analyze_named_entities(text), None),
+        'auto_summarization.generate_summary': (
+            same, lambda text: auto_summarization.generate_summary(text), None),
+        'chunked_analysis.analyze_chunk': (same, analyze_chunk, None),
+        'ingestion.iter_text_blocks': (_write_temp, lambda path: sum(1 for _ in iter_text_blocks(path)), os.remove),
+        'pipeline': (same, pipeline, None),
+    }
+
+
+def percentile(values, q: float) -> float:
+    """Linearly interpolated percentile of values, q in [0, 100]."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def measure(prepare, run, cleanup, text, repeat, memory=True) -> dict:
+    """Time repeat runs of one target over text and optionally its peak memory.
+
+    Peak memory comes from one extra run under tracemalloc, so tracing never
+    slows down the timed runs.
+    """
+    latencies = []
+    for _ in range(repeat):
+        arg = prepare(text)
+        try:
+            start = time.perf_counter()
+            run(arg)
+            latencies.append(time.perf_counter() - start)
+        finally:
+            if cleanup:
+                cleanup(arg)
+
+    peak = None
+    if memory:
+        arg = prepare(text)
+        tracemalloc.start()
+        try:
+            run(arg)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            if cleanup:
+                cleanup(arg)
+
+    p50 = percentile(latencies, 50)
+    tokens = len(text.split())
+    return {
+        'repeats': repeat,
+        'latency_s': {
+            'min': round(min(latencies), 6),
+            'mean': round(sum(latencies) / len(latencies), 6),
+            'p50': round(p50, 6),
+            'p90': round(percentile(latencies, 90), 6),
+            'p99': round(percentile(latencies, 99), 6),
+        },
+        'throughput_mb_s': round(len(text.encode('utf-8')) / p50 / 1e6, 3) if p50 else None,
+        'throughput_tokens_s': round(tokens / p50, 1) if p50 else None,
+        'peak_memory_bytes': peak,
+    }
+
+
+def _versions() -> dict:
+    versions = {}
+    for package in _PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def run_suite(sizes, targets=None, repeat=5, stub_models=False, memory=True) -> dict:
+    """Run the selected targets over every corpus and size.
+
+    Args:
+        sizes (list): Corpus sizes in bytes
+        targets (list, optional): Target names to run. Defaults to all.
+        repeat (int, optional): Timed runs per target and corpus; sizes of
+            1 MB and more use at most 3. Defaults to 5.
+        stub_models (bool, optional): Replace NER and summarization with stubs
+        memory (bool, optional): Also measure peak memory. Defaults to True.
+
+    Returns:
+        dict: 'meta' (environment) and 'results' (one entry per target and corpus)
+    """
+    if stub_models:
+        from benchmarks.stubs import install_model_stubs
+        install_model_stubs()
+
+    available = _targets()
+    selected = targets or list(available)
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown targets: {', '.join(unknown)}")
+    corpora = load_corpora(sizes)
+
+    results = []
+    for name in selected:
+        prepare, run, cleanup = available[name]
+        try:
+            # Untimed warm-up so model loading is not counted
+            measure(prepare, run, cleanup, generate_text(1024), 1, memory=False)
+        except Exception as e:
+            print(f"{name:50} warm-up failed: {str(e)}")
+        for (corpus, size), text in corpora.items():
+            entry = {'target': name, 'corpus': corpus, 'size_bytes': size}
+            try:
+                entry.update(measure(prepare, run, cleanup, text, repeat if size < 1024 * 1024 else min(repeat, 3), memory))
+                print(f"{name:50} {corpus:12} {size:>9}  p50 {entry['latency_s']['p50']:9.4f}s  "
+                      f"{entry['throughput_mb_s'] or 0:8.3f} MB/s")
+            except Exception as e:
+                entry['error'] = str(e)
+                print(f"{name:50} {corpus:12} {size:>9}  error: {str(e)}")
+            results.append(entry)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'packages': _versions(),
+            'stub_models': stub_models,
+            'sizes': list(sizes),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float = 0.10) -> list:
+    """Compare two suite results on p50 latency and peak memory.
+
+    Args:
+        base (dict): Earlier run
+        new (dict): Later run
+        threshold (float, optional): Relative increase that counts as a regression. Defaults to 0.10.
+
+    Returns:
+        list: One row per target and corpus present in both runs
+    """
+    def key(entry):
+        return entry['target'], entry['corpus'], entry['size_bytes']
+
+    baseline = {key(entry): entry for entry in base['results'] if 'error' not in entry}
+    rows = []
+    for entry in new['results']:
+        old = baseline.get(key(entry))
+        if old is None or 'error' in entry:
+            continue
+        row = {'target': entry['target'], 'corpus': entry['corpus'], 'size_bytes': entry['size_bytes'], 'regressions': []}
+        for metric, old_value, new_value in (
+            ('p50', old['latency_s']['p50'], entry['latency_s']['p50']),
+            ('peak_memory', old.get('peak_memory_bytes'), entry.get('peak_memory_bytes')),
+        ):
+            if not old_value or new_value is None:
+                continue
+            change = new_value / old_value - 1
+            row[f'{metric}_change'] = round(change, 4)
+            if change > threshold:
+                row['regressions'].append(metric)
+        rows.append(row)
+    return rows
+
+
+def _print_comparison(rows, threshold):
+    for row in rows:
+        flag = 'REGRESSION' if row['regressions'] else ''
+        p50 = row.get('p50_change')
+        memory = row.get('peak_memory_change')
+        print(f"{row['target']:50} {row['corpus']:12} {row['size_bytes']:>9}  "
+              f"p50 {'' if p50 is None else f'{p50:+7.1%}':>8}  "
+              f"mem {'' if memory is None else f'{memory:+7.1%}':>8}  {flag}")
+    regressions = sum(1 for row in rows if row['regressions'])
+    print(f"{regressions} of {len(rows)} comparisons regressed by more than {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the suite and save results as JSON')
+    run_parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES))
+    run_parser.add_argument('--targets', default='')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--stub-models', action='store_true')
+    run_parser.add_argument('--no-memory', action='store_true')
+    run_parser.add_argument('--output', default='')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions between two result files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = run_suite(
+            [int(s) for s in args.sizes.split(',') if s],
+            targets=[t for t in args.targets.split(',') if t] or None,
+            repeat=max(args.repeat, 1),
+            stub_models=args.stub_models,
+            memory=not args.no_memory,
+        )
+        output = args.output or f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {output}")
+        return 0
+
+    with open(args.base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    return 1 if _print_comparison(compare(base, new, args.threshold), args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
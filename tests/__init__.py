@@ -0,0 +1,8 @@
+import pytest
+
+from app.utils.nltk_data import missing_nltk_data
+
+# Tokenizing tests need the NLTK data that app.download_models installs
+requires_nltk_data = pytest.mark.skipif(
+    bool(missing_nltk_data()), reason='NLTK data is not installed (python -m app.download_models)'
+)
@@ -0,0 +1,50 @@
+import sys
+import uuid
+import hashlib
+
+import pytest
+
+from app import create_app, db
+from app.core.config import Config
+from app.models.db import Document
+from app.utils import redis_client
+from app.workers import lifecycle
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """A fakeredis client in place of get_redis in every loaded app module."""
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(Config, 'REDIS_URL', 'redis://fake')
+    original = redis_client.get_redis
+    for name, module in list(sys.modules.items()):
+        if name.startswith('app.') and getattr(module, 'get_redis', None) is original:
+            monkeypatch.setattr(module, 'get_redis', lambda: client)
+    return client
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The Flask app on an empty SQLite database; worker tasks use it too."""
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'wordlens.db'}")
+    flask_app = create_app()
+    monkeypatch.setattr(lifecycle, '_app', flask_app)
+    with flask_app.app_context():
+        db.create_all()
+    return flask_app
+
+
+@pytest.fixture
+def upload(app, tmp_path):
+    """Store a text file and its PENDING document; returns the document id."""
+    def create(text: str, analyses: list) -> str:
+        path = tmp_path / f'{uuid.uuid4()}.txt'
+        path.write_text(text, encoding='utf-8')
+        doc = Document(id=str(uuid.uuid4()), filename=path.name, path=str(path), status='PENDING',
+                       content_hash=hashlib.sha256(text.encode('utf-8')).hexdigest(), requested_analyses=analyses)
+        with app.app_context():
+            db.session.add(doc)
+            db.session.commit()
+            return doc.id
+    return create
@@ -0,0 +1,38 @@
+import pytest
+
+from app.services.analysis_plan import ANALYZERS, build_plan, document_status, parse_analyses
+
+
+def test_parse_analyses_accepts_aliases_and_keeps_registry_order():
+    assert parse_analyses(['summary,readability', ' ner ']) == [
+        'readability_analysis', 'named_entity_recognition', 'auto_summarization'
+    ]
+    assert parse_analyses([]) == list(ANALYZERS)
+    with pytest.raises(ValueError):
+        parse_analyses(['colour'])
+
+
+def test_build_plan_splits_light_and_heavy():
+    plan = build_plan(['sentiment', 'ner'])
+    assert plan['light'] == ['sentiment_analysis']
+    assert plan['heavy'] == ['named_entity_recognition']
+    assert plan['stages'] == ['extract_text']
+
+
+def test_build_plan_only_tokenizes_for_analyzers_that_read_the_tokens():
+    assert build_plan(['keywords'])['stages'] == ['extract_text']
+    assert build_plan(['keywords', 'readability'])['stages'] == ['extract_text', 'tokenize']
+
+
+def test_document_status_stays_partial_until_every_analyzer_finished():
+    requested = ['readability_analysis', 'named_entity_recognition']
+    assert document_status({}, requested) == 'PARTIAL'
+    # A failed light analyzer is not final while NER is still running
+    assert document_status({'readability_analysis': True}, requested) == 'PARTIAL'
+    assert document_status({'readability_analysis': True, 'named_entity_recognition': False}, requested) == 'FAILED'
+    assert document_status({'readability_analysis': False, 'named_entity_recognition': False}, requested) == 'COMPLETED'
+
+
+def test_document_status_ignores_results_that_were_not_requested():
+    assert document_status({'readability_analysis': False, 'auto_summarization': True},
+                           ['readability_analysis']) == 'COMPLETED'
@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.core.config import Config
+from app.models.db import AnalysisCache, Document
+from app.services.model_server import ModelServerError, ModelServerTimeout, ModelServerUnavailable
+from app.services.checkpoints import in_flight
+from app.services.chunked_analysis import analyze_chunk, plan_chunks, read_chunk
+from app.services.keyword_extraction import extract_keywords
+from app.services.result_store import finished_analyzers, load_results
+from app.workers import celery_workers
+from tests import requires_nltk_data
+
+_TEXT = 'The ship left the harbour at dawn. Nobody on the quay waved, and the gulls followed it out to sea.\n\n' * 60
+
+
+class WorkerKilled(BaseException):
+    """Stands in for the worker process dying mid-run; not caught like an analyzer error."""
+
+
+def _counting(monkeypatch, calls, names):
+    for name in names:
+        run = celery_workers._RUNNERS[name]
+        monkeypatch.setitem(celery_workers._RUNNERS, name,
+                            lambda ctx, name=name, run=run: calls.append(name) or run(ctx))
+
+
+@requires_nltk_data
+def test_rerun_after_a_crash_resumes_from_the_stored_analyzers(app, upload, fake_redis, monkeypatch):
+    monkeypatch.setattr(Config, 'SMALL_DOCUMENT_BYTES', 0)
+    analyzers = ['readability_analysis', 'sentence_complexity', 'lexical_diversity', 'keyword_extraction']
+    doc_id = upload(_TEXT, analyzers)
+    calls = []
+    _counting(monkeypatch, calls, analyzers)
+    lexical_diversity = celery_workers._RUNNERS['lexical_diversity']
+
+    def crash(ctx):
+        raise WorkerKilled()
+    monkeypatch.setitem(celery_workers._RUNNERS, 'lexical_diversity', crash)
+    with pytest.raises(WorkerKilled):
+        celery_workers.text_analysis_service.run(doc_id)
+    assert calls == ['readability_analysis', 'sentence_complexity']
+    with app.app_context():
+        assert finished_analyzers(doc_id) == {'readability_analysis': False, 'sentence_complexity': False}
+        assert db.session.get(Document, doc_id).status == 'PARTIAL'
+
+    # The broker delivers the unacknowledged task again
+    calls.clear()
+    monkeypatch.setitem(celery_workers._RUNNERS, 'lexical_diversity', lexical_diversity)
+    celery_workers.text_analysis_service.run(doc_id)
+    assert calls == ['lexical_diversity', 'keyword_extraction']
+    with app.app_context():
+        assert db.session.get(Document, doc_id).status == 'COMPLETED'
+        results = load_results(doc_id, analyzers)
+    assert sorted(results) == sorted(analyzers)
+    assert not any('error' in result for result in results.values())
+
+
+def test_a_failed_flush_marks_the_document_failed(app, upload, fake_redis, monkeypatch):
+    doc_id = upload(_TEXT, ['keyword_extraction'])
+    monkeypatch.setitem(celery_workers._RUNNERS, 'keyword_extraction', lambda ctx: {'keywords': []})
+
+    def conflicting_store(content_hash, results):
+        # A failed flush, like losing an insert race, leaves the session needing a rollback
+        db.session.add(AnalysisCache(content_hash=content_hash, analyzer='keyword_extraction', version=None))
+        db.session.flush()
+    monkeypatch.setattr(celery_workers, 'store_results', conflicting_store)
+    celery_workers.text_analysis_service.run(doc_id)
+    with app.app_context():
+        doc = db.session.get(Document, doc_id)
+        assert doc.status == 'FAILED'
+        assert 'NOT NULL constraint failed' in doc.result['error']
+
+
+def test_only_an_unreachable_model_server_is_retried(app, upload, fake_redis, monkeypatch):
+    doc_id = upload(_TEXT, ['named_entity_recognition'])
+
+    def unavailable(ctx):
+        raise ModelServerUnavailable('connection refused')
+
+    def rejected(ctx):
+        raise ModelServerError('Unknown model')
+
+    def busy(ctx):
+        raise ModelServerTimeout('No answer from the model server within 600s')
+
+    with app.app_context():
+        doc = db.session.get(Document, doc_id)
+        monkeypatch.setitem(celery_workers._RUNNERS, 'named_entity_recognition', unavailable)
+        with pytest.raises(ModelServerUnavailable):
+            celery_workers._run_analyzers(doc, _TEXT, ['named_entity_recognition'])
+        monkeypatch.setitem(celery_workers._RUNNERS, 'named_entity_recognition', rejected)
+        results = celery_workers._run_analyzers(doc, _TEXT, ['named_entity_recognition'])
+        assert 'Unknown model' in results['named_entity_recognition']['error']
+        monkeypatch.setitem(celery_workers._RUNNERS, 'named_entity_recognition', busy)
+        results = celery_workers._run_analyzers(doc, _TEXT, ['named_entity_recognition'])
+    assert 'No answer' in results['named_entity_recognition']['error']
+
+
+def test_redelivered_chunk_is_not_analyzed_again(tmp_path, fake_redis, monkeypatch):
+    path = tmp_path / 'book.txt'
+    path.write_text(_TEXT, encoding='utf-8')
+    calls = []
+    monkeypatch.setattr(celery_workers, 'analyze_chunk',
+                        lambda text, analyzers: calls.append(len(text)) or {'character_count': len(text)})
+    first = celery_workers.analyze_chunk_service.run(str(path), 0, 500, ['readability_analysis'])
+    again = celery_workers.analyze_chunk_service.run(str(path), 0, 500, ['readability_analysis'])
+    assert calls == [500]
+    assert again == first
+    celery_workers.analyze_chunk_service.run(str(path), 500, 1000, ['readability_analysis'])
+    assert calls == [500, 500]
+
+
+def test_heavy_analyzers_in_flight_are_not_dispatched_or_reaped_again(app, upload, fake_redis, monkeypatch):
+    doc_id = upload(_TEXT, ['keyword_extraction', 'auto_summarization'])
+    monkeypatch.setitem(celery_workers._RUNNERS, 'keyword_extraction', lambda ctx: {'keywords': []})
+    dispatched, requeued = [], []
+    monkeypatch.setattr(celery_workers.run_analyzers_service, 'delay', lambda *args: dispatched.append(args))
+    monkeypatch.setattr(celery_workers.text_analysis_service, 'apply_async',
+                        lambda args, **options: requeued.append(args))
+
+    celery_workers.text_analysis_service.run(doc_id)
+    # Redelivered while the summary still waits in its queue
+    celery_workers.text_analysis_service.run(doc_id)
+    assert dispatched == [(doc_id, ['auto_summarization'])]
+
+    with app.app_context():
+        doc = db.session.get(Document, doc_id)
+        assert doc.status == 'PARTIAL'
+        doc.created_at = datetime.now(timezone.utc) - timedelta(hours=3)
+        db.session.commit()
+    monkeypatch.setattr(Config, 'STUCK_DOCUMENT_SECONDS', 0)
+    assert celery_workers.reap_stuck_documents_service.run() == 0
+
+    monkeypatch.setitem(celery_workers._RUNNERS, 'auto_summarization', lambda ctx: {'summary': 'A ship.'})
+    celery_workers.run_analyzers_service.run(doc_id, ['auto_summarization'])
+    assert in_flight(['auto_summarization'], doc_id) == set()
+    with app.app_context():
+        assert db.session.get(Document, doc_id).status == 'COMPLETED'
+
+
+def test_stuck_documents_without_work_in_flight_are_requeued(app, upload, fake_redis, monkeypatch):
+    doc_id = upload(_TEXT, ['keyword_extraction', 'auto_summarization'])
+    requeued = []
+    monkeypatch.setattr(celery_workers.text_analysis_service, 'apply_async',
+                        lambda args, **options: requeued.append(args))
+    with app.app_context():
+        db.session.get(Document, doc_id).created_at = datetime.now(timezone.utc) - timedelta(hours=3)
+        db.session.commit()
+    monkeypatch.setattr(Config, 'STUCK_DOCUMENT_SECONDS', 60)
+    assert celery_workers.reap_stuck_documents_service.run() == 1
+    assert requeued == [(doc_id,)]
+    # Claimed: not queued again while it waits for a worker
+    assert celery_workers.reap_stuck_documents_service.run() == 0
+
+
+@requires_nltk_data
+def test_chunked_reduce_streams_keywords_and_preview_from_disk(app, upload, fake_redis, monkeypatch):
+    monkeypatch.setattr(Config, 'KEYWORD_SCORING', 'rake')
+    analyzers = ['lexical_diversity', 'keyword_extraction']
+    doc_id = upload(_TEXT, analyzers)
+    with app.app_context():
+        path = db.session.get(Document, doc_id).path
+    partials = [analyze_chunk(read_chunk(path, start, end), analyzers) for start, end in plan_chunks(path, 2_000)]
+    celery_workers.merge_chunks_service.run(partials, doc_id, analyzers)
+    with app.app_context():
+        results = load_results(doc_id)
+    assert results['keyword_extraction'] == extract_keywords(_TEXT, update_corpus=False)
+    assert results['text_preview'] == _TEXT[:200] + '...'
+    assert results['lexical_diversity']['token_count'] > 0
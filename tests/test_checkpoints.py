@@ -0,0 +1,38 @@
+from app.services.checkpoints import (
+    claim_in_flight, claim_requeue, clear_attempts, clear_in_flight, in_flight, load_partial, partial_key,
+    renew_in_flight, save_partial, start_attempt
+)
+
+
+def test_partials_are_keyed_by_their_arguments(fake_redis):
+    key = partial_key('chunk', '/data/book.txt', 0, 100, ['lexical_diversity'])
+    assert key == partial_key('chunk', '/data/book.txt', 0, 100, ['lexical_diversity'])
+    assert key != partial_key('chunk', '/data/book.txt', 100, 200, ['lexical_diversity'])
+    assert load_partial(key) is None
+    save_partial(key, {'character_count': 100})
+    assert load_partial(key) == {'character_count': 100}
+    assert fake_redis.ttl(key) > 0
+
+
+def test_attempts_count_until_cleared(fake_redis):
+    assert [start_attempt('text_analysis', 'doc') for _ in range(3)] == [1, 2, 3]
+    assert start_attempt('text_analysis', 'other') == 1
+    clear_attempts('text_analysis', 'doc')
+    assert start_attempt('text_analysis', 'doc') == 1
+
+
+def test_a_document_is_requeued_once(fake_redis):
+    assert claim_requeue('doc')
+    assert not claim_requeue('doc')
+    assert claim_requeue('other')
+
+
+def test_an_analyzer_is_dispatched_once_while_in_flight(fake_redis):
+    assert claim_in_flight('auto_summarization', 'doc')
+    assert not claim_in_flight('auto_summarization', 'doc')
+    assert claim_in_flight('named_entity_recognition', 'other')
+    assert in_flight(['auto_summarization', 'named_entity_recognition'], 'doc') == {'auto_summarization'}
+    clear_in_flight(['auto_summarization'], 'doc')
+    assert in_flight(['auto_summarization'], 'doc') == set()
+    renew_in_flight(['auto_summarization'], 'doc')
+    assert not claim_in_flight('auto_summarization', 'doc')
@@ -0,0 +1,47 @@
+from app.services.chunked_analysis import analyze_chunk, merge_chunk_results, plan_chunks, read_chunk
+from app.services.lexical_diversity import analyze_lexical_diversity
+from app.services.readability import calculate_readability_metrics
+from app.services.sentence_complexity import analyze_sentence_complexity
+from app.services.text_pipeline import analyze_document
+from tests import requires_nltk_data
+
+pytestmark = requires_nltk_data
+
+_ANALYZERS = ['readability_analysis', 'sentence_complexity', 'lexical_diversity']
+
+
+def _text() -> str:
+    paragraphs = []
+    for i in range(120):
+        paragraphs.append(f'Paragraph {i} begins here. The captain looked at the sea for a long while. '
+                          f'Then, without a word, he went below and wrote {i % 7 + 1} letters to his sister.')
+    return '\n\n'.join(paragraphs)
+
+
+def test_plan_chunks_covers_the_file_at_paragraph_breaks(tmp_path):
+    path = tmp_path / 'book.txt'
+    path.write_text(_text(), encoding='utf-8')
+    chunks = plan_chunks(str(path), 2_000)
+    assert len(chunks) > 2
+    assert ''.join(read_chunk(str(path), start, end) for start, end in chunks) == _text()
+    assert all(read_chunk(str(path), start, end).endswith('\n\n') for start, end in chunks[:-1])
+
+
+def test_merged_chunks_match_the_whole_document(tmp_path):
+    path = tmp_path / 'book.txt'
+    path.write_text(_text(), encoding='utf-8')
+    partials = [analyze_chunk(read_chunk(str(path), start, end), _ANALYZERS)
+                for start, end in plan_chunks(str(path), 5_000)]
+    merged = merge_chunk_results(partials, _ANALYZERS)
+
+    analyzed = analyze_document(_text())
+    whole_lexical = analyze_lexical_diversity(_text(), analyzed)
+    merged_lexical = merged['lexical_diversity']
+    # MTLD is exact up to one partial factor per chunk
+    assert abs(merged_lexical.pop('mtld') - whole_lexical['mtld']) < 0.05 * whole_lexical.pop('mtld')
+    assert merged_lexical == whole_lexical
+    assert merged['sentence_complexity'] == analyze_sentence_complexity(_text(), analyzed)
+    whole_readability = calculate_readability_metrics(analyzed)
+    for name, value in whole_readability.items():
+        if name != 'readability_curve':
+            assert merged['readability_analysis'][name] == value, name
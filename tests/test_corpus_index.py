@@ -0,0 +1,35 @@
+import pytest
+
+from app.core.config import Config
+from app.services.corpus_index import CorpusIndex, document_words
+from tests import requires_nltk_data
+
+pytestmark = requires_nltk_data
+
+_WHALE = 'The whale rose from the sea and the sailors watched the whale dive under the ship. '
+_GARDEN = 'The roses in the garden and the tulips by the wall were all in the sun of the spring. '
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'REDIS_URL', None)
+    return CorpusIndex(str(tmp_path / 'corpus_index'))
+
+
+def test_stopwords_do_not_make_documents_similar(index):
+    index.add('whale', document_words(_WHALE * 20))
+    index.add('whale-too', document_words('A whale and a ship at sea, with sailors. ' * 20))
+    index.add('garden', document_words(_GARDEN * 20))
+    (closest, score), (other, other_score) = index.similar('whale')
+    assert closest == 'whale-too'
+    assert other == 'garden'
+    assert other_score < 0.1 < score
+
+
+def test_near_duplicates_survive_a_small_edit(index):
+    text = ' '.join(f'{_WHALE} Chapter {word}.' for word in ('one', 'two', 'three', 'four', 'five') * 20)
+    index.add('original', document_words(text))
+    index.add('edited', document_words(text.replace('sailors watched', 'crew saw', 1)))
+    index.add('garden', document_words(_GARDEN * 20))
+    assert [document for document, _ in index.near_duplicates('original', threshold=0.5)] == ['edited']
+    assert index.near_duplicates('missing') is None
@@ -0,0 +1,39 @@
+from app.core.config import Config
+from app.services.keyword_extraction import (
+    corpus_frequencies, extract_keywords, extract_keywords_stream, record_document
+)
+from tests import requires_nltk_data
+
+
+def test_documents_are_counted_once_per_content(fake_redis):
+    assert record_document('the first book', ['first', 'book'])
+    assert not record_document('the first book', ['first', 'book'])
+    assert record_document('the second book', ['second', 'book'])
+    n_docs, frequencies = corpus_frequencies(['book', 'first', 'unseen'])
+    assert n_docs == 2
+    assert frequencies == {'book': 2, 'first': 1}
+
+
+def test_seen_filter_has_a_fixed_size(fake_redis, monkeypatch):
+    monkeypatch.setattr(Config, 'KEYWORD_SEEN_FILTER_BITS', 2 ** 16)
+    counted = sum(record_document(f'document number {i}', [f'word{i}']) for i in range(500))
+    assert counted == 500
+    assert fake_redis.strlen('wordlens:keyword_seen_filter') <= 2 ** 16 // 8
+
+
+@requires_nltk_data
+def test_rare_names_outrank_common_words(fake_redis):
+    for i in range(5):
+        extract_keywords(f'The house stood near the river. The house was old. Story {i}.')
+    text = 'Captain Nemo was brave. The house was old. Captain Nemo and the house.'
+    keywords = extract_keywords(text, max_keywords=2, update_corpus=False)['keywords']
+    assert keywords[0] == 'captain nemo'
+
+
+@requires_nltk_data
+def test_streamed_blocks_give_the_keywords_of_the_whole_text():
+    blocks = ['Captain Nemo sailed the Nautilus.', 'The Nautilus dived; Captain Nemo watched the sea.',
+              'Sea monsters followed the Nautilus.']
+    expected = extract_keywords('\n\n'.join(blocks), scoring='rake', update_corpus=False)
+    assert extract_keywords_stream(iter(blocks), 'key', scoring='rake', update_corpus=False) == expected
+    assert expected['keywords'][0] == 'captain nemo sailed'
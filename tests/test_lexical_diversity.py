@@ -0,0 +1,32 @@
+import json
+import random
+
+from app.services.lexical_diversity import LexicalStats
+
+
+def _words(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    vocabulary = [f'w{i}' for i in range(400)]
+    return [rng.choice(vocabulary[:rng.randint(20, 400)]) for _ in range(count)]
+
+
+def test_merged_chunks_match_the_whole_stream():
+    words = _words(30_000, seed=3)
+    whole = LexicalStats()
+    whole.add(words)
+    merged = None
+    for start in range(0, len(words), 7_000):
+        stats = LexicalStats()
+        stats.add(words[start:start + 7_000])
+        # Partial states travel between workers as JSON
+        stats = LexicalStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+        merged = stats if merged is None else merged.merge(stats)
+
+    expected, result = whole.result(), merged.result()
+    # MTLD is exact up to one partial factor per seam
+    assert abs(result.pop('mtld') - expected.pop('mtld')) < 0.01 * whole.mtld()
+    assert result == expected
+
+
+def test_empty_stream():
+    assert LexicalStats().result()['token_count'] == 0
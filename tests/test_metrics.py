@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from app.core.config import Config
+from app.services.metrics import instrument, record_analyzer_run, render_prometheus
+
+
+@pytest.fixture(autouse=True)
+def _no_redis(monkeypatch):
+    monkeypatch.setattr(Config, 'ANALYZER_METRICS', False)
+
+
+def test_instrument_counts_input_and_times():
+    with instrument('readability_analysis', 'one two three') as record:
+        pass
+    assert record['characters'] == 13
+    assert record['tokens'] == 3
+    assert record['wall_seconds'] >= 0 and record['cpu_seconds'] >= 0
+    assert 'seconds_per_1k_tokens' in record
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/clear_refs'), reason='needs Linux /proc')
+def test_peak_rss_is_measured_per_run_after_a_larger_one():
+    with instrument('large'):
+        block = bytearray(64 * 2 ** 20)
+        del block
+    # The process peak is now far above what the next run allocates
+    with instrument('small') as record:
+        block = bytearray(16 * 2 ** 20)
+        del block
+    assert 8 * 2 ** 20 < record['peak_rss_delta_bytes'] < 48 * 2 ** 20
+
+
+def test_word_cache_hit_ratio_is_exported(monkeypatch, fake_redis):
+    monkeypatch.setattr(Config, 'ANALYZER_METRICS', True)
+    record = {'characters': 10, 'tokens': 2, 'wall_seconds': 0.1, 'cpu_seconds': 0.1, 'peak_rss_delta_bytes': 0,
+              'word_cache_hits': 30, 'word_cache_misses': 10, 'word_table_hits': 4}
+    record_analyzer_run('tokenize', record)
+    text = render_prometheus()
+    assert 'wordlens_word_cache_hit_ratio{analyzer="tokenize"} 0.75' in text
+    assert 'wordlens_word_table_hits_total{analyzer="tokenize"} 4' in text
+    assert 'wordlens_word_cache_lookups_total{analyzer="tokenize",result="miss"} 10' in text
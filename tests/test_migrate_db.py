@@ -0,0 +1,54 @@
+import json
+
+import sqlalchemy as sa
+
+from app import create_app, db
+from app.core.config import Config
+from app.migrate_db import migrate
+from app.models.db import Document
+from app.services.result_store import finished_analyzers, load_results
+
+# The documents table as deployed before analysis_results existed
+_OLD_SCHEMA = 'CREATE TABLE documents (id VARCHAR PRIMARY KEY, filename VARCHAR NOT NULL, ' \
+              'path VARCHAR NOT NULL, status VARCHAR NOT NULL, result JSON)'
+_OLD_RESULT = {
+    'readability_analysis': {'flesch_reading_ease': 70.0},
+    'keyword_extraction': {'keywords': ['whale']},
+    'text_preview': 'Call me Ishmael.',
+    'analysis_timestamp': None,
+}
+
+
+def test_migrate_upgrades_an_old_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'old.db'}")
+    app = create_app()
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(sa.text(_OLD_SCHEMA))
+            conn.execute(sa.text('INSERT INTO documents VALUES (:id, :name, :path, :status, :result)'), [
+                {'id': 'done', 'name': 'a.txt', 'path': 'a.txt', 'status': 'COMPLETED',
+                 'result': json.dumps(_OLD_RESULT)},
+                {'id': 'failed', 'name': 'b.txt', 'path': 'b.txt', 'status': 'FAILED',
+                 'result': '{"error": "File not found"}'},
+            ])
+
+        migrate()
+        # Running it again changes nothing
+        migrate()
+
+        columns = {column['name'] for column in sa.inspect(db.engine).get_columns('documents')}
+        assert {'content_hash', 'requested_analyses', 'segmentation', 'created_at'} <= columns
+        assert {'analysis_results', 'analysis_cache'} <= set(sa.inspect(db.engine).get_table_names())
+        assert 'ix_documents_status_created_at' in {
+            index['name'] for index in sa.inspect(db.engine).get_indexes('documents')
+        }
+
+        done = db.session.get(Document, 'done')
+        assert done.created_at is not None
+        assert done.result is None
+        assert finished_analyzers('done') == {'readability_analysis': False, 'keyword_extraction': False,
+                                              'text_preview': False}
+        results = load_results('done', ['readability_analysis', 'text_preview'])
+        assert results == {'readability_analysis': {'flesch_reading_ease': 70.0}, 'text_preview': 'Call me Ishmael.'}
+        assert db.session.get(Document, 'failed').result == {'error': 'File not found'}
+        assert finished_analyzers('failed') == {}
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from app.core.config import Config
+from app.services import model_server
+from app.services.model_server import ModelServerError, ModelServerTimeout, ModelServerUnavailable, _MicroBatcher
+
+
+def _ner(texts):
+    if any('boom' in text for text in texts):
+        raise RuntimeError('model crashed')
+    return [{'length': len(text)} for text in texts]
+
+
+def test_failed_batch_only_fails_the_text_that_raised():
+    batcher = _MicroBatcher('ner', _ner, max_batch=8, window_seconds=0.2)
+    results = {}
+
+    def submit(key, texts):
+        results[key] = batcher.submit(texts)
+
+    threads = [threading.Thread(target=submit, args=(key, texts))
+               for key, texts in (('a', ['one', 'boom']), ('b', ['three']))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results['a'][0] == {'length': 3}
+    assert 'model crashed' in results['a'][1]['error']
+    assert results['b'] == [{'length': 5}]
+
+
+def test_server_and_client_need_an_authkey(monkeypatch):
+    monkeypatch.setattr(Config, 'MODEL_SERVER_AUTHKEY', None)
+    monkeypatch.setattr(Config, 'SECRET_KEY', 'dev')
+    with pytest.raises(ModelServerError):
+        model_server.serve('127.0.0.1:0', models=[])
+    monkeypatch.setattr(Config, 'MODEL_SERVER_ADDRESS', '127.0.0.1:1')
+    with pytest.raises(ModelServerError):
+        model_server.ping()
+
+
+def test_messages_round_trip_as_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'MODEL_SERVER_AUTHKEY', 'secret')
+    address = str(tmp_path / 'models.sock')
+    listener = model_server.Listener(address, authkey=b'secret')
+    batchers = {'ner': _MicroBatcher('ner', _ner, max_batch=8, window_seconds=0)}
+    threading.Thread(target=lambda: model_server._handle(listener.accept(), batchers), daemon=True).start()
+    monkeypatch.setattr(Config, 'MODEL_SERVER_ADDRESS', address)
+    monkeypatch.setattr(model_server, '_connection', None)
+    try:
+        assert model_server.named_entities(['hello']) == [{'length': 5}]
+        # Answered with an error: not worth a retry
+        with pytest.raises(ModelServerError) as error:
+            model_server.summaries(['hello'])
+        assert not isinstance(error.value, ModelServerUnavailable)
+    finally:
+        listener.close()
+        monkeypatch.setattr(model_server, '_connection', None)
+
+
+def test_unreachable_server_is_unavailable(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'MODEL_SERVER_AUTHKEY', 'secret')
+    monkeypatch.setattr(Config, 'MODEL_SERVER_ADDRESS', str(tmp_path / 'missing.sock'))
+    monkeypatch.setattr(model_server, '_connection', None)
+    with pytest.raises(ModelServerUnavailable):
+        model_server.ping()
+
+
+def test_a_server_that_does_not_answer_times_out(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'MODEL_SERVER_AUTHKEY', 'secret')
+    monkeypatch.setattr(Config, 'MODEL_SERVER_TIMEOUT_SECONDS', 0.1)
+    address = str(tmp_path / 'models.sock')
+    listener = model_server.Listener(address, authkey=b'secret')
+    accepted = []
+    threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True).start()
+    monkeypatch.setattr(Config, 'MODEL_SERVER_ADDRESS', address)
+    monkeypatch.setattr(model_server, '_connection', None)
+    try:
+        with pytest.raises(ModelServerTimeout) as error:
+            model_server.summaries(['a long book'])
+        assert not isinstance(error.value, ModelServerUnavailable)
+        assert model_server._connection is None
+    finally:
+        listener.close()
+        monkeypatch.setattr(model_server, '_connection', None)
@@ -0,0 +1,42 @@
+from itertools import pairwise
+
+from app.core.config import Config
+from app.services.readability import (
+    calculate_readability_metrics, merge_readability_counts, readability_counts, readability_from_counts
+)
+from app.services.text_pipeline import analyze_document
+from tests import requires_nltk_data
+
+pytestmark = requires_nltk_data
+
+EASY = 'The cat sat on the mat. It was a warm day. '
+HARD = 'Comprehensive institutional considerations necessitate extraordinarily deliberate evaluation. '
+
+
+def test_readability_curve_covers_every_sentence_within_the_point_limit(monkeypatch):
+    monkeypatch.setattr(Config, 'READABILITY_CURVE_WINDOW_SENTENCES', 4)
+    monkeypatch.setattr(Config, 'READABILITY_CURVE_POINTS', 5)
+    result = calculate_readability_metrics(analyze_document(EASY * 30))
+    curve = result['readability_curve']
+    assert 1 < len(curve) <= 5
+    assert curve[0]['start_sentence'] == 0
+    assert curve[-1]['end_sentence'] == result['sentence_count']
+    assert all(a['end_sentence'] == b['start_sentence'] for a, b in pairwise(curve))
+    assert sum(window['word_count'] for window in curve) == result['word_count']
+
+
+def test_readability_curve_follows_difficulty(monkeypatch):
+    monkeypatch.setattr(Config, 'READABILITY_CURVE_WINDOW_SENTENCES', 10)
+    curve = calculate_readability_metrics(analyze_document(EASY * 5 + HARD * 10))['readability_curve']
+    assert curve[0]['flesch_reading_ease'] > curve[-1]['flesch_reading_ease']
+
+
+def test_merged_counts_match_the_whole_text(monkeypatch):
+    # Both halves are whole windows, so the merged curve lines up too
+    monkeypatch.setattr(Config, 'READABILITY_CURVE_WINDOW_SENTENCES', 10)
+    first, second = EASY * 10, HARD * 10
+    whole = readability_from_counts(readability_counts(analyze_document(first + second)))
+    merged = readability_from_counts(merge_readability_counts(
+        readability_counts(analyze_document(first)), readability_counts(analyze_document(second))
+    ))
+    assert merged == whole
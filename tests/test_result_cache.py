@@ -0,0 +1,16 @@
+from app import db
+from app.services.result_cache import ANALYZER_VERSIONS, get_cached_results, store_results
+
+
+def test_storing_the_same_content_again_replaces_the_entries(app):
+    with app.app_context():
+        store_results('a' * 64, {'keyword_extraction': {'keywords': ['old']},
+                                 'sentiment_analysis': {'error': 'Unexpected error during analysis: boom'}})
+        db.session.commit()
+        # A second upload of the same content finishing at the same time
+        store_results('a' * 64, {'keyword_extraction': {'keywords': ['new']},
+                                 'sentiment_analysis': {'overall': 'positive'}})
+        db.session.commit()
+        cached = get_cached_results('a' * 64)
+    assert cached == {'keyword_extraction': {'keywords': ['new']}, 'sentiment_analysis': {'overall': 'positive'}}
+    assert set(cached) <= set(ANALYZER_VERSIONS)
@@ -0,0 +1,24 @@
+from app import db
+from app.models.db import AnalysisResult
+from app.services.result_store import finished_analyzers, load_results, save_results
+
+
+def test_saving_again_replaces_the_rows(app, upload):
+    doc_id = upload('Some text.', ['readability_analysis', 'sentence_complexity'])
+    with app.app_context():
+        save_results(doc_id, {'readability_analysis': {'error': 'Unexpected error during analysis: boom'},
+                              'analysis_metrics': {'readability_analysis': {'wall_seconds': 1.0},
+                                                   'tokenize': {'wall_seconds': 0.5}}})
+        db.session.commit()
+        assert finished_analyzers(doc_id) == {'readability_analysis': True}
+
+        save_results(doc_id, {'readability_analysis': {'flesch_reading_ease': 70.0},
+                              'sentence_complexity': {'average_sentence_length': 2.0},
+                              'analysis_metrics': {'readability_analysis': {'wall_seconds': 2.0}}})
+        db.session.commit()
+        assert finished_analyzers(doc_id) == {'readability_analysis': False, 'sentence_complexity': False}
+        assert db.session.query(AnalysisResult).filter_by(document_id=doc_id).count() == 3
+        results = load_results(doc_id)
+    assert results['readability_analysis'] == {'flesch_reading_ease': 70.0}
+    assert results['analysis_metrics'] == {'readability_analysis': {'wall_seconds': 2.0},
+                                           'tokenize': {'wall_seconds': 0.5}}
@@ -0,0 +1,34 @@
+from itertools import pairwise
+
+from app.services.segmentation import chapter_bounds, plan_segments, window_bounds
+
+_BODY = 'It was a quiet evening and nothing much happened in the village that day. ' * 40
+
+
+def _titles(text: str) -> list:
+    return [title for _, _, title in chapter_bounds(text, min_chars=1_000)]
+
+
+def test_table_of_contents_is_dropped():
+    contents = 'CONTENTS\n\nChapter I\nChapter II\nChapter III\n\n'
+    body = ''.join(f'Chapter {n}\n\n{_BODY}\n\n' for n in ('I', 'II', 'III'))
+    text = 'A NOVEL\n\nBy A. Writer\n\n' + contents + body
+    assert _titles(text) == ['Chapter I', 'Chapter II', 'Chapter III']
+    starts = [start for start, _, _ in chapter_bounds(text, min_chars=1_000)]
+    assert starts[1:] == [text.index(f'Chapter {n}\n\nIt was') for n in ('II', 'III')]
+
+
+def test_chapter_numbering_restarting_in_every_part_is_kept():
+    text = ''.join(f'PART {part}\n\n' + ''.join(f'Chapter {n}\n\n{_BODY}\n\n' for n in (1, 2, 3))
+                   for part in ('ONE', 'TWO'))
+    assert _titles(text) == ['PART ONE', 'Chapter 2', 'Chapter 3', 'PART TWO', 'Chapter 2', 'Chapter 3']
+
+
+def test_segments_tile_the_text():
+    text = ''.join(f'Chapter {n}\n\n{_BODY}\n\n' for n in range(1, 6))
+    for mode, window_chars in (('chapters', None), ('windows', 1_500)):
+        segments = plan_segments(text, mode, window_chars)['segments']
+        assert segments[0]['start_char'] == 0
+        assert segments[-1]['end_char'] == len(text)
+        assert all(a['end_char'] == b['start_char'] for a, b in pairwise(segments))
+    assert all(end - start <= 1_500 for start, end in window_bounds(text, 1_500))